@@ -12,9 +12,10 @@ import click
 # Add project root to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
+from src.cli.utils.client_factory import create_client
 from src.cli.utils.file_utils import read_file_or_stdin, save_output, detect_language_from_file
 from src.core.config import ConfigManager
-from src.core.gemini_client import GeminiCLIClient, GeminiOptions
+from src.core.gemini_client import GeminiOptions
 
 
 async def perform_bug_analysis(
@@ -26,11 +27,12 @@ async def perform_bug_analysis(
     language: str,
     model: str,
     sandbox: bool,
-    debug: bool
+    debug: bool,
+    use_cache: bool = True
 ) -> str:
     """
     Perform bug analysis using Gemini.
-    
+
     Args:
         bug_description: Description of the bug
         code_context: Relevant code snippets
@@ -41,7 +43,8 @@ async def perform_bug_analysis(
         model: Gemini model to use
         sandbox: Use sandbox mode
         debug: Enable debug mode
-        
+        use_cache: Reuse responses from the shared disk cache
+
     Returns:
         Analysis result
     """
@@ -51,15 +54,16 @@ async def perform_bug_analysis(
         sandbox=sandbox,
         debug=debug
     )
-    client = GeminiCLIClient(options)
-    
+
     # Get configuration and templates
     config_manager = ConfigManager()
+    client = create_client(options, config_manager.config, use_cache=use_cache)
+
     template = config_manager.get_template("bug_analysis")
-    
+
     if not template:
         raise ValueError("Bug analysis template not found")
-    
+
     # Format template
     system_prompt, user_prompt = template.format(
         bug_description=bug_description,
@@ -69,16 +73,19 @@ async def perform_bug_analysis(
         environment=environment,
         reproduction_steps=reproduction_steps
     )
-    
-    # Call Gemini
-    response = await client.call_with_structured_prompt(
-        system_prompt=system_prompt,
-        user_prompt=user_prompt
-    )
-    
+
+    # Call Gemini, releasing the backend's connections or processes afterwards
+    try:
+        response = await client.call_with_structured_prompt(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt
+        )
+    finally:
+        await client.close()
+
     if not response.success:
         raise ValueError(f"Gemini call failed: {response.error}")
-    
+
     return response.content
 
 
@@ -131,37 +138,37 @@ def bug():
     help='Save output to file'
 )
 @click.pass_context
-async def analyze(ctx, description, code_file, code_context, logs_file, error_logs, 
+async def analyze(ctx, description, code_file, code_context, logs_file, error_logs,
                  environment, reproduction_steps, language, output):
     """Analyze a bug with provided context."""
     formatter = ctx.obj['formatter']
-    
+
     try:
         # Get code context
         if code_file and code_context:
             raise click.ClickException("Specify either --code-file or --code-context, not both")
-        
+
         if code_file:
             code_context = read_file_or_stdin(code_file)
             if not language:
                 language = detect_language_from_file(code_file)
         elif not code_context:
             code_context = ""
-        
+
         # Get error logs
         if logs_file and error_logs:
             raise click.ClickException("Specify either --logs-file or --error-logs, not both")
-        
+
         if logs_file:
             error_logs = read_file_or_stdin(logs_file)
         elif not error_logs:
             error_logs = ""
-        
+
         if ctx.obj['verbose']:
             formatter.info(f"Analyzing bug: {description[:50]}...")
             formatter.info(f"Language: {language or 'unknown'}")
             formatter.info(f"Environment: {environment or 'not specified'}")
-        
+
         # Show context preview if not in JSON mode
         if not ctx.obj['json'] and ctx.obj['verbose']:
             if code_context:
@@ -171,7 +178,7 @@ async def analyze(ctx, description, code_file, code_context, logs_file, error_lo
                 preview = error_logs[:200] + "..." if len(error_logs) > 200 else error_logs
                 formatter.console.print(f"📝 Error Logs Preview:\n{preview}\n")
             formatter.print_separator()
-        
+
         # Perform analysis
         result = await perform_bug_analysis(
             bug_description=description,
@@ -182,12 +189,13 @@ async def analyze(ctx, description, code_file, code_context, logs_file, error_lo
             language=language or "",
             model=ctx.obj['model'],
             sandbox=ctx.obj['sandbox'],
-            debug=ctx.obj['debug']
+            debug=ctx.obj['debug'],
+            use_cache=ctx.obj['use_cache']
         )
-        
+
         # Output results
         formatter.print_bug_analysis(result)
-        
+
         # Save to file if requested
         if output:
             if ctx.obj['json']:
@@ -208,7 +216,7 @@ async def analyze(ctx, description, code_file, code_context, logs_file, error_lo
                 text_output += f"Model: {ctx.obj['model']}\n\n"
                 text_output += f"Analysis:\n{result}\n"
                 save_output(text_output, output)
-        
+
     except Exception as e:
         formatter.error(f"Bug analysis failed: {str(e)}")
         sys.exit(1)
@@ -219,32 +227,32 @@ async def analyze(ctx, description, code_file, code_context, logs_file, error_lo
 async def interactive(ctx):
     """Interactive bug analysis wizard."""
     formatter = ctx.obj['formatter']
-    
+
     if ctx.obj['json']:
         formatter.error("Interactive mode not available in JSON output mode")
         sys.exit(1)
-    
+
     try:
         formatter.console.print("🐛 Interactive Bug Analysis Wizard", style="bold red")
         formatter.console.print("This wizard will guide you through analyzing a bug.\n")
-        
+
         # Get bug description
         description = formatter.prompt_input("Bug description")
         if not description.strip():
             formatter.error("Bug description is required")
             sys.exit(1)
-        
+
         # Get code context
         has_code = formatter.prompt_confirmation("Do you have relevant code to include?")
         code_context = ""
         language = ""
-        
+
         if has_code:
             code_source = click.prompt(
                 "Enter code (type 'file' to read from file, or paste code)",
                 type=str
             )
-            
+
             if code_source.lower() == 'file':
                 code_file = formatter.prompt_input("Code file path")
                 try:
@@ -260,19 +268,19 @@ async def interactive(ctx):
                         code_context += line + "\n"
                 except EOFError:
                     pass
-                
+
                 language = formatter.prompt_input("Programming language", default="")
-        
+
         # Get error logs
         has_logs = formatter.prompt_confirmation("Do you have error logs to include?")
         error_logs = ""
-        
+
         if has_logs:
             logs_source = click.prompt(
                 "Enter logs (type 'file' to read from file, or paste logs)",
                 type=str
             )
-            
+
             if logs_source.lower() == 'file':
                 logs_file = formatter.prompt_input("Logs file path")
                 try:
@@ -287,18 +295,18 @@ async def interactive(ctx):
                         error_logs += line + "\n"
                 except EOFError:
                     pass
-        
+
         # Get additional context
         environment = formatter.prompt_input(
             "Environment details (OS, versions, etc.)",
             default=""
         )
-        
+
         reproduction_steps = formatter.prompt_input(
             "Steps to reproduce the bug",
             default=""
         )
-        
+
         # Show summary
         formatter.console.print("\n📋 Analysis Summary:")
         formatter.console.print(f"  Bug: {description}")
@@ -306,13 +314,13 @@ async def interactive(ctx):
         formatter.console.print(f"  Has Code: {'Yes' if code_context else 'No'}")
         formatter.console.print(f"  Has Logs: {'Yes' if error_logs else 'No'}")
         formatter.console.print(f"  Environment: {environment or 'Not specified'}")
-        
+
         if not formatter.prompt_confirmation("\nProceed with analysis?"):
             formatter.info("Analysis cancelled")
             sys.exit(0)
-        
+
         formatter.console.print(f"\n🔍 Analyzing bug with {ctx.obj['model']}...")
-        
+
         # Perform analysis
         result = await perform_bug_analysis(
             bug_description=description,
@@ -323,12 +331,13 @@ async def interactive(ctx):
             language=language,
             model=ctx.obj['model'],
             sandbox=ctx.obj['sandbox'],
-            debug=ctx.obj['debug']
+            debug=ctx.obj['debug'],
+            use_cache=ctx.obj['use_cache']
         )
-        
+
         # Output results
         formatter.print_bug_analysis(result)
-        
+
     except KeyboardInterrupt:
         formatter.info("\nAnalysis cancelled by user")
         sys.exit(0)
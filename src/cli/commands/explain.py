@@ -12,9 +12,10 @@ import click
 # Add project root to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
+from src.cli.utils.client_factory import create_client
 from src.cli.utils.file_utils import read_file_or_stdin, save_output, detect_language_from_file
 from src.core.config import ConfigManager
-from src.core.gemini_client import GeminiCLIClient, GeminiOptions
+from src.core.gemini_client import GeminiOptions
 
 
 async def perform_code_explanation(
@@ -24,11 +25,12 @@ async def perform_code_explanation(
     questions: str,
     model: str,
     sandbox: bool,
-    debug: bool
+    debug: bool,
+    use_cache: bool = True
 ) -> str:
     """
     Perform code explanation using Gemini.
-    
+
     Args:
         code: Code to explain
         language: Programming language
@@ -37,7 +39,8 @@ async def perform_code_explanation(
         model: Gemini model to use
         sandbox: Use sandbox mode
         debug: Enable debug mode
-        
+        use_cache: Reuse responses from the shared disk cache
+
     Returns:
         Explanation result
     """
@@ -47,15 +50,16 @@ async def perform_code_explanation(
         sandbox=sandbox,
         debug=debug
     )
-    client = GeminiCLIClient(options)
-    
+
     # Get configuration and templates
     config_manager = ConfigManager()
+    client = create_client(options, config_manager.config, use_cache=use_cache)
+
     template = config_manager.get_template("code_explanation")
-    
+
     if not template:
         raise ValueError("Code explanation template not found")
-    
+
     # Format template
     system_prompt, user_prompt = template.format(
         language=language or "auto-detect",
@@ -63,16 +67,19 @@ async def perform_code_explanation(
         detail_level=detail_level,
         questions=questions
     )
-    
-    # Call Gemini
-    response = await client.call_with_structured_prompt(
-        system_prompt=system_prompt,
-        user_prompt=user_prompt
-    )
-    
+
+    # Call Gemini, releasing the backend's connections or processes afterwards
+    try:
+        response = await client.call_with_structured_prompt(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt
+        )
+    finally:
+        await client.close()
+
     if not response.success:
         raise ValueError(f"Gemini call failed: {response.error}")
-    
+
     return response.content
 
 
@@ -112,30 +119,30 @@ def explain():
 async def file(ctx, file, language, level, questions, output):
     """Explain code from a file."""
     formatter = ctx.obj['formatter']
-    
+
     try:
         # Read code from file
         if not file:
             raise click.ClickException("File path is required")
-        
+
         code = read_file_or_stdin(file)
-        
+
         # Auto-detect language if not provided
         if not language:
             language = detect_language_from_file(file)
-        
+
         if ctx.obj['verbose']:
             formatter.info(f"Explaining code from: {file}")
             formatter.info(f"Language: {language or 'auto-detect'}")
             formatter.info(f"Detail level: {level}")
             if questions:
                 formatter.info(f"Questions: {questions}")
-        
+
         # Show code preview if not in JSON mode
         if not ctx.obj['json'] and ctx.obj['verbose']:
             formatter.print_code_with_syntax(code[:500] + "..." if len(code) > 500 else code, language)
             formatter.print_separator()
-        
+
         # Perform explanation
         result = await perform_code_explanation(
             code=code,
@@ -144,12 +151,13 @@ async def file(ctx, file, language, level, questions, output):
             questions=questions,
             model=ctx.obj['model'],
             sandbox=ctx.obj['sandbox'],
-            debug=ctx.obj['debug']
+            debug=ctx.obj['debug'],
+            use_cache=ctx.obj['use_cache']
         )
-        
+
         # Output results
         formatter.print_code_explanation(result)
-        
+
         # Save to file if requested
         if output:
             if ctx.obj['json']:
@@ -172,7 +180,7 @@ async def file(ctx, file, language, level, questions, output):
                 text_output += f"Model: {ctx.obj['model']}\n\n"
                 text_output += f"Explanation:\n{result}\n"
                 save_output(text_output, output)
-        
+
     except Exception as e:
         formatter.error(f"Code explanation failed: {str(e)}")
         sys.exit(1)
@@ -203,21 +211,21 @@ async def file(ctx, file, language, level, questions, output):
 async def stdin(ctx, language, level, questions, output):
     """Explain code from stdin."""
     formatter = ctx.obj['formatter']
-    
+
     try:
         # Read code from stdin
         code = read_file_or_stdin(None)
-        
+
         if not code.strip():
             raise click.ClickException("No code provided via stdin")
-        
+
         if ctx.obj['verbose']:
             formatter.info("Explaining code from stdin")
             formatter.info(f"Language: {language or 'auto-detect'}")
             formatter.info(f"Detail level: {level}")
             if questions:
                 formatter.info(f"Questions: {questions}")
-        
+
         # Perform explanation
         result = await perform_code_explanation(
             code=code,
@@ -226,12 +234,13 @@ async def stdin(ctx, language, level, questions, output):
             questions=questions,
             model=ctx.obj['model'],
             sandbox=ctx.obj['sandbox'],
-            debug=ctx.obj['debug']
+            debug=ctx.obj['debug'],
+            use_cache=ctx.obj['use_cache']
         )
-        
+
         # Output results
         formatter.print_code_explanation(result)
-        
+
         # Save to file if requested
         if output:
             if ctx.obj['json']:
@@ -254,7 +263,7 @@ async def stdin(ctx, language, level, questions, output):
                 text_output += f"Model: {ctx.obj['model']}\n\n"
                 text_output += f"Explanation:\n{result}\n"
                 save_output(text_output, output)
-        
+
     except Exception as e:
         formatter.error(f"Code explanation failed: {str(e)}")
         sys.exit(1)
@@ -275,15 +284,15 @@ async def stdin(ctx, language, level, questions, output):
 async def interactive(ctx, language, level):
     """Interactive code explanation."""
     formatter = ctx.obj['formatter']
-    
+
     if ctx.obj['json']:
         formatter.error("Interactive mode not available in JSON output mode")
         sys.exit(1)
-    
+
     try:
         formatter.console.print("📖 Interactive Code Explanation", style="bold cyan")
         formatter.console.print("Enter your code (press Ctrl+D when done):\n")
-        
+
         # Read code from user input
         code = ""
         try:
@@ -292,18 +301,18 @@ async def interactive(ctx, language, level):
                 code += line + "\n"
         except EOFError:
             pass
-        
+
         if not code.strip():
             formatter.error("No code provided")
             sys.exit(1)
-        
+
         # Get language if not provided
         if not language:
             language = formatter.prompt_input(
                 "Programming language (optional)",
                 default=""
             )
-        
+
         # Confirm detail level
         confirmed_level = click.prompt(
             "Detail level",
@@ -311,20 +320,20 @@ async def interactive(ctx, language, level):
             default=level,
             show_default=True
         )
-        
+
         # Get specific questions
         questions = formatter.prompt_input(
             "Specific questions about the code (optional)",
             default=""
         )
-        
+
         formatter.console.print(f"\n🔍 Explaining code...")
         formatter.console.print(f"Language: {language or 'auto-detect'}")
         formatter.console.print(f"Detail Level: {confirmed_level}")
         if questions:
             formatter.console.print(f"Questions: {questions}")
         formatter.console.print()
-        
+
         # Perform explanation
         result = await perform_code_explanation(
             code=code,
@@ -333,12 +342,13 @@ async def interactive(ctx, language, level):
             questions=questions,
             model=ctx.obj['model'],
             sandbox=ctx.obj['sandbox'],
-            debug=ctx.obj['debug']
+            debug=ctx.obj['debug'],
+            use_cache=ctx.obj['use_cache']
         )
-        
+
         # Output results
         formatter.print_code_explanation(result)
-        
+
     except KeyboardInterrupt:
         formatter.info("\nExplanation cancelled by user")
         sys.exit(0)
@@ -12,9 +12,10 @@ import click
 # Add project root to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
+from src.cli.utils.client_factory import create_client
 from src.cli.utils.file_utils import read_file_or_stdin, save_output
 from src.core.config import ConfigManager
-from src.core.gemini_client import GeminiCLIClient, GeminiOptions
+from src.core.gemini_client import GeminiOptions
 
 
 async def perform_feature_review(
@@ -23,11 +24,12 @@ async def perform_feature_review(
     focus_areas: str,
     model: str,
     sandbox: bool,
-    debug: bool
+    debug: bool,
+    use_cache: bool = True
 ) -> str:
     """
     Perform feature plan review using Gemini.
-    
+
     Args:
         feature_plan: Feature plan content
         context: Project context
@@ -35,7 +37,8 @@ async def perform_feature_review(
         model: Gemini model to use
         sandbox: Use sandbox mode
         debug: Enable debug mode
-        
+        use_cache: Reuse responses from the shared disk cache
+
     Returns:
         Review result
     """
@@ -45,31 +48,35 @@ async def perform_feature_review(
         sandbox=sandbox,
         debug=debug
     )
-    client = GeminiCLIClient(options)
-    
+
     # Get configuration and templates
     config_manager = ConfigManager()
+    client = create_client(options, config_manager.config, use_cache=use_cache)
+
     template = config_manager.get_template("feature_plan_review")
-    
+
     if not template:
         raise ValueError("Feature plan review template not found")
-    
+
     # Format template
     system_prompt, user_prompt = template.format(
         feature_plan=feature_plan,
         context=context,
         focus_areas=focus_areas
     )
-    
-    # Call Gemini
-    response = await client.call_with_structured_prompt(
-        system_prompt=system_prompt,
-        user_prompt=user_prompt
-    )
-    
+
+    # Call Gemini, releasing the backend's connections or processes afterwards
+    try:
+        response = await client.call_with_structured_prompt(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt
+        )
+    finally:
+        await client.close()
+
     if not response.success:
         raise ValueError(f"Gemini call failed: {response.error}")
-    
+
     return response.content
 
 
@@ -104,7 +111,7 @@ def feature():
 async def review(ctx, file, context, focus_areas, output):
     """Review a feature plan from file or stdin."""
     formatter = ctx.obj['formatter']
-    
+
     try:
         # Read feature plan
         if file:
@@ -113,21 +120,21 @@ async def review(ctx, file, context, focus_areas, output):
         else:
             feature_plan = read_file_or_stdin(None)
             source = "stdin"
-        
+
         if not feature_plan.strip():
             raise click.ClickException("No feature plan content provided")
-        
+
         if ctx.obj['verbose']:
             formatter.info(f"Reviewing feature plan from: {source}")
             formatter.info(f"Context: {context or 'None provided'}")
             formatter.info(f"Focus areas: {focus_areas}")
-        
+
         # Show plan preview if not in JSON mode
         if not ctx.obj['json'] and ctx.obj['verbose']:
             preview = feature_plan[:300] + "..." if len(feature_plan) > 300 else feature_plan
             formatter.console.print(f"\n📋 Feature Plan Preview:\n{preview}\n")
             formatter.print_separator()
-        
+
         # Perform review
         result = await perform_feature_review(
             feature_plan=feature_plan,
@@ -135,12 +142,13 @@ async def review(ctx, file, context, focus_areas, output):
             focus_areas=focus_areas,
             model=ctx.obj['model'],
             sandbox=ctx.obj['sandbox'],
-            debug=ctx.obj['debug']
+            debug=ctx.obj['debug'],
+            use_cache=ctx.obj['use_cache']
         )
-        
+
         # Output results
         formatter.print_feature_plan_review(result)
-        
+
         # Save to file if requested
         if output:
             if ctx.obj['json']:
@@ -161,7 +169,7 @@ async def review(ctx, file, context, focus_areas, output):
                 text_output += f"Model: {ctx.obj['model']}\n\n"
                 text_output += f"Review:\n{result}\n"
                 save_output(text_output, output)
-        
+
     except Exception as e:
         formatter.error(f"Feature plan review failed: {str(e)}")
         sys.exit(1)
@@ -181,15 +189,15 @@ async def review(ctx, file, context, focus_areas, output):
 async def interactive(ctx, context, focus_areas):
     """Interactive feature plan review."""
     formatter = ctx.obj['formatter']
-    
+
     if ctx.obj['json']:
         formatter.error("Interactive mode not available in JSON output mode")
         sys.exit(1)
-    
+
     try:
         formatter.console.print("🚀 Interactive Feature Plan Review", style="bold blue")
         formatter.console.print("Enter your feature plan (press Ctrl+D when done):\n")
-        
+
         # Read feature plan from user input
         feature_plan = ""
         try:
@@ -198,28 +206,28 @@ async def interactive(ctx, context, focus_areas):
                 feature_plan += line + "\n"
         except EOFError:
             pass
-        
+
         if not feature_plan.strip():
             formatter.error("No feature plan provided")
             sys.exit(1)
-        
+
         # Get context if not provided
         if not context:
             context = formatter.prompt_input(
                 "Project context (optional)",
                 default=""
             )
-        
+
         # Confirm focus areas
         confirmed_focus = formatter.prompt_input(
             "Focus areas",
             default=focus_areas
         )
-        
+
         formatter.console.print(f"\n🔍 Reviewing feature plan...")
         formatter.console.print(f"Context: {context or 'None'}")
         formatter.console.print(f"Focus: {confirmed_focus}\n")
-        
+
         # Perform review
         result = await perform_feature_review(
             feature_plan=feature_plan,
@@ -227,12 +235,13 @@ async def interactive(ctx, context, focus_areas):
             focus_areas=confirmed_focus,
             model=ctx.obj['model'],
             sandbox=ctx.obj['sandbox'],
-            debug=ctx.obj['debug']
+            debug=ctx.obj['debug'],
+            use_cache=ctx.obj['use_cache']
         )
-        
+
         # Output results
         formatter.print_feature_plan_review(result)
-        
+
     except KeyboardInterrupt:
         formatter.info("\nReview cancelled by user")
         sys.exit(0)
@@ -12,9 +12,10 @@ import click
 # Add project root to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
+from src.cli.utils.client_factory import create_client
 from src.cli.utils.file_utils import read_file_or_stdin, detect_language_from_file, save_output
 from src.core.config import ConfigManager
-from src.core.gemini_client import GeminiCLIClient, GeminiOptions
+from src.core.gemini_client import GeminiOptions
 from src.server.gemini_server import CodeReviewRequest
 
 
@@ -24,11 +25,12 @@ async def perform_code_review(
     focus: str,
     model: str,
     sandbox: bool,
-    debug: bool
+    debug: bool,
+    use_cache: bool = True
 ) -> dict:
     """
     Perform code review using Gemini.
-    
+
     Args:
         code: Code content to review
         language: Programming language
@@ -36,7 +38,8 @@ async def perform_code_review(
         model: Gemini model to use
         sandbox: Use sandbox mode
         debug: Enable debug mode
-        
+        use_cache: Reuse responses from the shared disk cache
+
     Returns:
         Review result dictionary
     """
@@ -46,19 +49,20 @@ async def perform_code_review(
         sandbox=sandbox,
         debug=debug
     )
-    client = GeminiCLIClient(options)
-    
+
     # Get configuration and templates
     config_manager = ConfigManager()
+    client = create_client(options, config_manager.config, use_cache=use_cache)
+
     template = config_manager.get_template("code_review")
-    
+
     if not template:
         raise ValueError("Code review template not found")
-    
+
     # Determine language if not provided
     if not language:
         language = "auto-detect"
-    
+
     # Create focus instruction
     focus_map = {
         "security": "Focus specifically on security vulnerabilities and potential exploits.",
@@ -68,23 +72,26 @@ async def perform_code_review(
         "general": "Provide a comprehensive review covering all aspects."
     }
     focus_instruction = focus_map.get(focus, focus_map["general"])
-    
+
     # Format template
     system_prompt, user_prompt = template.format(
         language=language,
         code=code,
         focus_instruction=focus_instruction
     )
-    
-    # Call Gemini
-    response = await client.call_with_structured_prompt(
-        system_prompt=system_prompt,
-        user_prompt=user_prompt
-    )
-    
+
+    # Call Gemini, releasing the backend's connections or processes afterwards
+    try:
+        response = await client.call_with_structured_prompt(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt
+        )
+    finally:
+        await client.close()
+
     if not response.success:
         raise ValueError(f"Gemini call failed: {response.error}")
-    
+
     # Parse structured response
     try:
         # Try to extract JSON from response
@@ -106,7 +113,7 @@ async def perform_code_review(
                 "issues": [],
                 "suggestions": content.split('\n') if content else []
             }
-        
+
         return {
             "summary": parsed.get("summary", "Code review completed"),
             "issues": parsed.get("issues", []),
@@ -118,7 +125,7 @@ async def perform_code_review(
             "input_prompt": response.input_prompt,
             "gemini_response": response.content
         }
-        
+
     except json.JSONDecodeError:
         # Fallback to simple text response
         return {
@@ -165,28 +172,28 @@ def review():
 async def file(ctx, file, language, focus, output):
     """Review code from a file."""
     formatter = ctx.obj['formatter']
-    
+
     try:
         # Read code from file
         if not file:
             raise click.ClickException("File path is required")
-        
+
         code = read_file_or_stdin(file)
-        
+
         # Auto-detect language if not provided
         if not language:
             language = detect_language_from_file(file)
-        
+
         if ctx.obj['verbose']:
             formatter.info(f"Reviewing file: {file}")
             formatter.info(f"Language: {language or 'auto-detect'}")
             formatter.info(f"Focus: {focus}")
-        
+
         # Show code preview if not in JSON mode
         if not ctx.obj['json'] and ctx.obj['verbose']:
             formatter.print_code_with_syntax(code[:500] + "..." if len(code) > 500 else code, language)
             formatter.print_separator()
-        
+
         # Perform review
         result = await perform_code_review(
             code=code,
@@ -194,12 +201,13 @@ async def file(ctx, file, language, focus, output):
             focus=focus,
             model=ctx.obj['model'],
             sandbox=ctx.obj['sandbox'],
-            debug=ctx.obj['debug']
+            debug=ctx.obj['debug'],
+            use_cache=ctx.obj['use_cache']
         )
-        
+
         # Output results
         formatter.print_code_review(result, show_prompts=ctx.obj['show_prompts'])
-        
+
         # Save to file if requested
         if output:
             if ctx.obj['json']:
@@ -218,7 +226,7 @@ async def file(ctx, file, language, focus, output):
                         text_output += f"{i}. {suggestion}\n"
                 text_output += f"\nRating: {result['rating']}\n"
                 save_output(text_output, output)
-        
+
     except Exception as e:
         formatter.error(f"Code review failed: {str(e)}")
         sys.exit(1)
@@ -244,19 +252,19 @@ async def file(ctx, file, language, focus, output):
 async def stdin(ctx, language, focus, output):
     """Review code from stdin."""
     formatter = ctx.obj['formatter']
-    
+
     try:
         # Read code from stdin
         code = read_file_or_stdin(None)
-        
+
         if not code.strip():
             raise click.ClickException("No code provided via stdin")
-        
+
         if ctx.obj['verbose']:
             formatter.info("Reviewing code from stdin")
             formatter.info(f"Language: {language or 'auto-detect'}")
             formatter.info(f"Focus: {focus}")
-        
+
         # Perform review
         result = await perform_code_review(
             code=code,
@@ -264,12 +272,13 @@ async def stdin(ctx, language, focus, output):
             focus=focus,
             model=ctx.obj['model'],
             sandbox=ctx.obj['sandbox'],
-            debug=ctx.obj['debug']
+            debug=ctx.obj['debug'],
+            use_cache=ctx.obj['use_cache']
         )
-        
+
         # Output results
         formatter.print_code_review(result, show_prompts=ctx.obj['show_prompts'])
-        
+
         # Save to file if requested
         if output:
             if ctx.obj['json']:
@@ -288,7 +297,7 @@ async def stdin(ctx, language, focus, output):
                         text_output += f"{i}. {suggestion}\n"
                 text_output += f"\nRating: {result['rating']}\n"
                 save_output(text_output, output)
-        
+
     except Exception as e:
         formatter.error(f"Code review failed: {str(e)}")
         sys.exit(1)
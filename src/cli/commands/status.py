@@ -12,8 +12,9 @@ import click
 # Add project root to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
+from src.cli.utils.client_factory import create_client
 from src.core.config import ConfigManager
-from src.core.gemini_client import GeminiCLIClient, GeminiOptions
+from src.core.gemini_client import GeminiOptions
 
 
 @click.group()
@@ -27,7 +28,7 @@ def status():
 async def check(ctx):
     """Check Gemini CLI status and authentication."""
     formatter = ctx.obj['formatter']
-    
+
     try:
         # Create Gemini client with options from context
         options = GeminiOptions(
@@ -35,24 +36,27 @@ async def check(ctx):
             sandbox=ctx.obj['sandbox'],
             debug=ctx.obj['debug']
         )
-        
-        client = GeminiCLIClient(options)
-        
+
+        client = create_client(options, ConfigManager().config)
+
         if ctx.obj['verbose']:
             formatter.info("Checking Gemini CLI availability...")
-        
+
         # Test authentication
-        auth_valid = await client.verify_authentication()
-        
+        try:
+            auth_valid = await client.verify_authentication()
+        finally:
+            await client.close()
+
         status_info = {
             "authenticated": auth_valid,
             "model": options.model,
             "cli_available": True,
             "sandbox_mode": options.sandbox
         }
-        
+
         formatter.print_status(status_info)
-        
+
     except Exception as e:
         error_status = {
             "authenticated": False,
@@ -70,11 +74,11 @@ async def check(ctx):
 def config(ctx):
     """Show current configuration."""
     formatter = ctx.obj['formatter']
-    
+
     try:
         config_manager = ConfigManager()
         config_dict = config_manager.get_config_dict()
-        
+
         # Add CLI-specific options
         config_dict['cli_options'] = {
             'model': ctx.obj['model'],
@@ -82,9 +86,9 @@ def config(ctx):
             'debug': ctx.obj['debug'],
             'verbose': ctx.obj['verbose']
         }
-        
+
         formatter.print_config(config_dict)
-        
+
     except Exception as e:
         formatter.error(f"Failed to load configuration: {str(e)}")
         sys.exit(1)
@@ -95,13 +99,13 @@ def config(ctx):
 def templates(ctx):
     """List available prompt templates."""
     formatter = ctx.obj['formatter']
-    
+
     try:
         config_manager = ConfigManager()
         templates = config_manager.list_templates()
-        
+
         formatter.print_templates(templates)
-        
+
     except Exception as e:
         formatter.error(f"Failed to list templates: {str(e)}")
         sys.exit(1)
@@ -112,29 +116,32 @@ def templates(ctx):
 async def auth(ctx):
     """Test Gemini CLI authentication."""
     formatter = ctx.obj['formatter']
-    
+
     try:
         options = GeminiOptions(
             model=ctx.obj['model'],
             sandbox=ctx.obj['sandbox'],
             debug=ctx.obj['debug']
         )
-        
-        client = GeminiCLIClient(options)
-        
+
+        client = create_client(options, ConfigManager().config, use_cache=False)
+
         if ctx.obj['verbose']:
             formatter.info("Testing authentication with simple prompt...")
-        
+
         # Test with a simple prompt
-        response = await client.call_gemini("Say hello")
-        
+        try:
+            response = await client.call_gemini("Say hello")
+        finally:
+            await client.close()
+
         if response.success:
             auth_result = {
                 "authenticated": True,
                 "test_response": response.content[:100] + "..." if len(response.content) > 100 else response.content,
                 "model": options.model
             }
-            
+
             if ctx.obj['json']:
                 click.echo(json.dumps(auth_result, indent=2))
             else:
@@ -146,13 +153,13 @@ async def auth(ctx):
                 "authenticated": False,
                 "error": response.error
             }
-            
+
             if ctx.obj['json']:
                 click.echo(json.dumps(auth_result, indent=2))
             else:
                 formatter.error(f"Authentication test failed: {response.error}")
             sys.exit(1)
-            
+
     except Exception as e:
         if ctx.obj['json']:
             click.echo(json.dumps({"authenticated": False, "error": str(e)}, indent=2))
@@ -59,8 +59,13 @@ from src.cli.commands.status import status
     is_flag=True,
     help='Show input prompts and raw responses'
 )
+@click.option(
+    '--no-cache',
+    is_flag=True,
+    help='Do not reuse or store responses in the shared disk cache'
+)
 @click.pass_context
-def cli(ctx, config, verbose, debug, json, no_color, model, sandbox, show_prompts):
+def cli(ctx, config, verbose, debug, json, no_color, model, sandbox, show_prompts, no_cache):
     """
     Gemini MCP Server CLI - Test and use Gemini AI tools from the command line.
     
@@ -85,6 +90,7 @@ def cli(ctx, config, verbose, debug, json, no_color, model, sandbox, show_prompt
     ctx.obj['model'] = model
     ctx.obj['sandbox'] = sandbox
     ctx.obj['show_prompts'] = show_prompts
+    ctx.obj['use_cache'] = not no_cache
     
     # Create output formatter
     ctx.obj['formatter'] = OutputFormatter(
@@ -168,6 +174,7 @@ def examples(ctx):
   --debug             Enable debug information
   --model gemini-pro  Use different model
   --sandbox           Enable sandbox mode
+  --no-cache          Bypass the shared response cache
 
 For detailed help on any command:
   gemini-mcp-cli <command> --help
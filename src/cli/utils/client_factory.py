@@ -0,0 +1,58 @@
+"""
+Gemini client construction for CLI commands.
+"""
+
+from src.core.agent_backend import AgentBackend
+from src.core.auth import AuthVerdictStore
+from src.core.config import ServerConfig
+from src.core.disk_cache import DiskCache
+from src.core.gemini_client import GeminiBackend, GeminiCLIClient, GeminiOptions
+from src.core.http_backend import HttpBackend
+from src.core.retry import RetryPolicy
+
+
+def create_client(
+    options: GeminiOptions,
+    config: ServerConfig,
+    use_cache: bool = True
+) -> GeminiCLIClient:
+    """
+    Create a Gemini client for a CLI command.
+
+    The client shares the on-disk response cache and authentication
+    verdicts with other CLI runs and with the MCP server.
+
+    Args:
+        options: Gemini CLI options for this command
+        config: Server configuration
+        use_cache: Reuse responses from the shared disk cache
+
+    Returns:
+        Configured GeminiCLIClient
+    """
+    disk_cache = DiskCache.from_config(config) if use_cache else None
+    auth_store = AuthVerdictStore(config.cache_dir, ttl_seconds=config.auth_cache_ttl_seconds)
+    backend: GeminiBackend | None = None
+    if config.backend == "http":
+        backend = HttpBackend(
+            config.http_backend,
+            max_file_size_mb=config.max_file_size_mb,
+            max_response_chars=config.max_response_chars
+        )
+    elif config.backend == "agent":
+        backend = AgentBackend(
+            config.agent_backend,
+            max_file_size_mb=config.max_file_size_mb,
+            max_response_chars=config.max_response_chars
+        )
+    return GeminiCLIClient(
+        options,
+        disk_cache=disk_cache,
+        auth_store=auth_store,
+        max_context_files=config.max_context_files,
+        max_file_size_mb=config.max_file_size_mb,
+        max_response_chars=config.max_response_chars,
+        default_timeout=config.request_timeout_seconds,
+        retry_policy=RetryPolicy(config.retry),
+        backend=backend
+    )
@@ -0,0 +1,168 @@
+"""
+Adaptive concurrency control for Gemini calls.
+
+This module tunes each model's concurrency limit with additive increase,
+multiplicative decrease (AIMD): the limit grows by a step for every
+``limit`` healthy calls completed while the model was saturated, and is
+cut by a factor on throttling errors, timeouts or latency spikes.
+"""
+
+import math
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+
+from pydantic import BaseModel, Field
+
+# Weight of the newest sample in the healthy-latency moving average
+LATENCY_SMOOTHING = 0.2
+
+
+class AdaptiveConfig(BaseModel):
+    """Configuration for adaptive concurrency control."""
+
+    enabled: bool = Field(default=False, description="Tune concurrency limits automatically")
+    min_limit: int = Field(default=1, ge=1, description="Lowest concurrency limit")
+    max_limit: int = Field(default=16, ge=1, description="Highest concurrency limit")
+    increase_step: int = Field(
+        default=1, ge=1, description="Limit increase per round of healthy saturated calls"
+    )
+    decrease_factor: float = Field(
+        default=0.5, gt=0, lt=1, description="Limit multiplier on overload"
+    )
+    latency_spike_ratio: float = Field(
+        default=3.0, gt=1, description="Latency over this multiple of the average is a spike"
+    )
+    latency_ceiling_seconds: float | None = Field(
+        default=None, gt=0, description="Latency over this is always a spike"
+    )
+    history_size: int = Field(default=50, ge=1, description="Recent decisions kept")
+
+
+@dataclass
+class Decision:
+    """A change of a model's concurrency limit."""
+
+    timestamp: float
+    model: str
+    action: str
+    old_limit: int
+    new_limit: int
+    reason: str
+
+
+@dataclass
+class _ModelState:
+    """Latency baseline and increase credit for one model."""
+
+    latency_avg: float | None = None
+    credit: float = 0.0
+    last_decrease: float = 0.0
+
+
+class AIMDController:
+    """
+    AIMD controller producing new concurrency limits from call outcomes.
+
+    A decrease is applied once per overload episode: calls that started
+    before the last decrease do not cut the limit again.
+    """
+
+    def __init__(self, config: AdaptiveConfig | None = None):
+        """
+        Initialize the controller.
+
+        Args:
+            config: Adaptive configuration (uses defaults if None)
+        """
+        self.config = config or AdaptiveConfig()
+        self._states: dict[str, _ModelState] = {}
+        self._decisions: deque[Decision] | None = None
+
+    @property
+    def decisions(self) -> deque[Decision]:
+        """Recent limit changes, oldest first."""
+        if self._decisions is None:
+            self._decisions = deque(maxlen=self.config.history_size)
+        return self._decisions
+
+    def observe(
+        self,
+        model: str,
+        limit: int,
+        started_at: float,
+        latency: float,
+        saturated: bool,
+        overload: str | None = None
+    ) -> int:
+        """
+        Record a finished call and return the model's new limit.
+
+        Args:
+            model: Model the call ran against
+            limit: Current concurrency limit
+            started_at: Monotonic time the call took its slot
+            latency: Seconds the call held its slot
+            saturated: Whether every slot was in use or calls were queued
+            overload: Reason if the call failed from overload (e.g. throttling)
+
+        Returns:
+            The new concurrency limit
+        """
+        config = self.config
+        state = self._states.setdefault(model, _ModelState())
+
+        reason = overload
+        if reason is None:
+            if config.latency_ceiling_seconds is not None and latency > config.latency_ceiling_seconds:
+                reason = f"latency {latency:.1f}s over ceiling"
+            elif (
+                state.latency_avg is not None
+                and latency > config.latency_spike_ratio * state.latency_avg
+            ):
+                reason = f"latency {latency:.1f}s vs average {state.latency_avg:.1f}s"
+
+        if reason is not None:
+            if started_at < state.last_decrease:
+                return limit
+            new_limit = max(config.min_limit, math.floor(limit * config.decrease_factor))
+            state.last_decrease = time.monotonic()
+            state.credit = 0.0
+            self._record(model, "decrease", limit, new_limit, reason)
+            return new_limit
+
+        if state.latency_avg is None:
+            state.latency_avg = latency
+        else:
+            state.latency_avg += LATENCY_SMOOTHING * (latency - state.latency_avg)
+
+        if not saturated or limit >= config.max_limit:
+            return limit
+        state.credit += 1 / limit
+        if state.credit < 1:
+            return limit
+        state.credit = 0.0
+        new_limit = min(config.max_limit, limit + config.increase_step)
+        self._record(model, "increase", limit, new_limit, "healthy while saturated")
+        return new_limit
+
+    def _record(self, model: str, action: str, old: int, new: int, reason: str) -> None:
+        """Append a decision to the history."""
+        self.decisions.append(Decision(time.time(), model, action, old, new, reason))
+
+    def get_stats(self) -> dict[str, object]:
+        """
+        Get controller statistics.
+
+        Returns:
+            Dictionary with per-model healthy latency averages and the
+            recent decisions
+        """
+        return {
+            "latency_avg_seconds": {
+                model: round(state.latency_avg, 3)
+                for model, state in self._states.items()
+                if state.latency_avg is not None
+            },
+            "decisions": [asdict(decision) for decision in self.decisions],
+        }
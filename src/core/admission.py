@@ -0,0 +1,162 @@
+"""
+Admission control for Gemini tool requests.
+
+This module bounds the work the server accepts. A new request is turned
+away with a fast "busy" error when too many requests are pending, when
+their prompts hold too much memory, or when the estimated wait for a
+slot would be too long, instead of queueing until its deadline.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from pydantic import BaseModel, Field
+
+# Weight of the newest sample in the request duration moving average
+DURATION_SMOOTHING = 0.2
+
+
+class AdmissionConfig(BaseModel):
+    """Configuration for admission control."""
+
+    enabled: bool = Field(default=True, description="Reject requests while overloaded")
+    max_pending_requests: int = Field(
+        default=32, ge=1, description="Requests accepted but not yet finished"
+    )
+    max_pending_prompt_mb: float = Field(
+        default=32.0, gt=0, description="Total size of pending request text"
+    )
+    max_estimated_wait_seconds: float | None = Field(
+        default=120.0, gt=0, description="Reject when the estimated queue wait is longer"
+    )
+
+
+class ServerBusyError(Exception):
+    """Raised when a request is rejected by admission control."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass(eq=False)
+class _Pending:
+    """An admitted request."""
+
+    size: int
+    started_at: float
+
+
+class AdmissionController:
+    """
+    Accepts or rejects requests based on pending work.
+
+    The wait estimate is the number of pending requests times the average
+    request duration, divided by the number of calls that can run at once.
+    A request is always admitted when nothing is pending.
+    """
+
+    def __init__(self, config: AdmissionConfig | None = None, concurrency: int = 1):
+        """
+        Initialize the admission controller.
+
+        Args:
+            config: Admission configuration (uses defaults if None)
+            concurrency: Number of Gemini calls that run at once
+        """
+        self.config = config or AdmissionConfig()
+        self.concurrency = concurrency
+        self._pending: set[_Pending] = set()
+        self._pending_bytes = 0
+        self._duration_avg: float | None = None
+        self.admitted = 0
+        self.rejected: dict[str, int] = {}
+
+    def estimated_wait(self) -> float | None:
+        """
+        Estimate how long a new request would wait for a slot.
+
+        Returns:
+            Seconds, or None before any request has finished
+        """
+        if self._duration_avg is None:
+            return None
+        return len(self._pending) * self._duration_avg / max(self.concurrency, 1)
+
+    def _rejection(self, size: int) -> tuple[str, str] | None:
+        """Return the reason key and message if a request must be rejected."""
+        config = self.config
+        if not config.enabled or not self._pending:
+            return None
+
+        if len(self._pending) >= config.max_pending_requests:
+            return "pending_requests", f"{len(self._pending)} requests are pending"
+
+        limit = int(config.max_pending_prompt_mb * 1024 * 1024)
+        if self._pending_bytes + size > limit:
+            return "pending_bytes", (
+                f"pending requests hold {self._pending_bytes / 1024 / 1024:.1f} MB "
+                f"(limit {config.max_pending_prompt_mb} MB)"
+            )
+
+        wait = self.estimated_wait()
+        if (
+            config.max_estimated_wait_seconds is not None
+            and wait is not None
+            and wait > config.max_estimated_wait_seconds
+        ):
+            return "estimated_wait", f"estimated wait is {wait:.0f}s"
+        return None
+
+    @contextmanager
+    def admit(self, size: int) -> Iterator[None]:
+        """
+        Count a request as pending while the block runs.
+
+        Args:
+            size: Bytes of request text held while the request is pending
+
+        Raises:
+            ServerBusyError: If the server is too busy to take the request
+        """
+        rejection = self._rejection(size)
+        if rejection is not None:
+            reason, detail = rejection
+            self.rejected[reason] = self.rejected.get(reason, 0) + 1
+            retry_after = self._duration_avg
+            hint = f"; retry in about {retry_after:.0f}s" if retry_after is not None else ""
+            raise ServerBusyError(f"Server busy: {detail}{hint}", retry_after)
+
+        pending = _Pending(size, time.monotonic())
+        self._pending.add(pending)
+        self._pending_bytes += size
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self._pending.discard(pending)
+            self._pending_bytes -= size
+            duration = time.monotonic() - pending.started_at
+            if self._duration_avg is None:
+                self._duration_avg = duration
+            else:
+                self._duration_avg += DURATION_SMOOTHING * (duration - self._duration_avg)
+
+    def get_stats(self) -> dict[str, object]:
+        """
+        Get admission statistics.
+
+        Returns:
+            Dictionary with pending requests and bytes, the wait estimate,
+            and admitted and rejected counts
+        """
+        wait = self.estimated_wait()
+        return {
+            "pending": len(self._pending),
+            "pending_mb": round(self._pending_bytes / 1024 / 1024, 2),
+            "estimated_wait_seconds": round(wait, 1) if wait is not None else None,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+        }
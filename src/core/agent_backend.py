@@ -0,0 +1,599 @@
+"""
+Long-lived agent session backend for the Gemini CLI.
+
+This module runs the Gemini CLI as persistent agent processes that speak
+JSON-RPC over stdio (the Agent Client Protocol of ``gemini
+--experimental-acp``) instead of starting one CLI process per call. Node
+startup, authentication and model client setup then happen once per
+process. Every call opens its own agent session, so several calls are
+multiplexed over one process, and a process that crashes is replaced on
+the next call. A call that continues a conversation reuses the session of
+the conversation's earlier turns, so only the new turn is sent.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from .gemini_client import (
+    ChunkCallback,
+    GeminiBackend,
+    GeminiOptions,
+    GeminiResponse,
+    JsonBlockWatcher,
+    format_input_files,
+)
+from .output_buffer import BoundedText, TailBuffer
+from .process_group import kill_process_group, new_group_kwargs
+from .rate_limit import credential_id, is_rate_limit_error
+
+PROTOCOL_VERSION = 1
+
+# Longest JSON-RPC message line accepted from an agent
+MESSAGE_LIMIT = 16 * 1024 * 1024
+
+# Bytes of an agent's stderr kept for error messages
+STDERR_TAIL = 4096
+
+
+class AgentBackendConfig(BaseModel):
+    """Configuration for the agent session backend."""
+
+    command: list[str] = Field(
+        default_factory=lambda: ["gemini", "--experimental-acp"],
+        description="Command starting an agent process (the model is appended with -m)"
+    )
+    processes_per_model: int = Field(
+        default=2, ge=1, description="Agent processes kept per model and API key"
+    )
+    sessions_per_process: int = Field(
+        default=4, ge=1, description="Calls multiplexed over one process before another is started"
+    )
+    max_calls_per_process: int = Field(
+        default=500, ge=1, description="Calls after which a process is retired and replaced"
+    )
+    startup_timeout_seconds: float = Field(
+        default=30.0, gt=0, description="Time allowed for a process to start and initialize"
+    )
+
+
+class AgentError(Exception):
+    """Raised when an agent process fails or answers with a JSON-RPC error."""
+
+    def __init__(self, message: str, code: int | None = None):
+        super().__init__(message)
+        self.code = code
+
+
+class AgentProcess:
+    """One running agent process and its JSON-RPC connection."""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        """
+        Initialize the connection and start reading the process's output.
+
+        Args:
+            process: Agent process with piped stdin, stdout and stderr
+
+        Raises:
+            AgentError: If the process was started without pipes
+        """
+        if process.stdin is None or process.stdout is None or process.stderr is None:
+            raise AgentError("Agent process was started without pipes")
+        self.process = process
+        self._stdin = process.stdin
+        self._stdout = process.stdout
+        self.active = 0
+        self.calls = 0
+        self.retired = False
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future[Any]] = {}
+        self._sessions: dict[str, Callable[[str | None], None]] = {}
+        self._stderr = TailBuffer(STDERR_TAIL)
+        self._closed = False
+        self._reader = asyncio.ensure_future(self._read_stdout())
+        self._stderr_reader = asyncio.ensure_future(self._stderr.drain(process.stderr))
+
+    @classmethod
+    async def start(cls, command: list[str], env: dict[str, str], timeout: float) -> "AgentProcess":
+        """
+        Start and initialize an agent process.
+
+        Args:
+            command: Command line of the agent
+            env: Environment carrying the API key
+            timeout: Seconds allowed for startup and initialization
+
+        Returns:
+            The initialized agent
+
+        Raises:
+            AgentError: If the agent does not start or initialize
+        """
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+            limit=MESSAGE_LIMIT,
+            **new_group_kwargs()
+        )
+        agent = cls(process)
+        try:
+            await asyncio.wait_for(
+                agent.request("initialize", {
+                    "protocolVersion": PROTOCOL_VERSION,
+                    "clientCapabilities": {"fs": {"readTextFile": False, "writeTextFile": False}},
+                }),
+                timeout
+            )
+        except BaseException as e:
+            await agent.close()
+            if isinstance(e, asyncio.TimeoutError):
+                raise AgentError(f"Agent did not initialize within {timeout}s") from e
+            raise
+        return agent
+
+    @property
+    def pid(self) -> int:
+        """Process ID of the agent."""
+        return self.process.pid
+
+    @property
+    def alive(self) -> bool:
+        """Whether the agent can take calls."""
+        return not self._closed and self.process.returncode is None and not self._reader.done()
+
+    def _exit_error(self) -> AgentError:
+        """Describe the agent's exit, with the end of its stderr."""
+        tail = self._stderr.text().strip()
+        message = f"Agent process exited (exit code {self.process.returncode})"
+        return AgentError(f"{message}: {tail}" if tail else message)
+
+    def _send(self, message: dict[str, Any]) -> None:
+        """Write one JSON-RPC message without waiting for the pipe to drain."""
+        if not self.alive:
+            raise self._exit_error()
+        try:
+            self._stdin.write(json.dumps(message).encode('utf-8') + b"\n")
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise self._exit_error() from e
+
+    async def request(self, method: str, params: dict[str, Any]) -> Any:
+        """
+        Send a JSON-RPC request and wait for its result.
+
+        Args:
+            method: Method name
+            params: Method parameters
+
+        Returns:
+            The result
+
+        Raises:
+            AgentError: If the agent answers with an error or exits
+        """
+        request_id = next(self._ids)
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+            try:
+                await self._stdin.drain()
+            except (BrokenPipeError, ConnectionResetError) as e:
+                raise self._exit_error() from e
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    def notify(self, method: str, params: dict[str, Any]) -> None:
+        """
+        Send a JSON-RPC notification, ignoring an agent that has exited.
+
+        Args:
+            method: Method name
+            params: Method parameters
+        """
+        try:
+            self._send({"jsonrpc": "2.0", "method": method, "params": params})
+        except AgentError:
+            pass
+
+    def close_session(self, session_id: str) -> None:
+        """
+        Close a session that takes no more turns.
+
+        A turn still running in the session is cancelled. The agent
+        protocol has no call to free a session, so its state is released
+        when the process is retired.
+
+        Args:
+            session_id: Session from ``new_session``
+        """
+        self._sessions.pop(session_id, None)
+        self.notify("session/cancel", {"sessionId": session_id})
+
+    async def new_session(self) -> str:
+        """
+        Open an agent session.
+
+        Returns:
+            The session ID
+
+        Raises:
+            AgentError: If the agent fails the request or exits
+        """
+        session = await self.request("session/new", {"cwd": os.getcwd(), "mcpServers": []})
+        return session["sessionId"]
+
+    async def prompt(
+        self,
+        session_id: str,
+        text: str,
+        on_chunk: ChunkCallback | None,
+        output: BoundedText,
+        stop_after_json: bool = False
+    ) -> bool:
+        """
+        Run one prompt turn in a session.
+
+        The turn is cancelled once ``output`` is full.
+
+        Args:
+            session_id: Session from ``new_session``
+            text: Prompt text
+            on_chunk: Optional callback receiving message text as it arrives
+            output: Receives the message text
+            stop_after_json: Cancel the turn once the first ```json block is complete
+
+        Returns:
+            True if the turn was stopped after a complete ```json block
+
+        Raises:
+            AgentError: If the agent fails the prompt or exits
+        """
+        queue: asyncio.Queue[str | None] = asyncio.Queue()
+        self._sessions[session_id] = queue.put_nowait
+
+        turn = asyncio.ensure_future(self.request("session/prompt", {
+            "sessionId": session_id,
+            "prompt": [{"type": "text", "text": text}],
+        }))
+        # Updates precede the response on the wire, so None marks the end
+        turn.add_done_callback(lambda _: queue.put_nowait(None))
+
+        watcher = JsonBlockWatcher() if stop_after_json else None
+        stopped = False
+        try:
+            while (chunk := await queue.get()) is not None:
+                chunk = output.append(chunk)
+                if chunk and on_chunk is not None:
+                    await on_chunk(chunk)
+                if watcher is not None and watcher.feed(chunk):
+                    stopped = True
+                    break
+                if output.truncated:
+                    break
+            if not stopped and not output.truncated:
+                await turn
+        finally:
+            self._sessions.pop(session_id, None)
+            if not turn.done():
+                # Stopped early, truncated, cancelled or timed out: end the turn in the agent
+                self.notify("session/cancel", {"sessionId": session_id})
+                turn.cancel()
+        return stopped
+
+    async def _read_stdout(self) -> None:
+        """Dispatch messages from the agent until it exits."""
+        try:
+            while line := await self._stdout.readline():
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    # Not protocol traffic (e.g. a stray log line)
+                    continue
+                if isinstance(message, dict):
+                    self._dispatch(message)
+        except (ValueError, ConnectionResetError):
+            pass
+        finally:
+            await self.process.wait()
+            await asyncio.gather(self._stderr_reader, return_exceptions=True)
+            error = self._exit_error()
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            for listener in self._sessions.values():
+                listener(None)
+
+    def _dispatch(self, message: dict[str, Any]) -> None:
+        """Route a response, notification or agent request."""
+        method = message.get("method")
+        if method is None:
+            request_id = message.get("id")
+            future = self._pending.get(request_id) if isinstance(request_id, int) else None
+            if future is None or future.done():
+                return
+            if "error" in message:
+                error = message["error"] or {}
+                future.set_exception(AgentError(str(error.get("message")), error.get("code")))
+            else:
+                future.set_result(message.get("result"))
+            return
+
+        params = message.get("params") or {}
+        if "id" in message:
+            # Requests from the agent: tools are not offered, so deny them
+            if method == "session/request_permission":
+                result = {"outcome": {"outcome": "cancelled"}}
+                self._reply(message["id"], result=result)
+            else:
+                self._reply(message["id"], error={"code": -32601, "message": f"{method} not supported"})
+            return
+
+        if method == "session/update":
+            session_id = params.get("sessionId")
+            listener = self._sessions.get(session_id) if isinstance(session_id, str) else None
+            update = params.get("update") or {}
+            content = update.get("content") or {}
+            if (
+                listener is not None
+                and update.get("sessionUpdate") == "agent_message_chunk"
+                and content.get("type") == "text"
+            ):
+                listener(content.get("text", ""))
+
+    def _reply(self, request_id: Any, result: Any = None, error: dict[str, Any] | None = None) -> None:
+        """Answer a request from the agent."""
+        message: dict[str, Any] = {"jsonrpc": "2.0", "id": request_id}
+        if error is not None:
+            message["error"] = error
+        else:
+            message["result"] = result
+        try:
+            self._send(message)
+        except AgentError:
+            pass
+
+    async def close(self) -> None:
+        """Stop the agent process."""
+        self._closed = True
+        kill_process_group(self.process)
+        await asyncio.gather(self._reader, return_exceptions=True)
+
+
+class AgentBackend(GeminiBackend):
+    """Runs calls as sessions on long-lived Gemini CLI agent processes."""
+
+    name = "agent"
+    uses_cli = True
+    keeps_conversations = True
+
+    def __init__(
+        self,
+        config: AgentBackendConfig | None = None,
+        max_file_size_mb: float | None = None,
+        max_response_chars: int | None = None
+    ):
+        """
+        Initialize the backend.
+
+        Agent processes are started on first use, one group per model and
+        API key.
+
+        Args:
+            config: Agent backend configuration (uses defaults if None)
+            max_file_size_mb: Input files larger than this are skipped
+            max_response_chars: Longer answers are truncated and flagged
+        """
+        self.config = config or AgentBackendConfig()
+        self.max_file_size_mb = max_file_size_mb
+        self.max_response_chars = max_response_chars
+        self._agents: dict[tuple[str, str], list[AgentProcess]] = {}
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+        # Conversation handle -> agent and session holding its turns
+        self._conversations: dict[str, tuple[AgentProcess, str]] = {}
+        self.started = 0
+        self.restarts = 0
+
+    async def _acquire(self, model: str, env: dict[str, str]) -> AgentProcess:
+        """
+        Pick an agent process for a call, starting one if needed.
+
+        The least busy process with a free session is used. A new process
+        is started when all are busy and the per-model limit allows it;
+        otherwise the least busy process takes the call anyway.
+
+        Args:
+            model: Model the call runs against
+            env: Environment carrying the API key
+
+        Returns:
+            Agent with the call counted as active
+        """
+        key = (model, credential_id(env))
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            agents = self._agents.setdefault(key, [])
+            for agent in [agent for agent in agents if not agent.alive]:
+                agents.remove(agent)
+                if not agent.retired:
+                    self.restarts += 1
+
+            live = [agent for agent in agents if not agent.retired]
+            free = [agent for agent in live if agent.active < self.config.sessions_per_process]
+            if free or len(live) >= self.config.processes_per_model:
+                agent = min(free or live, key=lambda agent: agent.active)
+            else:
+                agent = await AgentProcess.start(
+                    [*self.config.command, "-m", model], env, self.config.startup_timeout_seconds
+                )
+                agents.append(agent)
+                self.started += 1
+
+            self._claim(agent)
+            return agent
+
+    def _claim(self, agent: AgentProcess) -> None:
+        """Count a call as active on an agent, retiring it at its call limit."""
+        agent.active += 1
+        agent.calls += 1
+        if agent.calls >= self.config.max_calls_per_process:
+            agent.retired = True
+
+    async def _release(self, agent: AgentProcess) -> None:
+        """End a call, closing the agent if it is retired and idle."""
+        agent.active -= 1
+        if agent.retired and agent.active == 0:
+            await agent.close()
+
+    async def generate(
+        self,
+        prompt: str,
+        options: GeminiOptions,
+        input_files: list[str | Path],
+        on_chunk: ChunkCallback | None,
+        env: dict[str, str]
+    ) -> GeminiResponse:
+        """
+        Run one prompt in a session on an agent process.
+
+        Args:
+            prompt: The prompt to send
+            options: Call options (CLI flags other than the model are not applied)
+            input_files: Files to include ahead of the prompt
+            on_chunk: Optional callback receiving message text as it arrives
+            env: Environment carrying the API key
+
+        Returns:
+            GeminiResponse with the result
+        """
+        metadata: dict[str, Any] = {"backend": self.name, "model": options.model}
+
+        def failure(error: str) -> GeminiResponse:
+            if is_rate_limit_error(error):
+                metadata["rate_limited"] = True
+            return GeminiResponse(
+                content="", success=False, error=error, input_prompt=prompt, metadata=metadata
+            )
+
+        if input_files:
+            blocks = await asyncio.to_thread(format_input_files, input_files, self.max_file_size_mb)
+            text = "".join(blocks) + prompt
+        else:
+            text = prompt
+
+        conversation_id = options.conversation_id
+        resumed = False
+        try:
+            if conversation_id is not None and self.has_conversation(conversation_id):
+                agent, session_id = self._conversations[conversation_id]
+                self._claim(agent)
+                resumed = True
+            else:
+                agent = await self._acquire(options.model, env)
+                session_id = None
+        except (AgentError, OSError) as e:
+            return failure(f"Subprocess error: could not start agent: {str(e)}")
+
+        metadata["agent_pid"] = agent.pid
+        output = BoundedText(self.max_response_chars)
+        completed = False
+        try:
+            if session_id is None:
+                session_id = await agent.new_session()
+                if conversation_id is not None:
+                    self._conversations[conversation_id] = (agent, session_id)
+            stopped = await agent.prompt(
+                session_id, text, on_chunk, output, options.stop_after_json
+            )
+            completed = True
+        except AgentError as e:
+            if agent.alive:
+                metadata["status_code"] = e.code
+            else:
+                metadata["exit_code"] = agent.process.returncode
+            return failure(str(e))
+        finally:
+            if not completed and conversation_id is not None:
+                # The session may hold a half-written turn, so a retry
+                # starts over from the conversation's transcript
+                self.end_conversation(conversation_id)
+            await self._release(agent)
+
+        if conversation_id is not None:
+            metadata["conversation_resumed"] = resumed
+        if stopped:
+            metadata["stopped_early"] = True
+        if output.truncated:
+            metadata["truncated"] = True
+        return GeminiResponse(
+            content=output.getvalue().strip(),
+            success=True,
+            input_prompt=prompt,
+            metadata={**metadata, "files_included": len(input_files)}
+        )
+
+    def has_conversation(self, conversation_id: str) -> bool:
+        """
+        Check whether a conversation's session is still open on a live agent.
+
+        Args:
+            conversation_id: Conversation handle
+
+        Returns:
+            True if a follow-up only needs to send the new turn
+        """
+        entry = self._conversations.get(conversation_id)
+        if entry is None:
+            return False
+        if not entry[0].alive:
+            del self._conversations[conversation_id]
+            return False
+        return True
+
+    def end_conversation(self, conversation_id: str) -> None:
+        """
+        Close a conversation's session and forget it.
+
+        Called when a conversation expires or is dropped, and when one of
+        its turns fails.
+
+        Args:
+            conversation_id: Conversation handle
+        """
+        entry = self._conversations.pop(conversation_id, None)
+        if entry is not None:
+            agent, session_id = entry
+            agent.close_session(session_id)
+
+    def get_stats(self) -> dict[str, object]:
+        """
+        Get agent process statistics.
+
+        Returns:
+            Dictionary with running processes, active calls, open
+            conversations, and started and restarted process counts
+        """
+        agents = [agent for group in self._agents.values() for agent in group if agent.alive]
+        return {
+            "processes": len(agents),
+            "active_calls": sum(agent.active for agent in agents),
+            "conversations": len(self._conversations),
+            "started": self.started,
+            "restarts": self.restarts,
+        }
+
+    async def close(self) -> None:
+        """Stop all agent processes."""
+        agents = [agent for group in self._agents.values() for agent in group]
+        self._agents.clear()
+        self._conversations.clear()
+        await asyncio.gather(*(agent.close() for agent in agents), return_exceptions=True)
@@ -0,0 +1,203 @@
+"""
+Authentication checks for the Gemini CLI.
+
+This module verifies that the Gemini CLI is installed and that credentials
+are available without making a model call, and persists positive verdicts
+on disk so that short-lived CLI processes can reuse them.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from .disk_cache import default_cache_dir
+
+# Project-level .env file consulted for GEMINI_API_KEY
+ENV_FILE = Path(__file__).parent.parent.parent / '.env'
+
+_AUTH_ERROR_PATTERN = re.compile(
+    r"\b(401|403)\b|UNAUTHENTICATED|PERMISSION_DENIED|API key not valid|invalid api key"
+    r"|not logged in|login required|Authentication test failed|Gemini CLI not found",
+    re.IGNORECASE
+)
+
+
+def find_gemini_cli() -> str | None:
+    """
+    Locate the Gemini CLI executable on PATH.
+
+    Returns:
+        Absolute path to the executable, or None if it is not installed
+    """
+    return shutil.which('gemini')
+
+
+def resolve_api_key(env_file: Path = ENV_FILE) -> str:
+    """
+    Resolve GEMINI_API_KEY from the environment or the project .env file.
+
+    Args:
+        env_file: .env file to fall back to
+
+    Returns:
+        The API key, or an empty string if none is configured
+    """
+    api_key = os.getenv('GEMINI_API_KEY', '')
+    if not api_key and env_file.exists():
+        with open(env_file) as f:
+            for line in f:
+                if line.startswith('GEMINI_API_KEY='):
+                    api_key = line.split('=', 1)[1].strip()
+                    break
+    return api_key
+
+
+def is_auth_error(message: str | None) -> bool:
+    """
+    Check whether a CLI error message reports missing or rejected credentials.
+
+    Args:
+        message: Error output from the CLI or the authentication check
+
+    Returns:
+        True if the message looks like an authentication error
+    """
+    return message is not None and _AUTH_ERROR_PATTERN.search(message) is not None
+
+
+def detect_credential_source(env: dict[str, str]) -> str | None:
+    """
+    Detect which kind of credentials the Gemini CLI will use.
+
+    Args:
+        env: Environment the CLI will run with
+
+    Returns:
+        Name of the credential source, or None if none was found
+    """
+    if env.get('GEMINI_API_KEY'):
+        return 'gemini_api_key'
+    if env.get('GOOGLE_API_KEY'):
+        return 'google_api_key'
+    if env.get('GOOGLE_GENAI_USE_VERTEXAI') and env.get('GOOGLE_CLOUD_PROJECT'):
+        return 'vertex_ai'
+
+    adc = env.get('GOOGLE_APPLICATION_CREDENTIALS')
+    if adc and Path(adc).exists():
+        return 'service_account'
+
+    home = Path.home()
+    if (home / '.gemini' / 'oauth_creds.json').exists():
+        return 'gemini_oauth'
+    if (home / '.config' / 'gcloud' / 'application_default_credentials.json').exists():
+        return 'gcloud_adc'
+    return None
+
+
+def auth_fingerprint(cli_path: str, env: dict[str, str], source: str | None) -> str:
+    """
+    Fingerprint the CLI installation and credentials a verdict applies to.
+
+    Secrets are only included as hashes.
+
+    Args:
+        cli_path: Path to the Gemini CLI executable
+        env: Environment the CLI will run with
+        source: Detected credential source
+
+    Returns:
+        Hex digest that changes when the CLI or credentials change
+    """
+    try:
+        cli_mtime = os.stat(cli_path).st_mtime_ns
+    except OSError:
+        cli_mtime = None
+    parts = [
+        cli_path,
+        str(cli_mtime),
+        str(source),
+        hashlib.sha256(env.get('GEMINI_API_KEY', '').encode('utf-8')).hexdigest(),
+        hashlib.sha256(env.get('GOOGLE_API_KEY', '').encode('utf-8')).hexdigest(),
+        env.get('GOOGLE_CLOUD_PROJECT', ''),
+    ]
+    return hashlib.sha256("\0".join(parts).encode('utf-8')).hexdigest()
+
+
+class AuthVerdictStore:
+    """
+    On-disk record of successful authentication checks.
+
+    Verdicts are keyed by ``auth_fingerprint`` and expire after a TTL.
+    """
+
+    def __init__(self, cache_dir: Path | str | None = None, ttl_seconds: float = 3600):
+        """
+        Initialize the verdict store.
+
+        Args:
+            cache_dir: Directory holding the verdict file (uses default if None)
+            ttl_seconds: How long a positive verdict stays valid
+        """
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+
+    @property
+    def path(self) -> Path:
+        """Path of the verdict file."""
+        directory = Path(self.cache_dir) if self.cache_dir else default_cache_dir()
+        return directory / 'auth_verdicts.json'
+
+    def _load(self) -> dict[str, float]:
+        """Read all stored verdicts, ignoring a missing or corrupt file."""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def is_verified(self, fingerprint: str) -> bool:
+        """
+        Check for an unexpired positive verdict.
+
+        Args:
+            fingerprint: Fingerprint from ``auth_fingerprint``
+
+        Returns:
+            True if a valid verdict is stored
+        """
+        verified_at = self._load().get(fingerprint)
+        return isinstance(verified_at, (int, float)) and time.time() - verified_at < self.ttl_seconds
+
+    def record(self, fingerprint: str) -> None:
+        """
+        Store a positive verdict, dropping expired ones.
+
+        The file is replaced atomically so concurrent processes never read
+        a partial write.
+
+        Args:
+            fingerprint: Fingerprint from ``auth_fingerprint``
+        """
+        now = time.time()
+        verdicts = {
+            key: value for key, value in self._load().items()
+            if isinstance(value, (int, float)) and now - value < self.ttl_seconds
+        }
+        verdicts[fingerprint] = now
+
+        path = self.path
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(verdicts, f)
+            os.replace(temp_path, path)
+        except OSError:
+            # Persisting is an optimization; the in-process verdict still holds
+            pass
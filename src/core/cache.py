@@ -0,0 +1,206 @@
+"""
+In-process response cache for Gemini calls.
+
+This module provides an LRU cache with TTL expiry for successful Gemini
+responses, bounded by both entry count and total size in bytes.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .gemini_client import GeminiOptions, GeminiResponse
+
+
+def make_cache_key(
+    prompt: str,
+    options: "GeminiOptions",
+    input_files: list[str | Path] | None = None
+) -> str:
+    """
+    Build a cache key for a Gemini call.
+
+    The key covers the model, every CLI option, a hash of the full prompt
+    and the path, size and modification time of each input file. The
+    conversation ID is left out: a conversation's first call can share a
+    result with the same call made outside it.
+
+    Args:
+        prompt: The full prompt sent to Gemini
+        options: CLI options used for the call
+        input_files: Optional files included in context
+
+    Returns:
+        Hex digest identifying the call
+    """
+    files = []
+    for file_path in input_files or []:
+        try:
+            stat = os.stat(file_path)
+            files.append([str(file_path), stat.st_size, stat.st_mtime_ns])
+        except OSError:
+            files.append([str(file_path), None, None])
+
+    key_data = {
+        "model": options.model,
+        "options": options.model_dump(exclude={"conversation_id"}),
+        "prompt_sha256": hashlib.sha256(prompt.encode('utf-8')).hexdigest(),
+        "files": files,
+    }
+    encoded = json.dumps(key_data, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def response_size(response: "GeminiResponse") -> int:
+    """Estimate the memory footprint of a response in bytes."""
+    return len(response.content.encode('utf-8')) + len(response.input_prompt.encode('utf-8'))
+
+
+@dataclass
+class _CacheEntry:
+    """A cached response with its size and timestamps."""
+
+    response: "GeminiResponse"
+    size: int
+    created_at: float
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    LRU cache of successful Gemini responses with TTL expiry.
+
+    Entries are evicted least recently used first whenever the entry count
+    or the total size exceeds its bound.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 3600,
+        max_entries: int = 256,
+        max_size_mb: float = 64.0
+    ):
+        """
+        Initialize the response cache.
+
+        Args:
+            ttl_seconds: Time to live for each entry
+            max_entries: Maximum number of cached responses
+            max_size_mb: Maximum total size of cached responses in megabytes
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_size_mb = max_size_mb
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_bytes(self) -> int:
+        """Maximum total size of cached responses in bytes."""
+        return int(self.max_size_mb * 1024 * 1024)
+
+    def get(self, key: str) -> "GeminiResponse | None":
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from ``make_cache_key``
+
+        Returns:
+            Copy of the cached response marked as cached, or None on a miss
+        """
+        entry = self._entries.get(key)
+        now = time.time()
+        if entry is None or entry.expires_at <= now:
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        metadata = {
+            **entry.response.metadata,
+            "cached": True,
+            "cache_tier": "memory",
+            "cache_age_seconds": round(now - entry.created_at, 3),
+        }
+        return entry.response.model_copy(update={"metadata": metadata})
+
+    def put(self, key: str, response: "GeminiResponse") -> None:
+        """
+        Store a successful response.
+
+        Failed responses and responses larger than the whole cache are ignored.
+
+        Args:
+            key: Cache key from ``make_cache_key``
+            response: Response to cache
+        """
+        if not response.success:
+            return
+
+        size = response_size(response)
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        now = time.time()
+        self._entries[key] = _CacheEntry(
+            response=response,
+            size=size,
+            created_at=now,
+            expires_at=now + self.ttl_seconds,
+        )
+        self._total_bytes += size
+        self._evict()
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry and update the size accounting."""
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.size
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until within both bounds."""
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        self._entries.clear()
+        self._total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with entry count, size and hit/miss counters
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "total_bytes": self._total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,202 @@
+"""
+Circuit breaker for a failing Gemini backend.
+
+This module stops calls from spawning Gemini CLI processes while the
+backend is known to be broken. A model's circuit opens after a run of
+consecutive failures; while open, calls fail immediately. After a reset
+timeout one probe call is let through (half-open), and its outcome closes
+or reopens the circuit. Authentication failures are additionally cached
+for all models for a short time, since no call can succeed until the
+credentials are fixed.
+"""
+
+import time
+from dataclasses import dataclass
+
+from pydantic import BaseModel, Field
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreakerConfig(BaseModel):
+    """Configuration for the circuit breaker."""
+
+    enabled: bool = Field(default=True, description="Fail fast while the backend is failing")
+    failure_threshold: int = Field(
+        default=5, ge=1, description="Consecutive failures that open a model's circuit"
+    )
+    reset_timeout_seconds: float = Field(
+        default=30.0, gt=0, description="Time an open circuit waits before a probe call"
+    )
+    auth_error_ttl_seconds: float = Field(
+        default=60.0, ge=0, description="How long an authentication failure is reused"
+    )
+
+
+@dataclass
+class _Circuit:
+    """State of one model's circuit."""
+
+    state: str = CLOSED
+    failures: int = 0
+    opened_at: float = 0.0
+    probing: bool = False
+    last_error: str | None = None
+    trips: int = 0
+    rejected: int = 0
+
+
+class CircuitBreaker:
+    """Per-model circuit breaker with a shared authentication failure cache."""
+
+    def __init__(self, config: CircuitBreakerConfig | None = None):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            config: Circuit breaker configuration (uses defaults if None)
+        """
+        self.config = config or CircuitBreakerConfig()
+        self._circuits: dict[str, _Circuit] = {}
+        self._auth_error: str | None = None
+        self._auth_error_until = 0.0
+
+    def _circuit(self, model: str) -> _Circuit:
+        """Get or create the circuit for a model."""
+        return self._circuits.setdefault(model, _Circuit())
+
+    def check(self, model: str) -> str | None:
+        """
+        Decide whether a call may go ahead.
+
+        In the half-open state only one call at a time is let through as
+        a probe; the caller must report its outcome.
+
+        Args:
+            model: Model the call runs against
+
+        Returns:
+            None if the call may proceed, otherwise the fast-fail error
+        """
+        if not self.config.enabled:
+            return None
+
+        rejection = self.auth_rejection()
+        if rejection is not None:
+            return rejection
+
+        now = time.monotonic()
+        circuit = self._circuit(model)
+        if circuit.state == OPEN:
+            remaining = circuit.opened_at + self.config.reset_timeout_seconds - now
+            if remaining > 0:
+                circuit.rejected += 1
+                return (
+                    f"Gemini backend for {model} is unavailable after "
+                    f"{circuit.failures} consecutive failures (retrying in {remaining:.0f}s): "
+                    f"{circuit.last_error}"
+                )
+            circuit.state = HALF_OPEN
+
+        if circuit.state == HALF_OPEN:
+            if circuit.probing:
+                circuit.rejected += 1
+                return f"Gemini backend for {model} is being probed after failures; try again shortly"
+            circuit.probing = True
+        return None
+
+    def auth_rejection(self) -> str | None:
+        """
+        Get the cached authentication failure, if one is still fresh.
+
+        Returns:
+            The fast-fail error, or None if no failure is cached
+        """
+        if not self.config.enabled or self._auth_error is None:
+            return None
+        remaining = self._auth_error_until - time.monotonic()
+        if remaining <= 0:
+            return None
+        return f"Authentication failed recently (retrying in {remaining:.0f}s): {self._auth_error}"
+
+    def record_success(self, model: str) -> None:
+        """
+        Record a successful call, closing the circuit.
+
+        Args:
+            model: Model the call ran against
+        """
+        circuit = self._circuit(model)
+        circuit.state = CLOSED
+        circuit.failures = 0
+        circuit.probing = False
+        self._auth_error = None
+
+    def record_failure(self, model: str, error: str | None, auth: bool = False) -> None:
+        """
+        Record a failed call, opening the circuit at the threshold.
+
+        Args:
+            model: Model the call ran against
+            error: Error message of the failure
+            auth: Whether the failure was an authentication error
+        """
+        if auth:
+            self.record_auth_failure(error)
+
+        circuit = self._circuit(model)
+        circuit.failures += 1
+        circuit.last_error = error
+        circuit.probing = False
+        if circuit.state == HALF_OPEN or circuit.failures >= self.config.failure_threshold:
+            if circuit.state != OPEN:
+                circuit.trips += 1
+            circuit.state = OPEN
+            circuit.opened_at = time.monotonic()
+
+    def record_auth_failure(self, error: str | None) -> None:
+        """
+        Cache an authentication failure for all models.
+
+        Args:
+            error: Error message of the failure
+        """
+        self._auth_error = error or "authentication failed"
+        self._auth_error_until = time.monotonic() + self.config.auth_error_ttl_seconds
+
+    def record_inconclusive(self, model: str) -> None:
+        """
+        Record a call that says nothing about backend health.
+
+        Cancelled, rate limited and rejected-input calls release a probe
+        without changing the circuit state.
+
+        Args:
+            model: Model the call ran against
+        """
+        self._circuit(model).probing = False
+
+    def get_stats(self) -> dict[str, object]:
+        """
+        Get circuit states.
+
+        Returns:
+            Dictionary with per-model state, consecutive failures, trips and
+            fast-failed calls, plus any cached authentication failure
+        """
+        stats: dict[str, object] = {
+            model: {
+                "state": circuit.state,
+                "consecutive_failures": circuit.failures,
+                "trips": circuit.trips,
+                "rejected": circuit.rejected,
+                "last_error": circuit.last_error,
+            }
+            for model, circuit in self._circuits.items()
+        }
+        remaining = self._auth_error_until - time.monotonic()
+        if self._auth_error is not None and remaining > 0:
+            stats["auth_error"] = {"error": self._auth_error, "expires_in_seconds": round(remaining, 1)}
+        return stats
@@ -6,10 +6,23 @@ and template management.
 """
 
 from pathlib import Path
+from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
+from .admission import AdmissionConfig
+from .agent_backend import AgentBackendConfig
+from .circuit_breaker import CircuitBreakerConfig
+from .conversations import ConversationConfig
+from .credentials import CredentialPoolConfig
 from .gemini_client import GeminiOptions
+from .hedging import HedgeConfig
+from .http_backend import HttpBackendConfig
+from .process_pool import ProcessPoolConfig
+from .rate_limit import RateLimitConfig
+from .retry import RetryConfig
+from .routing import RoutingConfig
+from .scheduler import SchedulerConfig
 
 
 class ServerConfig(BaseModel):
@@ -31,11 +44,109 @@ class ServerConfig(BaseModel):
     # Server behavior
     enable_caching: bool = Field(default=True, description="Enable response caching")
     cache_ttl_seconds: int = Field(default=3600, description="Cache TTL in seconds")
+    cache_max_entries: int = Field(default=256, description="Maximum cached responses")
+    cache_max_size_mb: float = Field(default=64.0, description="Maximum total cache size")
+    disk_cache_enabled: bool = Field(
+        default=True, description="Share cached responses between processes on disk"
+    )
+    disk_cache_max_size_mb: float = Field(default=256.0, description="Maximum disk cache size")
+    cache_dir: Path | None = Field(
+        default=None,
+        description="Disk cache directory (defaults to GEMINI_MCP_CACHE_DIR or ~/.cache/gemini-mcp)"
+    )
+    auth_cache_ttl_seconds: int = Field(
+        default=3600, description="How long a successful authentication check is reused"
+    )
     max_file_size_mb: float = Field(default=10.0, description="Maximum file size to process")
     max_context_files: int = Field(default=20, description="Maximum files to include in context")
+    max_response_chars: int | None = Field(
+        default=2_000_000, gt=0, description="Longest response kept; longer output is truncated and flagged"
+    )
+    stream_progress: bool = Field(
+        default=True, description="Forward partial Gemini output as MCP progress notifications"
+    )
+    request_timeout_seconds: float | None = Field(
+        default=300.0, gt=0, description="Default deadline for a Gemini call"
+    )
+    stop_after_json_tools: list[str] = Field(
+        default_factory=lambda: ["gemini_review_code"],
+        description="Tools whose calls stop as soon as a complete ```json answer has arrived"
+    )
+
+    # Backend settings
+    backend: Literal["subprocess", "http", "agent"] = Field(
+        default="subprocess",
+        description=(
+            "Run calls through one Gemini CLI process each, the Gemini API over HTTP, "
+            "or long-lived Gemini CLI agent processes"
+        )
+    )
+    http_backend: HttpBackendConfig = Field(
+        default_factory=HttpBackendConfig,
+        description="Connection settings for the HTTP backend"
+    )
+    agent_backend: AgentBackendConfig = Field(
+        default_factory=AgentBackendConfig,
+        description="Process settings for the agent backend"
+    )
+
+    # Process pool settings
+    process_pool: ProcessPoolConfig = Field(
+        default_factory=ProcessPoolConfig,
+        description="Warm Gemini process pool settings"
+    )
+
+    # Scheduling settings
+    scheduler: SchedulerConfig = Field(
+        default_factory=SchedulerConfig,
+        description="Concurrency limits and fair queueing for Gemini calls"
+    )
+    rate_limit: RateLimitConfig = Field(
+        default_factory=RateLimitConfig,
+        description="Per-model and per-key request and token quotas"
+    )
+    credential_pool: CredentialPoolConfig = Field(
+        default_factory=CredentialPoolConfig,
+        description="API keys to spread calls over"
+    )
+    retry: RetryConfig = Field(
+        default_factory=RetryConfig,
+        description="Retries of transient failures and the shared retry budget"
+    )
+    hedging: HedgeConfig = Field(
+        default_factory=HedgeConfig,
+        description="Hedged calls for slow requests"
+    )
+    circuit_breaker: CircuitBreakerConfig = Field(
+        default_factory=CircuitBreakerConfig,
+        description="Fail fast while the Gemini backend is failing"
+    )
+    admission: AdmissionConfig = Field(
+        default_factory=AdmissionConfig,
+        description="Rejection of new requests while the server is overloaded"
+    )
+    routing: RoutingConfig = Field(
+        default_factory=RoutingConfig,
+        description="Per-request model choice from prompt size and tool"
+    )
+    conversations: ConversationConfig = Field(
+        default_factory=ConversationConfig,
+        description="Conversation IDs that let follow-up tool calls leave out earlier code"
+    )
 
     # Template settings
     templates_dir: Path | None = Field(default=None, description="Custom templates directory")
+    prompt_layout: Literal["template", "cacheable"] = Field(
+        default="template",
+        description=(
+            "Lay prompts out as the tool templates do, or from most to least stable content "
+            "so that providers can reuse the cached prefix"
+        )
+    )
+    shared_context_files: list[Path] = Field(
+        default_factory=list,
+        description="Repository files sent ahead of every tool prompt in the cacheable layout"
+    )
 
     class Config:
         """Pydantic config."""
@@ -49,6 +160,14 @@ class PromptTemplate(BaseModel):
     description: str = Field(description="Template description")
     system_prompt: str = Field(description="System-level instructions")
     user_template: str = Field(description="User prompt template with placeholders")
+    document_template: str | None = Field(
+        default=None,
+        description="Stable part of the user prompt (e.g. the code) for the cacheable layout"
+    )
+    question_template: str | None = Field(
+        default=None,
+        description="Request-specific part of the user prompt for the cacheable layout"
+    )
     variables: dict[str, str] = Field(
         default_factory=dict,
         description="Template variable descriptions"
@@ -67,6 +186,27 @@ class PromptTemplate(BaseModel):
         user_prompt = self.user_template.format(**kwargs)
         return self.system_prompt, user_prompt
 
+    def format_layered(self, **kwargs: Any) -> tuple[str, str, str]:
+        """
+        Format the template for the cacheable layout.
+
+        Templates without document and question parts put the whole user
+        prompt in the question.
+
+        Args:
+            **kwargs: Variables to substitute in template
+
+        Returns:
+            Tuple of (system_prompt, document, question)
+        """
+        if self.document_template is None or self.question_template is None:
+            return self.system_prompt, "", self.user_template.format(**kwargs)
+        return (
+            self.system_prompt,
+            self.document_template.format(**kwargs),
+            self.question_template.format(**kwargs)
+        )
+
 
 class ConfigManager:
     """Manages server configuration and templates."""
@@ -103,6 +243,8 @@ class ConfigManager:
                 "```{language}\n{code}\n```\n\n"
                 "{focus_instruction}"
             ),
+            document_template="```{language}\n{code}\n```",
+            question_template="Please review the {language} code above.\n\n{focus_instruction}",
             variables={
                 "language": "Programming language",
                 "code": "Code to review",
@@ -130,6 +272,12 @@ class ConfigManager:
                 "Context: {context}\n\n"
                 "Focus areas: {focus_areas}"
             ),
+            document_template="{feature_plan}",
+            question_template=(
+                "Please review the feature plan above.\n\n"
+                "Context: {context}\n\n"
+                "Focus areas: {focus_areas}"
+            ),
             variables={
                 "feature_plan": "Feature plan document",
                 "context": "Project context and constraints",
@@ -157,6 +305,13 @@ class ConfigManager:
                 "Environment: {environment}\n\n"
                 "Steps to reproduce: {reproduction_steps}"
             ),
+            document_template="Relevant Code:\n```{language}\n{code_context}\n```",
+            question_template=(
+                "Bug Description: {bug_description}\n\n"
+                "Error Logs:\n{error_logs}\n\n"
+                "Environment: {environment}\n\n"
+                "Steps to reproduce: {reproduction_steps}"
+            ),
             variables={
                 "bug_description": "Description of the bug",
                 "error_logs": "Error messages and logs",
@@ -187,6 +342,12 @@ class ConfigManager:
                 "Detail level: {detail_level}\n"
                 "Specific questions: {questions}"
             ),
+            document_template="```{language}\n{code}\n```",
+            question_template=(
+                "Please explain the {language} code above.\n\n"
+                "Detail level: {detail_level}\n"
+                "Specific questions: {questions}"
+            ),
             variables={
                 "language": "Programming language",
                 "code": "Code to explain",
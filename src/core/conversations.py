@@ -0,0 +1,212 @@
+"""
+Conversation handles for multi-turn tool calls.
+
+This module keeps the turns of tool calls that clients may follow up on.
+A tool response carries a conversation ID; a later call that passes it
+back can leave out the code it already sent and ask only the new
+question. Backends that keep session state (the agent backend) then
+receive just that new turn; other backends receive the earlier turns
+replayed ahead of it.
+"""
+
+import asyncio
+import secrets
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from pydantic import BaseModel, Field
+
+
+class ConversationConfig(BaseModel):
+    """Configuration for conversation handles."""
+
+    enabled: bool = Field(default=True, description="Return conversation IDs from tool calls")
+    ttl_seconds: float = Field(
+        default=1800.0, gt=0, description="Idle time after which a conversation is forgotten"
+    )
+    max_conversations: int = Field(
+        default=100, ge=1, description="Conversations kept; the least recently used is dropped"
+    )
+    max_replayed_turns: int = Field(
+        default=10, ge=1, description="Turns replayed to backends without session state"
+    )
+    max_turns: int = Field(
+        default=20, ge=2, description="Turns kept per conversation; the oldest follow-ups are dropped"
+    )
+    max_conversation_chars: int = Field(
+        default=200_000,
+        ge=1,
+        description="Prompt and answer characters kept per conversation; one whose "
+                    "first and latest turn exceed this is closed"
+    )
+
+
+@dataclass
+class Turn:
+    """One prompt and its answer."""
+
+    prompt: str
+    response: str
+
+    def chars(self) -> int:
+        """Return the characters the turn holds."""
+        return len(self.prompt) + len(self.response)
+
+
+@dataclass(eq=False)
+class Conversation:
+    """The turns of a conversation and the model it runs on."""
+
+    id: str
+    model: str
+    turns: list[Turn] = field(default_factory=list)
+    last_used: float = 0.0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def transcript(self, max_turns: int) -> str:
+        """
+        Render earlier turns for a backend without session state.
+
+        The first turn, which carries the code, is always kept; when there
+        are more than ``max_turns`` turns the oldest follow-ups are left out.
+
+        Args:
+            max_turns: Most turns to include
+
+        Returns:
+            The turns as alternating user and model messages
+        """
+        turns = self.turns
+        if len(turns) > max_turns:
+            turns = [turns[0], *turns[len(turns) - max_turns + 1:]]
+        return "\n\n".join(
+            f"User: {turn.prompt}\n\nGemini: {turn.response}" for turn in turns
+        )
+
+
+class ConversationStore:
+    """In-memory conversations with idle expiry and an LRU bound."""
+
+    def __init__(
+        self,
+        config: ConversationConfig | None = None,
+        on_forget: Callable[[str], None] | None = None
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            config: Conversation configuration (uses defaults if None)
+            on_forget: Called with the ID of each expired or dropped conversation
+        """
+        self.config = config or ConversationConfig()
+        self.on_forget = on_forget
+        self._conversations: OrderedDict[str, Conversation] = OrderedDict()
+        self.resumed = 0
+        self.replayed = 0
+
+    def _forget(self, conversation_id: str) -> None:
+        """Drop a conversation and tell the backend."""
+        self._conversations.pop(conversation_id, None)
+        if self.on_forget is not None:
+            self.on_forget(conversation_id)
+
+    def _expire(self, now: float) -> None:
+        """Drop conversations idle for longer than the TTL."""
+        expired = [
+            conversation.id
+            for conversation in self._conversations.values()
+            if now - conversation.last_used > self.config.ttl_seconds
+        ]
+        for conversation_id in expired:
+            self._forget(conversation_id)
+
+    def create(self, model: str) -> Conversation:
+        """
+        Start a conversation.
+
+        Args:
+            model: Model the conversation runs on
+
+        Returns:
+            The new conversation
+        """
+        now = time.monotonic()
+        self._expire(now)
+        while len(self._conversations) >= self.config.max_conversations:
+            self._forget(next(iter(self._conversations)))
+
+        conversation = Conversation(secrets.token_urlsafe(12), model, last_used=now)
+        self._conversations[conversation.id] = conversation
+        return conversation
+
+    def get(self, conversation_id: str) -> Conversation | None:
+        """
+        Look up a conversation and mark it used.
+
+        Args:
+            conversation_id: Conversation handle
+
+        Returns:
+            The conversation, or None if it is unknown or expired
+        """
+        now = time.monotonic()
+        self._expire(now)
+        conversation = self._conversations.get(conversation_id)
+        if conversation is not None:
+            conversation.last_used = now
+            self._conversations.move_to_end(conversation_id)
+        return conversation
+
+    def add_turn(self, conversation: Conversation, turn: Turn) -> bool:
+        """
+        Record a completed turn within the per-conversation limits.
+
+        The first turn, which carries the code, is always kept; the oldest
+        follow-ups are dropped once there are more than ``max_turns`` turns
+        or more than ``max_conversation_chars`` characters. A conversation
+        whose first and latest turn alone are too large is closed.
+
+        Args:
+            conversation: Conversation the turn belongs to
+            turn: The completed turn
+
+        Returns:
+            True if the conversation can still be followed up on
+        """
+        turns = conversation.turns
+        turns.append(turn)
+        chars = sum(kept.chars() for kept in turns)
+        while len(turns) > 2 and (
+            len(turns) > self.config.max_turns or chars > self.config.max_conversation_chars
+        ):
+            chars -= turns.pop(1).chars()
+        if chars > self.config.max_conversation_chars:
+            self._forget(conversation.id)
+            return False
+        return True
+
+    def discard(self, conversation: Conversation) -> None:
+        """
+        Drop a conversation that never completed a turn.
+
+        Args:
+            conversation: Conversation from ``create``
+        """
+        self._forget(conversation.id)
+
+    def get_stats(self) -> dict[str, object]:
+        """
+        Get conversation statistics.
+
+        Returns:
+            Dictionary with open conversations and how many follow-ups sent
+            only the new turn or replayed earlier turns
+        """
+        return {
+            "conversations": len(self._conversations),
+            "resumed": self.resumed,
+            "replayed": self.replayed,
+        }
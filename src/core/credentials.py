@@ -0,0 +1,171 @@
+"""
+Pool of Gemini API credentials.
+
+This module spreads calls over several API keys so that throughput is not
+capped by a single account's quota. Keys are picked round-robin or by
+least use, and a key that hits a rate limit is rested for a cool-down
+period before it is picked again.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from .rate_limit import credential_id
+
+
+class CredentialConfig(BaseModel):
+    """One API key in the credential pool."""
+
+    name: str = Field(description="Label shown in status output")
+    api_key_env: str | None = Field(
+        default=None, description="Environment variable holding the API key"
+    )
+    api_key: str | None = Field(
+        default=None, description="API key (prefer api_key_env to keep keys out of config)"
+    )
+
+
+class CredentialPoolConfig(BaseModel):
+    """Configuration for the credential pool."""
+
+    credentials: list[CredentialConfig] = Field(
+        default_factory=list, description="API keys to spread calls over"
+    )
+    strategy: Literal["round_robin", "least_used"] = Field(
+        default="round_robin", description="How the next credential is picked"
+    )
+    cooldown_seconds: float = Field(
+        default=60.0, ge=0, description="Rest a credential this long after a rate limit error"
+    )
+
+
+@dataclass(eq=False)
+class Credential:
+    """A resolved API key and its usage counters."""
+
+    name: str
+    api_key: str
+    in_flight: int = 0
+    calls: int = 0
+    failures: int = 0
+    rate_limit_errors: int = 0
+    cooldown_until: float = 0.0
+
+    @property
+    def id(self) -> str:
+        """Non-secret identifier of the key."""
+        return credential_id({"GEMINI_API_KEY": self.api_key})
+
+
+class CredentialPool:
+    """
+    Round-robin or least-used pool of Gemini API keys.
+
+    Keys are resolved from the configuration on first use. Entries whose
+    key cannot be resolved are left out.
+    """
+
+    def __init__(self, config: CredentialPoolConfig | None = None):
+        """
+        Initialize the credential pool.
+
+        Args:
+            config: Pool configuration (uses defaults if None)
+        """
+        self.config = config or CredentialPoolConfig()
+        self._members: list[Credential] | None = None
+        self._next = 0
+
+    @property
+    def members(self) -> list[Credential]:
+        """Credentials with a resolved API key."""
+        if self._members is None:
+            self._members = []
+            for entry in self.config.credentials:
+                api_key = entry.api_key
+                if not api_key and entry.api_key_env:
+                    api_key = os.environ.get(entry.api_key_env)
+                if api_key:
+                    self._members.append(Credential(name=entry.name, api_key=api_key))
+        return self._members
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if the pool has at least one usable credential."""
+        return bool(self.members)
+
+    def acquire(self) -> Credential:
+        """
+        Pick a credential for a call.
+
+        Credentials resting after a rate limit error are skipped. If every
+        credential is resting, the one whose cool-down ends first is used.
+
+        Returns:
+            The chosen credential
+
+        Raises:
+            RuntimeError: If the pool has no usable credentials
+        """
+        members = self.members
+        if not members:
+            raise RuntimeError("Credential pool is empty")
+
+        now = time.monotonic()
+        ready = [c for c in members if c.cooldown_until <= now]
+        if not ready:
+            chosen = min(members, key=lambda c: c.cooldown_until)
+        elif self.config.strategy == "least_used":
+            chosen = min(ready, key=lambda c: (c.in_flight, c.calls))
+        else:
+            # Walk the ring from the cursor, taking the first ready credential
+            count = len(members)
+            order = [members[(self._next + offset) % count] for offset in range(count)]
+            chosen = next(c for c in order if c.cooldown_until <= now)
+            self._next = (members.index(chosen) + 1) % count
+
+        chosen.in_flight += 1
+        chosen.calls += 1
+        return chosen
+
+    def release(self, credential: Credential, success: bool, rate_limited: bool = False) -> None:
+        """
+        Return a credential after a call.
+
+        Args:
+            credential: Credential returned by ``acquire``
+            success: Whether the call succeeded
+            rate_limited: Whether the call failed with a rate limit error
+        """
+        credential.in_flight -= 1
+        if not success:
+            credential.failures += 1
+        if rate_limited:
+            credential.rate_limit_errors += 1
+            credential.cooldown_until = time.monotonic() + self.config.cooldown_seconds
+
+    def get_stats(self) -> dict[str, dict[str, object]]:
+        """
+        Get per-credential health.
+
+        Returns:
+            Dictionary keyed by credential name with key id, in-flight and
+            total calls, failures, rate limit errors and remaining cool-down
+        """
+        now = time.monotonic()
+        return {
+            credential.name: {
+                "key_id": credential.id,
+                "healthy": credential.cooldown_until <= now,
+                "cooldown_seconds": round(max(credential.cooldown_until - now, 0.0), 3),
+                "in_flight": credential.in_flight,
+                "calls": credential.calls,
+                "failures": credential.failures,
+                "rate_limit_errors": credential.rate_limit_errors,
+            }
+            for credential in self.members
+        }
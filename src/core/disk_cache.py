@@ -0,0 +1,259 @@
+"""
+Persistent on-disk response cache for Gemini calls.
+
+This module stores successful Gemini responses in a SQLite database in WAL
+mode so that the MCP server and short-lived CLI processes can share results.
+Large entries are compressed and the store is trimmed least recently used
+first once it exceeds its byte budget. Prompts, which carry the user's
+code, are not written to disk; entries are looked up by a hash of the
+prompt and hold only the response.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .config import ServerConfig
+    from .gemini_client import GeminiResponse
+
+# Reads only refresh the access time when it is older than this, so that
+# concurrent readers rarely need the write lock.
+_ACCESS_REFRESH_SECONDS = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    compressed INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+"""
+
+
+def default_cache_dir() -> Path:
+    """
+    Get the default cache directory.
+
+    Uses ``GEMINI_MCP_CACHE_DIR`` if set, otherwise ``$XDG_CACHE_HOME/gemini-mcp``
+    or ``~/.cache/gemini-mcp``.
+
+    Returns:
+        Cache directory path
+    """
+    override = os.getenv('GEMINI_MCP_CACHE_DIR')
+    if override:
+        return Path(override).expanduser()
+    base = os.getenv('XDG_CACHE_HOME') or str(Path.home() / '.cache')
+    return Path(base) / 'gemini-mcp'
+
+
+class DiskCache:
+    """
+    SQLite-backed response cache shared between processes.
+
+    Each thread uses its own connection. WAL mode lets readers proceed while
+    another process writes, and writers wait on a busy timeout instead of
+    failing. Blocking database work runs in a worker thread.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | str | None = None,
+        ttl_seconds: float = 3600,
+        max_size_mb: float = 256.0,
+        compress_min_bytes: int = 4096
+    ):
+        """
+        Initialize the disk cache. The database is created on first use.
+
+        Args:
+            cache_dir: Directory holding the database (uses default if None)
+            ttl_seconds: Time to live for each entry
+            max_size_mb: Byte budget for stored payloads in megabytes
+            compress_min_bytes: Payloads at least this large are compressed
+        """
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_size_mb = max_size_mb
+        self.compress_min_bytes = compress_min_bytes
+        self._local = threading.local()
+
+    @classmethod
+    def from_config(cls, config: "ServerConfig") -> "DiskCache | None":
+        """
+        Create a disk cache from server configuration.
+
+        Args:
+            config: Server configuration
+
+        Returns:
+            DiskCache, or None if caching or the disk cache is disabled
+        """
+        if not (config.enable_caching and config.disk_cache_enabled):
+            return None
+        return cls(
+            cache_dir=config.cache_dir,
+            ttl_seconds=config.cache_ttl_seconds,
+            max_size_mb=config.disk_cache_max_size_mb
+        )
+
+    @property
+    def db_path(self) -> Path:
+        """Path of the SQLite database file."""
+        directory = Path(self.cache_dir) if self.cache_dir else default_cache_dir()
+        return directory / 'responses.sqlite3'
+
+    @property
+    def max_bytes(self) -> int:
+        """Byte budget for stored payloads."""
+        return int(self.max_size_mb * 1024 * 1024)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, creating the database if needed."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            path = self.db_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    async def get(self, key: str) -> "GeminiResponse | None":
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from ``make_cache_key``
+
+        Returns:
+            Copy of the cached response marked as cached, with an empty
+            ``input_prompt``, or None on a miss
+        """
+        return await asyncio.to_thread(self.get_sync, key)
+
+    async def put(self, key: str, response: "GeminiResponse") -> None:
+        """
+        Store a successful response, leaving out its prompt.
+
+        Args:
+            key: Cache key from ``make_cache_key``
+            response: Response to cache
+        """
+        await asyncio.to_thread(self.put_sync, key, response)
+
+    def get_sync(self, key: str) -> "GeminiResponse | None":
+        """Blocking variant of ``get``."""
+        from .gemini_client import GeminiResponse
+
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT payload, compressed, created_at, expires_at, last_access "
+            "FROM responses WHERE key = ?",
+            (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        payload, compressed, created_at, expires_at, last_access = row
+        now = time.time()
+        if expires_at <= now:
+            conn.execute("DELETE FROM responses WHERE key = ? AND expires_at <= ?", (key, now))
+            return None
+
+        if now - last_access >= _ACCESS_REFRESH_SECONDS:
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+
+        data = zlib.decompress(payload) if compressed else payload
+        response = GeminiResponse.model_validate({"input_prompt": "", **json.loads(data)})
+        metadata = {
+            **response.metadata,
+            "cached": True,
+            "cache_tier": "disk",
+            "cache_age_seconds": round(now - created_at, 3),
+        }
+        return response.model_copy(update={"metadata": metadata})
+
+    def put_sync(self, key: str, response: "GeminiResponse") -> None:
+        """Blocking variant of ``put``."""
+        if not response.success:
+            return
+
+        data = response.model_dump_json(exclude={"input_prompt"}).encode('utf-8')
+        compressed = len(data) >= self.compress_min_bytes
+        payload = zlib.compress(data) if compressed else data
+        if len(payload) > self.max_bytes:
+            return
+
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, payload, compressed, size, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, payload, int(compressed), len(payload), now, now + self.ttl_seconds, now)
+            )
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then least recently used ones over budget."""
+        conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        self._connection().execute("DELETE FROM responses")
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Get disk cache statistics.
+
+        Returns:
+            Dictionary with database path, entry count and stored bytes
+        """
+        entries, total = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        return {
+            "path": str(self.db_path),
+            "entries": entries,
+            "total_bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
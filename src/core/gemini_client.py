@@ -6,13 +6,65 @@ calls and authentication through gcloud.
 """
 
 import asyncio
-import subprocess
-import tempfile
+import codecs
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
 
 from pydantic import BaseModel, Field
 
+from .auth import (
+    AuthVerdictStore,
+    auth_fingerprint,
+    detect_credential_source,
+    find_gemini_cli,
+    is_auth_error,
+    resolve_api_key,
+)
+from .cache import ResponseCache, make_cache_key
+from .circuit_breaker import CircuitBreaker
+from .credentials import Credential, CredentialPool
+from .disk_cache import DiskCache
+from .hedging import HedgePolicy
+from .output_buffer import BoundedText, TailBuffer
+from .process_group import kill_process_group, new_group_kwargs
+from .process_pool import GeminiProcessPool
+from .rate_limit import (
+    RateLimiter,
+    credential_id,
+    estimate_input_tokens,
+    estimate_tokens,
+    is_rate_limit_error,
+)
+from .retry import RetryPolicy
+from .scheduler import GeminiScheduler, Priority, Ticket
+from .singleflight import SingleFlight
+
+# Callback receiving decoded stdout text as it arrives
+ChunkCallback = Callable[[str], Awaitable[None]]
+
+# Bytes read from the CLI's stdout per streaming read
+STREAM_CHUNK_SIZE = 4096
+
+# Bytes at the end of the CLI's stderr kept for error messages
+STDERR_TAIL_SIZE = 64 * 1024
+
+# Characters of prompt text encoded and written to stdin per write
+STDIN_CHUNK_CHARS = 64 * 1024
+
+# Bytes read from an input file per worker thread read
+FILE_CHUNK_SIZE = 256 * 1024
+
+# Chunks buffered per input file ahead of the stdin writer
+FILE_QUEUE_CHUNKS = 2
+
+# Opening fence of the structured answer watched for by stop_after_json
+JSON_FENCE = "```json"
+
 
 class GeminiOptions(BaseModel):
     """Configuration options for Gemini CLI calls."""
@@ -24,6 +76,19 @@ class GeminiOptions(BaseModel):
     show_memory_usage: bool = Field(default=False, description="Show memory usage")
     yolo: bool = Field(default=False, description="Auto-accept all actions")
     checkpointing: bool = Field(default=False, description="Enable checkpointing")
+    stop_after_json: bool = Field(
+        default=False,
+        description="Stop the CLI as soon as a complete ```json block has been received"
+    )
+    conversation_id: str | None = Field(
+        default=None,
+        description="Conversation the call continues, for backends that keep session state"
+    )
+    cache_prefix_chars: int | None = Field(
+        default=None,
+        ge=0,
+        description="Length of the prompt's stable prefix, which backends may put in a cached context"
+    )
 
 
 class GeminiResponse(BaseModel):
@@ -44,6 +109,295 @@ class GeminiCLIError(Exception):
         self.error_code = error_code
 
 
+def format_input_files(
+    input_files: Sequence[str | Path],
+    max_file_size_mb: float | None = None
+) -> list[str]:
+    """
+    Read input files as text blocks for backends that send text, not stdin.
+
+    Each file gets the same ``--- path ---`` header the CLI's stdin input
+    uses; files that are too large or unreadable are replaced by a note.
+
+    Args:
+        input_files: Files to include
+        max_file_size_mb: Files larger than this are skipped
+
+    Returns:
+        One text block per file
+    """
+    blocks = []
+    for file_path in input_files:
+        try:
+            size = os.stat(file_path).st_size
+            if max_file_size_mb is not None and size > max_file_size_mb * 1024 * 1024:
+                blocks.append(f"--- {file_path} (Skipped: larger than {max_file_size_mb} MB) ---\n\n")
+                continue
+            content = Path(file_path).read_text(encoding='utf-8')
+            blocks.append(f"--- {file_path} ---\n{content}\n\n")
+        except Exception as e:
+            blocks.append(f"--- {file_path} (Error: {str(e)}) ---\n\n")
+    return blocks
+
+
+class JsonBlockWatcher:
+    """Detects when the first ```json block of streamed output is complete."""
+
+    def __init__(self) -> None:
+        """Initialize an empty watcher."""
+        self._text = ""
+        self._start: int | None = None
+        self._scan = 0
+        self._invalid = False
+
+    def feed(self, text: str) -> bool:
+        """
+        Add streamed text.
+
+        Args:
+            text: Newly received output
+
+        Returns:
+            True once the first JSON block is closed and parses
+        """
+        if self._invalid:
+            return False
+        self._text += text
+
+        if self._start is None:
+            # Back up so a fence split across chunks is still found
+            opening = self._text.find(JSON_FENCE, max(self._scan - len(JSON_FENCE), 0))
+            if opening == -1:
+                self._scan = len(self._text)
+                return False
+            self._start = self._scan = opening + len(JSON_FENCE)
+
+        closing = self._text.find("```", max(self._scan - 2, self._start))
+        if closing == -1:
+            self._scan = len(self._text)
+            return False
+        try:
+            json.loads(self._text[self._start:closing])
+        except json.JSONDecodeError:
+            # Only the first block is used; let the model finish
+            self._invalid = True
+            return False
+        return True
+
+
+class StreamGate:
+    """
+    Lets the output of only one attempt of a call reach the caller.
+
+    Retries and hedges run a call more than once. The first attempt to
+    produce output claims the stream and the output of every other attempt
+    is dropped, so the caller never sees text from two attempts.
+    """
+
+    def __init__(self, on_chunk: ChunkCallback | None):
+        """
+        Initialize an unclaimed gate.
+
+        Args:
+            on_chunk: Callback receiving the streamed output (None to not stream)
+        """
+        self.on_chunk = on_chunk
+        self.owner: str | None = None
+        self.claimed = asyncio.Event()
+
+    def sink(self, attempt: str) -> ChunkCallback | None:
+        """
+        Return the chunk callback for one attempt.
+
+        Args:
+            attempt: Name of the attempt (e.g. "primary" or "hedge")
+
+        Returns:
+            Callback forwarding the attempt's output while it owns the stream,
+            or None if the call does not stream
+        """
+        on_chunk = self.on_chunk
+        if on_chunk is None:
+            return None
+
+        async def forward(text: str) -> None:
+            if self.owner is None:
+                self.owner = attempt
+                self.claimed.set()
+            if self.owner == attempt:
+                await on_chunk(text)
+
+        return forward
+
+
+def _is_backend_failure(response: GeminiResponse) -> bool:
+    """
+    Check whether a failed response counts against the circuit breaker.
+
+    Server errors (5xx), network errors and non-zero CLI exits count; client
+    errors such as 400, 403 or 404 do not, since retrying a healthy backend
+    with the same request would fail the same way.
+
+    Args:
+        response: Failed response of an attempt
+
+    Returns:
+        True if the failure points at an unhealthy backend
+    """
+    metadata = response.metadata
+    if "exit_code" in metadata:
+        return True
+    status_code = metadata.get("status_code")
+    if status_code is not None:
+        # Negative codes are JSON-RPC errors from an ACP agent; -32603 is an
+        # internal error, the others reject the request itself
+        return bool(status_code >= 500 or status_code == -32603)
+    return (response.error or "").startswith(("Subprocess error", "Network error"))
+
+
+def _succeeded(task: asyncio.Task[GeminiResponse]) -> bool:
+    """Check whether a task finished with a successful response."""
+    return (
+        task.done()
+        and not task.cancelled()
+        and task.exception() is None
+        and task.result().success
+    )
+
+
+def _check_utf8(f: BinaryIO) -> None:
+    """
+    Check that a file is valid UTF-8, then rewind it.
+
+    Args:
+        f: File opened in binary mode
+
+    Raises:
+        UnicodeDecodeError: If the file is not valid UTF-8
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    while data := f.read(FILE_CHUNK_SIZE):
+        decoder.decode(data)
+    decoder.decode(b"", final=True)
+    f.seek(0)
+
+
+class GeminiBackend(ABC):
+    """
+    Transport that runs a single Gemini generation.
+
+    The client layers caching, scheduling, pacing, retries and deadlines on
+    top; a backend only turns a prompt into a response. Failures are
+    returned as unsuccessful responses, and cancellation must stop any work
+    in progress.
+    """
+
+    name = "backend"
+
+    # Whether calls need the Gemini CLI installed and authenticated
+    uses_cli = False
+
+    @abstractmethod
+    async def generate(
+        self,
+        prompt: str,
+        options: GeminiOptions,
+        input_files: list[str | Path],
+        on_chunk: ChunkCallback | None,
+        env: dict[str, str]
+    ) -> GeminiResponse:
+        """
+        Run one generation.
+
+        Args:
+            prompt: The prompt to send
+            options: Call options; the model and stop_after_json apply to all backends
+            input_files: Files to include ahead of the prompt
+            on_chunk: Optional callback receiving decoded output chunks
+            env: Environment carrying the API key to use
+
+        Returns:
+            GeminiResponse with the result
+        """
+
+    # Whether the backend keeps conversation state between calls
+    keeps_conversations = False
+
+    def has_conversation(self, conversation_id: str) -> bool:
+        """
+        Check whether the backend still holds a conversation's earlier turns.
+
+        Args:
+            conversation_id: Conversation handle from ``GeminiOptions.conversation_id``
+
+        Returns:
+            True if a follow-up only needs to send the new turn
+        """
+        return False
+
+    def end_conversation(self, conversation_id: str) -> None:
+        """
+        Forget a conversation's session state.
+
+        Args:
+            conversation_id: Conversation handle
+        """
+        # Nothing to forget without session state
+        return None
+
+    def get_stats(self) -> dict[str, object]:
+        """
+        Get backend statistics.
+
+        Returns:
+            Dictionary of backend-specific counters (empty if there are none)
+        """
+        return {}
+
+    async def close(self) -> None:
+        """Release connections or processes held by the backend."""
+        return None
+
+
+class SubprocessBackend(GeminiBackend):
+    """Runs each call as a Gemini CLI process, using the client's I/O settings."""
+
+    name = "subprocess"
+    uses_cli = True
+
+    def __init__(self, client: "GeminiCLIClient"):
+        """
+        Initialize the backend.
+
+        Args:
+            client: Client whose command, process pool and file limits are used
+        """
+        self.client = client
+
+    async def generate(
+        self,
+        prompt: str,
+        options: GeminiOptions,
+        input_files: list[str | Path],
+        on_chunk: ChunkCallback | None,
+        env: dict[str, str]
+    ) -> GeminiResponse:
+        """
+        Run the Gemini CLI once.
+
+        Args:
+            prompt: The prompt to send
+            options: CLI options
+            input_files: Files to include ahead of the prompt
+            on_chunk: Optional callback receiving decoded stdout chunks
+            env: Subprocess environment
+
+        Returns:
+            GeminiResponse with the result
+        """
+        return await self.client._run_cli(prompt, options, input_files, on_chunk, env)
+
+
 class GeminiCLIClient:
     """
     Client for interacting with Google Gemini via CLI.
@@ -52,51 +406,125 @@ class GeminiCLIClient:
     authentication. No API key configuration required.
     """
 
-    def __init__(self, default_options: GeminiOptions | None = None):
+    def __init__(
+        self,
+        default_options: GeminiOptions | None = None,
+        process_pool: GeminiProcessPool | None = None,
+        cache: ResponseCache | None = None,
+        disk_cache: DiskCache | None = None,
+        auth_store: AuthVerdictStore | None = None,
+        max_context_files: int | None = None,
+        max_file_size_mb: float | None = None,
+        default_timeout: float | None = None,
+        scheduler: GeminiScheduler | None = None,
+        rate_limiter: RateLimiter | None = None,
+        credentials: CredentialPool | None = None,
+        retry_policy: RetryPolicy | None = None,
+        hedge_policy: HedgePolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        backend: GeminiBackend | None = None,
+        max_response_chars: int | None = None
+    ):
         """
         Initialize the Gemini CLI client.
         
         Args:
             default_options: Default options to use for CLI calls
+            process_pool: Optional pool of pre-spawned Gemini processes
+            cache: Optional in-process cache for successful responses
+            disk_cache: Optional on-disk cache shared between processes
+            auth_store: Optional on-disk store of authentication verdicts
+            max_context_files: Maximum number of input files per call
+            max_file_size_mb: Input files larger than this are skipped
+            default_timeout: Deadline in seconds for calls that don't set one
+            scheduler: Optional per-model concurrency limiter
+            rate_limiter: Optional per-model and per-key quota pacing
+            credentials: Optional pool of API keys to spread calls over
+            retry_policy: Optional retry policy for transient failures
+            hedge_policy: Optional policy for hedging slow calls
+            circuit_breaker: Optional breaker that fails fast while the backend is down
+            backend: Transport for calls (runs the Gemini CLI if None)
+            max_response_chars: Longer CLI output is truncated and flagged
         """
         self.default_options = default_options or GeminiOptions()
+        self.process_pool = process_pool
+        self.cache = cache
+        self.disk_cache = disk_cache
+        self._in_flight: SingleFlight[GeminiResponse] = SingleFlight()
+        self.auth_store = auth_store
+        self.max_context_files = max_context_files
+        self.max_file_size_mb = max_file_size_mb
+        self.max_response_chars = max_response_chars
+        self.default_timeout = default_timeout
+        self.scheduler = scheduler
+        self.rate_limiter = rate_limiter
+        self.credentials = credentials
+        self.retry_policy = retry_policy
+        self.hedge_policy = hedge_policy
+        self.circuit_breaker = circuit_breaker
+        self.backend = backend or SubprocessBackend(self)
+        self._auth_flight: SingleFlight[bool] = SingleFlight()
         self._verified_auth = False
+        self._env: dict[str, str] | None = None
 
-    async def verify_authentication(self) -> bool:
+    async def verify_authentication(self, live: bool = False) -> bool:
         """
         Verify that Gemini CLI is available and authenticated.
+
+        By default this is a cheap check that locates the CLI and its
+        credentials without calling a model. When credentials cannot be
+        detected locally, or when ``live`` is True, a short model call is
+        made instead. Concurrent first calls share a single check, and
+        positive verdicts are reused from the auth store until they expire.
         
+        Args:
+            live: Always confirm authentication with a model call
+
         Returns:
             True if authentication is valid, False otherwise
             
         Raises:
             GeminiCLIError: If CLI is not available or authentication fails
         """
-        import os
-        import platform
-        
-        try:
-            # Check if gemini CLI is available - handle Windows differently
-            if platform.system() == 'Windows':
-                # On Windows, try to run gemini --version directly
-                result = await asyncio.create_subprocess_shell(
-                    "gemini --version",
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    env={**os.environ, 'GEMINI_API_KEY': os.getenv('GEMINI_API_KEY', '')}
-                )
-            else:
-                # On Unix-like systems, use which
-                result = await asyncio.create_subprocess_exec(
-                    "which", "gemini",
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-            await result.wait()
+        if self._verified_auth and not live:
+            return True
+
+        result, _ = await self._auth_flight.do(
+            "live" if live else "cheap",
+            lambda: self._verify_authentication(live)
+        )
+        return result
 
-            if result.returncode != 0:
-                raise GeminiCLIError("Gemini CLI not found. Please install and configure Gemini CLI.")
+    async def _verify_authentication(self, live: bool) -> bool:
+        """
+        Run one authentication check.
 
+        Args:
+            live: Always confirm authentication with a model call
+
+        Returns:
+            True if authentication is valid
+
+        Raises:
+            GeminiCLIError: If CLI is not available or authentication fails
+        """
+        if not self.backend.uses_cli:
+            return await self._verify_api_key(live)
+
+        cli_path = find_gemini_cli()
+        if cli_path is None:
+            raise GeminiCLIError("Gemini CLI not found. Please install and configure Gemini CLI.")
+
+        env = self._build_env()
+        source = detect_credential_source(env)
+        fingerprint = auth_fingerprint(cli_path, env, source)
+
+        if not live and self.auth_store is not None:
+            if await asyncio.to_thread(self.auth_store.is_verified, fingerprint):
+                self._verified_auth = True
+                return True
+
+        if live or source is None:
             # Test basic authentication with a simple prompt
             test_result = await self._call_gemini(
                 prompt="Hello",
@@ -106,25 +534,70 @@ class GeminiCLIClient:
             if not test_result.success:
                 raise GeminiCLIError(f"Authentication test failed: {test_result.error}")
 
-            self._verified_auth = True
-            return True
+        self._verified_auth = True
+        if self.auth_store is not None:
+            await asyncio.to_thread(self.auth_store.record, fingerprint)
+        return True
+
+    async def _verify_api_key(self, live: bool) -> bool:
+        """
+        Check that a backend which calls the API directly has an API key.
+
+        Args:
+            live: Also confirm the key with a model call
 
-        except subprocess.SubprocessError as e:
-            raise GeminiCLIError(f"Error verifying Gemini CLI: {str(e)}")
+        Returns:
+            True if authentication is valid
+
+        Raises:
+            GeminiCLIError: If no API key is configured or the key is rejected
+        """
+        pool = self.credentials
+        if not self._build_env().get('GEMINI_API_KEY') and not (pool is not None and pool.enabled):
+            raise GeminiCLIError(
+                f"No Gemini API key configured for the {self.backend.name} backend. "
+                "Set GEMINI_API_KEY or configure a credential pool."
+            )
+
+        if live:
+            test_result = await self._call_gemini(
+                prompt="Hello",
+                options=GeminiOptions(model=self.default_options.model)
+            )
+            if not test_result.success:
+                raise GeminiCLIError(f"Authentication test failed: {test_result.error}")
+
+        self._verified_auth = True
+        return True
 
     async def call_gemini(
         self,
         prompt: str,
         options: GeminiOptions | None = None,
-        input_files: list[str | Path] | None = None
+        input_files: list[str | Path] | None = None,
+        on_chunk: ChunkCallback | None = None,
+        timeout: float | None = None,
+        session: str | None = None,
+        priority: Priority = "normal"
     ) -> GeminiResponse:
         """
         Make a call to Gemini CLI with the given prompt.
+
+        If the call is cancelled or its deadline passes, the Gemini CLI
+        process group is killed, unless other coalesced callers are still
+        waiting for the same result.
         
         Args:
             prompt: The prompt to send to Gemini
             options: CLI options to use (defaults to instance default)
             input_files: Optional list of files to include in context
+            on_chunk: Optional callback receiving decoded output chunks as
+                they arrive. A cached or coalesced result is delivered as a
+                single chunk.
+            timeout: Deadline in seconds (defaults to the client default),
+                including time spent queued for a concurrency slot
+            session: Caller identity for fair scheduling (e.g. MCP session)
+            priority: Scheduling priority: interactive, normal or batch
             
         Returns:
             GeminiResponse with the result
@@ -132,33 +605,673 @@ class GeminiCLIClient:
         Raises:
             GeminiCLIError: If the CLI call fails
         """
+        opts = options or self.default_options
+        cache_key = None
+        # A turn in a session the backend still holds depends on more than
+        # its prompt, so it is neither cached nor coalesced
+        if opts.conversation_id is None or not self.backend.has_conversation(opts.conversation_id):
+            if input_files:
+                # Stat input files off the event loop
+                cache_key = await asyncio.to_thread(make_cache_key, prompt, opts, input_files)
+            else:
+                cache_key = make_cache_key(prompt, opts)
+
+            cached = await self._get_cached(cache_key, prompt)
+            if cached is not None:
+                if on_chunk is not None and cached.content:
+                    await on_chunk(cached.content)
+                return cached
+
+        if timeout is None:
+            timeout = self.default_timeout
+
+        try:
+            async with asyncio.timeout(timeout):
+                if cache_key is None:
+                    response = await self._fetch(
+                        None, prompt, opts, input_files, on_chunk, session, priority
+                    )
+                    shared = False
+                else:
+                    # Identical concurrent calls share one subprocess
+                    response, shared = await self._in_flight.do(
+                        cache_key,
+                        lambda: self._fetch(
+                            cache_key, prompt, opts, input_files, on_chunk, session, priority
+                        )
+                    )
+        except TimeoutError:
+            return GeminiResponse(
+                content="",
+                success=False,
+                error=f"Gemini call exceeded its {timeout:g}s deadline",
+                input_prompt=prompt,
+                metadata={
+                    "model": opts.model,
+                    "cancelled": True,
+                    "cancel_reason": "deadline",
+                    "timeout_seconds": timeout
+                }
+            )
+        if shared:
+            metadata = {**response.metadata, "coalesced": True}
+            response = response.model_copy(update={"metadata": metadata})
+            if on_chunk is not None and response.content:
+                await on_chunk(response.content)
+
+        return response
+
+    async def stream_gemini(
+        self,
+        prompt: str,
+        options: GeminiOptions | None = None,
+        input_files: list[str | Path] | None = None,
+        timeout: float | None = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a Gemini CLI call, yielding decoded output chunks as they arrive.
+
+        Closing the iterator early cancels the call.
+
+        Args:
+            prompt: The prompt to send to Gemini
+            options: CLI options to use (defaults to instance default)
+            input_files: Optional list of files to include in context
+            timeout: Deadline in seconds (defaults to the client default)
+
+        Yields:
+            Decoded chunks of the response text
+
+        Raises:
+            GeminiCLIError: If the CLI call fails
+        """
+        queue: asyncio.Queue[str | None] = asyncio.Queue()
+
+        async def on_chunk(text: str) -> None:
+            await queue.put(text)
+
+        async def run() -> GeminiResponse:
+            try:
+                return await self.call_gemini(
+                    prompt, options, input_files, on_chunk=on_chunk, timeout=timeout
+                )
+            finally:
+                await queue.put(None)
+
+        task = asyncio.ensure_future(run())
+        try:
+            while (chunk := await queue.get()) is not None:
+                yield chunk
+            response = await task
+        finally:
+            if not task.done():
+                task.cancel()
+
+        if not response.success:
+            raise GeminiCLIError(response.error or "Gemini call failed", response.metadata.get("exit_code"))
+
+    async def _fetch(
+        self,
+        cache_key: str | None,
+        prompt: str,
+        opts: GeminiOptions,
+        input_files: list[str | Path] | None,
+        on_chunk: ChunkCallback | None = None,
+        session: str | None = None,
+        priority: Priority = "normal"
+    ) -> GeminiResponse:
+        """
+        Call Gemini after a cache miss and store the result.
+
+        Args:
+            cache_key: Cache key from ``make_cache_key`` (None to not cache)
+            prompt: The prompt to send
+            opts: CLI options
+            input_files: Files to include
+            on_chunk: Optional callback receiving decoded output chunks
+            session: Caller identity for fair scheduling
+            priority: Scheduling priority
+
+        Returns:
+            GeminiResponse with the result
+        """
         if not self._verified_auth:
+            await self._verify_or_fail_fast()
+
+        response = await self._call_with_retries(
+            prompt, opts, input_files, on_chunk, session, priority
+        )
+        # A truncated answer is incomplete; don't serve it to later calls
+        if cache_key is not None and not response.metadata.get("truncated"):
+            await self._store_cached(cache_key, response)
+        return response
+
+    async def _verify_or_fail_fast(self) -> None:
+        """
+        Verify authentication unless a recent failure is cached.
+
+        Raises:
+            GeminiCLIError: If authentication failed now or recently
+        """
+        breaker = self.circuit_breaker
+        if breaker is None:
             await self.verify_authentication()
+            return
 
-        return await self._call_gemini(prompt, options, input_files)
+        rejection = breaker.auth_rejection()
+        if rejection is not None:
+            raise GeminiCLIError(rejection)
+        try:
+            await self.verify_authentication()
+        except GeminiCLIError as e:
+            breaker.record_auth_failure(str(e))
+            raise
 
-    async def _call_gemini(
+    async def _call_with_retries(
         self,
         prompt: str,
-        options: GeminiOptions | None = None,
-        input_files: list[str | Path] | None = None
+        opts: GeminiOptions,
+        input_files: list[str | Path] | None,
+        on_chunk: ChunkCallback | None,
+        session: str | None,
+        priority: Priority
     ) -> GeminiResponse:
         """
-        Internal method to call Gemini CLI.
-        
+        Call Gemini, retrying transient failures with jittered backoff.
+
+        Only one attempt streams to ``on_chunk``. An attempt whose output
+        the caller has already seen is not retried, since the retry's
+        output would be appended to it.
+
         Args:
             prompt: The prompt to send
-            options: CLI options
+            opts: CLI options
             input_files: Files to include
-            
+            on_chunk: Optional callback receiving decoded output chunks
+            session: Caller identity for fair scheduling
+            priority: Scheduling priority
+
+        Returns:
+            GeminiResponse from the last attempt
+        """
+        policy = self.retry_policy
+        if policy is not None:
+            policy.budget.record_call()
+
+        gate = StreamGate(on_chunk)
+        attempt = 1
+        while True:
+            response = await self._call_hedged(
+                prompt, opts, input_files, gate, session, priority
+            )
+            if (
+                response.success
+                or policy is None
+                or gate.owner is not None
+                or not policy.should_retry(attempt, response.error, response.metadata)
+            ):
+                break
+            await asyncio.sleep(policy.backoff(attempt))
+            attempt += 1
+
+        if attempt > 1:
+            metadata = {**response.metadata, "attempts": attempt}
+            response = response.model_copy(update={"metadata": metadata})
+        return response
+
+    async def _call_hedged(
+        self,
+        prompt: str,
+        opts: GeminiOptions,
+        input_files: list[str | Path] | None,
+        gate: StreamGate,
+        session: str | None,
+        priority: Priority
+    ) -> GeminiResponse:
+        """
+        Make one attempt, hedging it if it runs longer than usual.
+
+        No hedge is started once the primary streams output. Whichever call
+        streams first is the answer and the other one is cancelled, which
+        kills its process group; otherwise the first success wins.
+
+        Args:
+            prompt: The prompt to send
+            opts: CLI options
+            input_files: Files to include
+            gate: Stream gate of the call
+            session: Caller identity for fair scheduling
+            priority: Scheduling priority
+
+        Returns:
+            The winning response, or the primary's failure
+        """
+        hedging = self.hedge_policy
+        delay = None
+        # A conversation's turns must not run twice in its backend session
+        if hedging is not None and opts.conversation_id is None:
+            delay = hedging.delay(opts.model)
+        started = time.monotonic()
+
+        if hedging is None or delay is None:
+            response = await self._call_attempt(
+                prompt, opts, input_files, gate.sink("primary"), session, priority
+            )
+            if hedging is not None and response.success:
+                hedging.record(opts.model, time.monotonic() - started)
+            return response
+
+        primary = asyncio.create_task(
+            self._call_attempt(prompt, opts, input_files, gate.sink("primary"), session, priority)
+        )
+        hedge: asyncio.Task[GeminiResponse] | None = None
+        winner: asyncio.Task[GeminiResponse] | None = None
+        claimed = asyncio.create_task(gate.claimed.wait())
+        try:
+            await asyncio.wait({primary, claimed}, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+            if primary.done() or gate.owner is not None or not hedging.try_hedge():
+                response = await primary
+                if response.success:
+                    hedging.record(opts.model, time.monotonic() - started)
+                return response
+
+            hedge_opts = opts
+            if hedging.config.hedge_model:
+                hedge_opts = opts.model_copy(update={"model": hedging.config.hedge_model})
+            hedge = asyncio.create_task(
+                self._call_attempt(
+                    prompt, hedge_opts, input_files, gate.sink("hedge"), session, priority
+                )
+            )
+
+            calls = {"primary": primary, "hedge": hedge}
+            while True:
+                if gate.owner is not None:
+                    # The caller is reading this call's output, so it is the answer
+                    winner = calls.pop(gate.owner)
+                    for task in calls.values():
+                        task.cancel()
+                    await asyncio.wait({winner})
+                    break
+                winner = next((task for task in calls.values() if _succeeded(task)), None)
+                running = {task for task in calls.values() if not task.done()}
+                if winner is not None or not running:
+                    break
+                await asyncio.wait(running | {claimed}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            claimed.cancel()
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+
+        if winner is None or not _succeeded(winner):
+            # Report a failure the caller can act on, the primary's if it has one
+            for task in (winner, primary, hedge):
+                if task is not None and not task.cancelled() and task.exception() is None:
+                    return task.result()
+            failed = hedge if primary.cancelled() and hedge is not None else primary
+            return failed.result()
+
+        response = winner.result()
+        if winner is hedge:
+            hedging.hedge_wins += 1
+        else:
+            hedging.record(opts.model, time.monotonic() - started)
+        metadata = {
+            **response.metadata,
+            "hedged": True,
+            "hedge_winner": "hedge" if winner is hedge else "primary"
+        }
+        return response.model_copy(update={"metadata": metadata})
+
+    async def _call_attempt(
+        self,
+        prompt: str,
+        opts: GeminiOptions,
+        input_files: list[str | Path] | None,
+        on_chunk: ChunkCallback | None,
+        session: str | None,
+        priority: Priority
+    ) -> GeminiResponse:
+        """
+        Make one attempt, unless the circuit breaker fails it fast.
+
+        Args:
+            prompt: The prompt to send
+            opts: CLI options
+            input_files: Files to include
+            on_chunk: Optional callback receiving decoded output chunks
+            session: Caller identity for fair scheduling
+            priority: Scheduling priority
+
+        Returns:
+            GeminiResponse with the result
+        """
+        breaker = self.circuit_breaker
+        if breaker is None:
+            return await self._call_with_credential(
+                prompt, opts, input_files, on_chunk, session, priority
+            )
+
+        rejection = breaker.check(opts.model)
+        if rejection is not None:
+            return GeminiResponse(
+                content="",
+                success=False,
+                error=rejection,
+                input_prompt=prompt,
+                metadata={"model": opts.model, "circuit_open": True}
+            )
+
+        try:
+            response = await self._call_with_credential(
+                prompt, opts, input_files, on_chunk, session, priority
+            )
+        except BaseException:
+            breaker.record_inconclusive(opts.model)
+            raise
+
+        metadata = response.metadata
+        if response.success:
+            breaker.record_success(opts.model)
+        elif metadata.get("rate_limited") or metadata.get("cancelled"):
+            # Throttling and cancellation say nothing about backend health
+            breaker.record_inconclusive(opts.model)
+        elif _is_backend_failure(response):
+            breaker.record_failure(opts.model, response.error, auth=is_auth_error(response.error))
+        else:
+            # Client errors (4xx) and calls rejected before the CLI ran (e.g.
+            # too many input files) say nothing about backend health either
+            if is_auth_error(response.error):
+                breaker.record_auth_failure(response.error)
+            breaker.record_inconclusive(opts.model)
+        return response
+
+    async def _call_with_credential(
+        self,
+        prompt: str,
+        opts: GeminiOptions,
+        input_files: list[str | Path] | None,
+        on_chunk: ChunkCallback | None,
+        session: str | None,
+        priority: Priority
+    ) -> GeminiResponse:
+        """
+        Make one attempt with the next pool credential, if a pool is set.
+
+        Args:
+            prompt: The prompt to send
+            opts: CLI options
+            input_files: Files to include
+            on_chunk: Optional callback receiving decoded output chunks
+            session: Caller identity for fair scheduling
+            priority: Scheduling priority
+
+        Returns:
+            GeminiResponse with the result
+        """
+        pool = self.credentials
+        if pool is None or not pool.enabled:
+            return await self._call_paced(
+                prompt, opts, input_files, on_chunk, session, priority, self._build_env(None)
+            )
+
+        credential = pool.acquire()
+        env = self._build_env(credential)
+        try:
+            response = await self._call_paced(
+                prompt, opts, input_files, on_chunk, session, priority, env
+            )
+        except BaseException:
+            pool.release(credential, success=False)
+            raise
+
+        rate_limited = bool(response.metadata.get("rate_limited"))
+        pool.release(credential, response.success, rate_limited)
+        metadata = {**response.metadata, "credential": credential.name}
+        return response.model_copy(update={"metadata": metadata})
+
+    async def _call_paced(
+        self,
+        prompt: str,
+        opts: GeminiOptions,
+        input_files: list[str | Path] | None,
+        on_chunk: ChunkCallback | None,
+        session: str | None,
+        priority: Priority,
+        env: dict[str, str]
+    ) -> GeminiResponse:
+        """
+        Run a CLI call within the rate limit and concurrency limits.
+
+        Args:
+            prompt: The prompt to send
+            opts: CLI options
+            input_files: Files to include
+            on_chunk: Optional callback receiving decoded output chunks
+            session: Caller identity for fair scheduling
+            priority: Scheduling priority
+            env: Subprocess environment carrying the API key to use
+
         Returns:
             GeminiResponse with the result
         """
-        import os
+        limiter = self.rate_limiter
+        if limiter is not None:
+            key_id = credential_id(env)
+            if input_files:
+                input_tokens = await asyncio.to_thread(estimate_input_tokens, prompt, input_files)
+            else:
+                input_tokens = estimate_input_tokens(prompt)
+            estimated = input_tokens + limiter.config.expected_output_tokens
+            rate_wait = await limiter.acquire(opts.model, key_id, estimated, priority)
+
+        if self.scheduler is None:
+            response = await self._call_gemini(prompt, opts, input_files, on_chunk, env)
+        else:
+            response = await self._call_scheduled(
+                prompt, opts, input_files, on_chunk, session, priority, env
+            )
+
+        if limiter is not None:
+            limiter.settle(
+                opts.model, key_id, estimated, input_tokens + estimate_tokens(response.content)
+            )
+            if response.metadata.get("rate_limited"):
+                limiter.pause(opts.model, key_id)
+            metadata = {
+                **response.metadata,
+                "estimated_tokens": estimated,
+                "rate_limit_wait_seconds": round(rate_wait, 4)
+            }
+            response = response.model_copy(update={"metadata": metadata})
+
+        return response
+
+    async def _call_scheduled(
+        self,
+        prompt: str,
+        opts: GeminiOptions,
+        input_files: list[str | Path] | None,
+        on_chunk: ChunkCallback | None,
+        session: str | None,
+        priority: Priority,
+        env: dict[str, str] | None = None
+    ) -> GeminiResponse:
+        """
+        Run a CLI call inside a scheduler slot, re-queueing it if preempted.
+
+        A preempted call's process group is killed and the call waits for a
+        new slot. After ``max_preemptions`` the call can no longer be
+        preempted.
+
+        Args:
+            prompt: The prompt to send
+            opts: CLI options
+            input_files: Files to include
+            on_chunk: Optional callback receiving decoded output chunks
+            session: Caller identity for fair scheduling
+            priority: Scheduling priority
+            env: Subprocess environment (defaults to the client environment)
+
+        Returns:
+            GeminiResponse with the result
+        """
+        scheduler = self.scheduler
+        assert scheduler is not None
+        waited = 0.0
+        preemptions = 0
+
+        while True:
+            preemptible = preemptions < scheduler.config.max_preemptions
+            async with scheduler.slot(opts.model, session, priority, preemptible) as ticket:
+                waited += ticket.waited
+                response = await self._run_in_slot(
+                    ticket, prompt, opts, input_files, on_chunk, env
+                )
+            if response is not None:
+                break
+            preemptions += 1
+
+        metadata = {
+            **response.metadata,
+            "priority": priority,
+            "queue_wait_seconds": round(waited, 4)
+        }
+        if preemptions:
+            metadata["preemptions"] = preemptions
+        return response.model_copy(update={"metadata": metadata})
+
+    async def _run_in_slot(
+        self,
+        ticket: Ticket,
+        prompt: str,
+        opts: GeminiOptions,
+        input_files: list[str | Path] | None,
+        on_chunk: ChunkCallback | None,
+        env: dict[str, str] | None
+    ) -> GeminiResponse | None:
+        """
+        Run a CLI call while holding a scheduler slot.
+
+        The call's latency and outcome are reported to the scheduler. A
+        cancelled call (for example one that ran into its deadline) still
+        reports its latency, so long-running calls count as latency spikes.
+        A preemptible call's output is held back until it completes, since
+        a preempted call starts over and would stream its output again.
+
+        Args:
+            ticket: Slot the call runs under
+            prompt: The prompt to send
+            opts: CLI options
+            input_files: Files to include
+            on_chunk: Optional callback receiving decoded output chunks
+            env: Subprocess environment
+
+        Returns:
+            GeminiResponse with the result, or None if the call was preempted
+        """
+        scheduler = self.scheduler
+        assert scheduler is not None
+        started = time.monotonic()
+        held: list[str] = []
+        sink = on_chunk
+        if ticket.preemptible and on_chunk is not None:
+            async def hold(text: str) -> None:
+                held.append(text)
+            sink = hold
+        call = asyncio.create_task(self._call_gemini(prompt, opts, input_files, sink, env))
+
+        try:
+            if ticket.preemptible:
+                preempted = asyncio.create_task(ticket.preempted.wait())
+                try:
+                    await asyncio.wait({call, preempted}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    preempted.cancel()
+                if not call.done():
+                    # Killing the call kills its process group
+                    call.cancel()
+                    await asyncio.gather(call, return_exceptions=True)
+                    return None
+            response = await call
+        except asyncio.CancelledError:
+            if not call.done():
+                call.cancel()
+                await asyncio.gather(call, return_exceptions=True)
+            scheduler.observe(ticket, time.monotonic() - started)
+            raise
+
+        overload = "rate limited" if response.metadata.get("rate_limited") else None
+        scheduler.observe(ticket, time.monotonic() - started, overload)
+        if held and on_chunk is not None:
+            await on_chunk("".join(held))
+        return response
+
+    async def _get_cached(self, cache_key: str, prompt: str) -> GeminiResponse | None:
+        """
+        Look up a response in the memory cache, then the disk cache.
+
+        Disk hits, which are stored without their prompt, get the prompt
+        back and are promoted into the memory cache.
+
+        Args:
+            cache_key: Cache key from ``make_cache_key``
+            prompt: The prompt the key was built from
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        if self.disk_cache is not None:
+            try:
+                cached = await self.disk_cache.get(cache_key)
+            except Exception:
+                # A broken cache must never fail the call
+                cached = None
+            if cached is not None:
+                cached = cached.model_copy(update={"input_prompt": prompt})
+                if self.cache is not None:
+                    self.cache.put(cache_key, cached)
+                return cached
+
+        return None
+
+    async def _store_cached(self, cache_key: str, response: GeminiResponse) -> None:
+        """
+        Store a response in every configured cache.
+
+        Args:
+            cache_key: Cache key from ``make_cache_key``
+            response: Response to store
+        """
+        if self.cache is not None:
+            self.cache.put(cache_key, response)
+
+        if self.disk_cache is not None:
+            try:
+                await self.disk_cache.put(cache_key, response)
+            except Exception:
+                pass
+
+    def _build_command(self, opts: GeminiOptions) -> list[str]:
+        """
+        Build the Gemini CLI command line for the given options.
+
+        The prompt itself is not part of the returned command.
+
+        Args:
+            opts: CLI options
+
+        Returns:
+            Command line as a list of arguments
+        """
         import platform
-        
-        # Use provided options or defaults
-        opts = options or self.default_options
 
         # Build command arguments
         # On Windows, use gemini.cmd for better compatibility
@@ -166,23 +1279,6 @@ class GeminiCLIClient:
             cmd = ["gemini.cmd"]
         else:
             cmd = ["gemini"]
-        
-        # Get environment with API key
-        env = os.environ.copy()
-        # Try to get API key from environment or .env file
-        api_key = os.getenv('GEMINI_API_KEY', '')
-        if not api_key:
-            # Try to read from .env file if it exists
-            env_file = Path(__file__).parent.parent.parent / '.env'
-            if env_file.exists():
-                with open(env_file) as f:
-                    for line in f:
-                        if line.startswith('GEMINI_API_KEY='):
-                            api_key = line.split('=', 1)[1].strip()
-                            break
-        
-        if api_key:
-            env['GEMINI_API_KEY'] = api_key
 
         # Add model selection
         cmd.extend(["-m", opts.model])
@@ -201,76 +1297,155 @@ class GeminiCLIClient:
         if opts.checkpointing:
             cmd.append("-c")
 
-        # Add prompt using -p flag
-        cmd.extend(["-p", prompt])
+        return cmd
 
-        try:
-            # Handle input files if provided
-            if input_files:
-                # Create temporary file with file contents for context
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as temp_file:
-                    for file_path in input_files:
-                        try:
-                            with open(file_path, encoding='utf-8') as f:
-                                temp_file.write(f"--- {file_path} ---\n")
-                                temp_file.write(f.read())
-                                temp_file.write("\n\n")
-                        except Exception as e:
-                            # Skip files that can't be read
-                            temp_file.write(f"--- {file_path} (Error: {str(e)}) ---\n\n")
-
-                    temp_file_path = temp_file.name
-
-                # Add file to command via stdin
-                with open(temp_file_path) as temp_file:
-                    process = await asyncio.create_subprocess_exec(
-                        *cmd,
-                        stdin=temp_file,
-                        stdout=asyncio.subprocess.PIPE,
-                        stderr=asyncio.subprocess.PIPE,
-                        env=env
-                    )
+    def _build_env(self, credential: Credential | None = None) -> dict[str, str]:
+        """
+        Build the environment for Gemini CLI subprocesses.
+
+        The API key lookup runs once per client; later calls reuse the
+        resolved environment.
+
+        Args:
+            credential: Pool credential whose API key replaces the default
+
+        Returns:
+            Environment dictionary including GEMINI_API_KEY when available
+        """
+        if self._env is None:
+            # Get environment with API key from the environment or .env file
+            env = os.environ.copy()
+            api_key = resolve_api_key()
+            if api_key:
+                env['GEMINI_API_KEY'] = api_key
+            self._env = env
+
+        if credential is not None:
+            return {**self._env, 'GEMINI_API_KEY': credential.api_key}
+        return self._env
+
+    async def _call_gemini(
+        self,
+        prompt: str,
+        options: GeminiOptions | None = None,
+        input_files: list[str | Path] | None = None,
+        on_chunk: ChunkCallback | None = None,
+        env: dict[str, str] | None = None
+    ) -> GeminiResponse:
+        """
+        Run one generation on the backend.
 
-                # Clean up temp file
-                Path(temp_file_path).unlink()
+        Args:
+            prompt: The prompt to send
+            options: CLI options
+            input_files: Files to include
+            on_chunk: Optional callback receiving decoded output chunks
+            env: Environment carrying the API key (defaults to the client environment)
+
+        Returns:
+            GeminiResponse with the result
+        """
+        if (
+            input_files
+            and self.max_context_files is not None
+            and len(input_files) > self.max_context_files
+        ):
+            return GeminiResponse(
+                content="",
+                success=False,
+                error=(
+                    f"Too many input files: {len(input_files)} "
+                    f"(maximum is {self.max_context_files})"
+                ),
+                input_prompt=prompt
+            )
+
+        return await self.backend.generate(
+            prompt,
+            options or self.default_options,
+            input_files or [],
+            on_chunk,
+            env or self._build_env()
+        )
+
+    async def _run_cli(
+        self,
+        prompt: str,
+        opts: GeminiOptions,
+        input_files: list[str | Path],
+        on_chunk: ChunkCallback | None,
+        env: dict[str, str]
+    ) -> GeminiResponse:
+        """
+        Run the Gemini CLI once.
+
+        The prompt is delivered over stdin, after any input file contents,
+        rather than on the command line, so its size is not limited by the
+        OS argument length limit.
+
+        Args:
+            prompt: The prompt to send
+            opts: CLI options
+            input_files: Files to include
+            on_chunk: Optional callback receiving decoded stdout chunks
+            env: Subprocess environment
+
+        Returns:
+            GeminiResponse with the result
+        """
+        cmd = self._build_command(opts)
+        metadata: dict[str, Any] = {"command": " ".join(cmd)}
+
+        try:
+            if self.process_pool is not None:
+                process, warm = await self.process_pool.acquire(cmd, env)
+                metadata["process_pool"] = "warm" if warm else "cold"
             else:
-                # No input files, call directly
                 process = await asyncio.create_subprocess_exec(
                     *cmd,
+                    stdin=asyncio.subprocess.PIPE,
                     stdout=asyncio.subprocess.PIPE,
                     stderr=asyncio.subprocess.PIPE,
-                    env=env
+                    env=env,
+                    **new_group_kwargs()
                 )
 
-            # Wait for completion and get output
-            stdout, stderr = await process.communicate()
-
-            # Decode output
-            stdout_text = stdout.decode('utf-8') if stdout else ""
-            stderr_text = stderr.decode('utf-8') if stderr else ""
+            # Feed stdin while reading output
+            try:
+                stdout_text, stderr_text, stopped, truncated = await self._collect_output(
+                    process, input_files, prompt, on_chunk, opts.stop_after_json
+                )
+            except BaseException:
+                # Cancelled, timed out or failed: don't leave the CLI running
+                kill_process_group(process)
+                raise
 
-            if process.returncode == 0:
+            if stopped:
+                metadata["stopped_early"] = True
+            if truncated:
+                metadata["truncated"] = True
+            if process.returncode == 0 or stopped or truncated:
                 return GeminiResponse(
                     content=stdout_text.strip(),
                     success=True,
                     input_prompt=prompt,
                     metadata={
-                        "command": " ".join(cmd),
+                        **metadata,
                         "model": opts.model,
                         "files_included": len(input_files) if input_files else 0
                     }
                 )
             else:
                 error_msg = stderr_text or f"Command failed with exit code {process.returncode}"
+                metadata["exit_code"] = process.returncode
+                if is_rate_limit_error(error_msg):
+                    metadata["rate_limited"] = True
                 return GeminiResponse(
                     content="",
                     success=False,
                     error=error_msg,
                     input_prompt=prompt,
-                    metadata={
-                        "command": " ".join(cmd),
-                        "exit_code": process.returncode
-                    }
+                    metadata=metadata
                 )
 
         except Exception as e:
@@ -279,15 +1454,202 @@ class GeminiCLIClient:
                 success=False,
                 error=f"Subprocess error: {str(e)}",
                 input_prompt=prompt,
-                metadata={"command": " ".join(cmd)}
+                metadata=metadata
             )
 
+    async def _read_file_chunks(
+        self,
+        file_path: str | Path,
+        queue: asyncio.Queue[tuple[str, Any]]
+    ) -> None:
+        """
+        Read one input file in a worker thread and queue its chunks.
+
+        Queue items are ``("skip", reason)`` if the file is not included,
+        otherwise ``("start", None)``, any number of ``("data", bytes)``,
+        and finally ``("end", None)`` or ``("error", reason)``. The queue is
+        bounded, so reading pauses while the writer is behind. Files that
+        are not valid UTF-8 are checked in full before anything is queued,
+        so they are skipped rather than cut off; ``"error"`` is only sent
+        for a file that fails or changes while it is streamed.
+
+        Args:
+            file_path: File to read
+            queue: Queue receiving the file's chunks
+        """
+        f = None
+        try:
+            try:
+                size = (await asyncio.to_thread(os.stat, file_path)).st_size
+                if (
+                    self.max_file_size_mb is not None
+                    and size > self.max_file_size_mb * 1024 * 1024
+                ):
+                    await queue.put(("skip", f"Skipped: larger than {self.max_file_size_mb} MB"))
+                    return
+                f = await asyncio.to_thread(open, file_path, 'rb')
+                # Only valid UTF-8 is forwarded, matching the CLI's text input
+                await asyncio.to_thread(_check_utf8, f)
+            except Exception as e:
+                # Skip files that can't be read
+                await queue.put(("skip", f"Error: {str(e)}"))
+                return
+
+            await queue.put(("start", None))
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            while True:
+                try:
+                    data = await asyncio.to_thread(f.read, FILE_CHUNK_SIZE)
+                    decoder.decode(data, final=not data)
+                except Exception as e:
+                    await queue.put(("error", f"Error: {str(e)}"))
+                    return
+                if not data:
+                    break
+                await queue.put(("data", data))
+            await queue.put(("end", None))
+        finally:
+            if f is not None:
+                f.close()
+
+    async def _write_stdin(
+        self,
+        stdin: asyncio.StreamWriter,
+        input_files: list[str | Path],
+        prompt: str
+    ) -> None:
+        """
+        Write input files and the prompt to a process's stdin, then close it.
+
+        Files are read concurrently in worker threads and written in order,
+        each under a ``--- path ---`` header, with every write waiting for
+        the pipe to drain. The prompt follows, encoded one chunk at a time,
+        so no full copy of any input is held in memory. A process that exits
+        without reading all of its input is not an error.
+
+        Args:
+            stdin: The process's stdin stream
+            input_files: Files to include ahead of the prompt
+            prompt: The prompt to send
+        """
+        queues: list[asyncio.Queue[tuple[str, Any]]] = [
+            asyncio.Queue(maxsize=FILE_QUEUE_CHUNKS) for _ in input_files
+        ]
+        readers = [
+            asyncio.ensure_future(self._read_file_chunks(file_path, queue))
+            for file_path, queue in zip(input_files, queues, strict=True)
+        ]
+
+        async def write(data: bytes) -> None:
+            stdin.write(data)
+            await stdin.drain()
+
+        try:
+            for file_path, queue in zip(input_files, queues, strict=True):
+                kind, value = await queue.get()
+                if kind == "skip":
+                    await write(f"--- {file_path} ({value}) ---\n\n".encode())
+                    continue
+
+                await write(f"--- {file_path} ---\n".encode())
+                while True:
+                    kind, value = await queue.get()
+                    if kind == "data":
+                        await write(value)
+                    else:
+                        if kind == "error":
+                            await write(f"\n--- {file_path} ({value}) ---".encode())
+                        break
+                await write(b"\n\n")
+
+            for start in range(0, len(prompt), STDIN_CHUNK_CHARS):
+                await write(prompt[start:start + STDIN_CHUNK_CHARS].encode('utf-8'))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            for reader in readers:
+                reader.cancel()
+            await asyncio.gather(*readers, return_exceptions=True)
+            try:
+                stdin.close()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    async def _collect_output(
+        self,
+        process: asyncio.subprocess.Process,
+        input_files: list[str | Path],
+        prompt: str,
+        on_chunk: ChunkCallback | None,
+        stop_after_json: bool = False
+    ) -> tuple[str, str, bool, bool]:
+        """
+        Feed stdin and read output until a process finishes.
+
+        Stdin is written, stdout is decoded incrementally and stderr is
+        drained concurrently, so a full pipe in either direction can never
+        stall the child. Each decoded stdout chunk is passed to ``on_chunk``
+        as soon as it arrives. Memory is bounded: stdout is kept up to
+        ``max_response_chars``, after which the process is killed, and only
+        the end of stderr is kept.
+
+        Args:
+            process: Running Gemini CLI process
+            input_files: Files to write to stdin ahead of the prompt
+            prompt: The prompt to send
+            on_chunk: Optional callback receiving decoded stdout chunks
+            stop_after_json: Kill the process once the first ```json block
+                of stdout is complete and parses
+
+        Returns:
+            Tuple of (stdout_text, stderr_text, stopped_early, truncated)
+        """
+        if process.stdin is None or process.stdout is None or process.stderr is None:
+            raise GeminiCLIError("Gemini CLI process was started without pipes")
+        writer_task = asyncio.ensure_future(
+            self._write_stdin(process.stdin, input_files, prompt)
+        )
+        stderr = TailBuffer(STDERR_TAIL_SIZE)
+        stderr_task = asyncio.ensure_future(stderr.drain(process.stderr))
+        watcher = JsonBlockWatcher() if stop_after_json else None
+        stdout = BoundedText(self.max_response_chars)
+        stopped = False
+        try:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            while True:
+                data = await process.stdout.read(STREAM_CHUNK_SIZE)
+                text = stdout.append(decoder.decode(data, final=not data))
+                if text:
+                    if on_chunk is not None:
+                        await on_chunk(text)
+                    if watcher is not None and watcher.feed(text):
+                        stopped = True
+                        break
+                if stdout.truncated or not data:
+                    break
+            if stopped or stdout.truncated:
+                # The answer is complete or too long; don't wait for the rest
+                kill_process_group(process)
+            else:
+                await stderr_task
+                await writer_task
+        finally:
+            writer_task.cancel()
+            stderr_task.cancel()
+        await process.wait()
+
+        return stdout.getvalue(), stderr.text(), stopped, stdout.truncated
+
     async def call_with_structured_prompt(
         self,
         system_prompt: str,
         user_prompt: str,
         context: str | None = None,
-        options: GeminiOptions | None = None
+        options: GeminiOptions | None = None,
+        on_chunk: ChunkCallback | None = None,
+        timeout: float | None = None,
+        session: str | None = None,
+        priority: Priority = "normal"
     ) -> GeminiResponse:
         """
         Call Gemini with a structured prompt format.
@@ -297,6 +1659,10 @@ class GeminiCLIClient:
             user_prompt: User request
             context: Optional context information
             options: CLI options
+            on_chunk: Optional callback receiving decoded output chunks
+            timeout: Deadline in seconds (defaults to the client default)
+            session: Caller identity for fair scheduling (e.g. MCP session)
+            priority: Scheduling priority: interactive, normal or batch
             
         Returns:
             GeminiResponse with the result
@@ -309,7 +1675,70 @@ class GeminiCLIClient:
 
         full_prompt += f"User: {user_prompt}"
 
-        return await self.call_gemini(full_prompt, options)
+        return await self.call_gemini(
+            full_prompt,
+            options,
+            on_chunk=on_chunk,
+            timeout=timeout,
+            session=session,
+            priority=priority
+        )
+
+    async def call_with_layered_prompt(
+        self,
+        system_prompt: str,
+        question: str,
+        shared_context: str | None = None,
+        history: str | None = None,
+        document: str | None = None,
+        options: GeminiOptions | None = None,
+        on_chunk: ChunkCallback | None = None,
+        timeout: float | None = None,
+        session: str | None = None,
+        priority: Priority = "normal"
+    ) -> GeminiResponse:
+        """
+        Call Gemini with content ordered from most to least stable.
+
+        Calls about the same code repeat everything before the question
+        byte for byte, so the provider can serve that prefix from its
+        prompt cache. Its length is passed on as ``cache_prefix_chars`` for
+        backends that can also put it in an explicit cached context.
+
+        Args:
+            system_prompt: System-level instructions
+            question: Request-specific part of the prompt
+            shared_context: Optional context shared by all calls (e.g. repository files)
+            history: Optional earlier turns of a conversation
+            document: Optional material the question is about (e.g. the code)
+            options: CLI options
+            on_chunk: Optional callback receiving decoded output chunks
+            timeout: Deadline in seconds (defaults to the client default)
+            session: Caller identity for fair scheduling (e.g. MCP session)
+            priority: Scheduling priority: interactive, normal or batch
+
+        Returns:
+            GeminiResponse with the result
+        """
+        prefix = f"System: {system_prompt}\n\n"
+        if shared_context:
+            prefix += f"Shared context:\n{shared_context}\n\n"
+        if history:
+            prefix += f"Conversation so far:\n{history}\n\n"
+        if document:
+            prefix += f"Document:\n{document}\n\n"
+
+        opts = (options or self.default_options).model_copy(
+            update={"cache_prefix_chars": len(prefix)}
+        )
+        return await self.call_gemini(
+            prefix + f"User: {question}",
+            opts,
+            on_chunk=on_chunk,
+            timeout=timeout,
+            session=session,
+            priority=priority
+        )
 
     def update_default_options(self, **kwargs) -> None:
         """
@@ -321,3 +1750,27 @@ class GeminiCLIClient:
         current_dict = self.default_options.model_dump()
         current_dict.update(kwargs)
         self.default_options = GeminiOptions(**current_dict)
+
+    async def prewarm(self) -> None:
+        """
+        Pre-spawn pooled Gemini CLI processes for the default options.
+
+        One set is spawned per pool credential, or for the default
+        environment without a credential pool. Does nothing without a
+        process pool or when calls do not run the CLI as a subprocess.
+        """
+        if self.process_pool is None or not isinstance(self.backend, SubprocessBackend):
+            return
+        cmd = self._build_command(self.default_options)
+        pool = self.credentials
+        if pool is not None and pool.enabled:
+            envs = [self._build_env(credential) for credential in pool.members]
+        else:
+            envs = [self._build_env()]
+        await asyncio.gather(*(self.process_pool.prewarm(cmd, env) for env in envs))
+
+    async def close(self) -> None:
+        """Release background resources such as pooled processes and connections."""
+        await self.backend.close()
+        if self.process_pool is not None:
+            await self.process_pool.close()
@@ -0,0 +1,116 @@
+"""
+Hedged Gemini calls for tail-latency reduction.
+
+When a call runs longer than a chosen percentile of recent call
+latencies, a second identical call is started, optionally on a faster
+model. The first successful result is used and the other call is
+cancelled, which kills its process group.
+"""
+
+from collections import deque
+
+from pydantic import BaseModel, Field
+
+from .retry import RetryBudget
+
+
+class HedgeConfig(BaseModel):
+    """Configuration for hedged calls."""
+
+    enabled: bool = Field(default=False, description="Hedge slow calls")
+    percentile: float = Field(
+        default=0.95, gt=0, lt=1, description="Latency percentile after which to hedge"
+    )
+    min_samples: int = Field(
+        default=20, ge=1, description="Successful calls needed before hedging starts"
+    )
+    min_delay_seconds: float = Field(
+        default=1.0, ge=0, description="Never hedge a call sooner than this"
+    )
+    hedge_model: str | None = Field(
+        default=None, description="Model for the hedged call (same model if unset)"
+    )
+    history_size: int = Field(default=200, ge=1, description="Latency samples kept per model")
+
+
+class HedgePolicy:
+    """
+    Tracks call latencies and decides when to hedge.
+
+    Hedged calls spend from the shared retry budget when one is given.
+    """
+
+    def __init__(self, config: HedgeConfig | None = None, budget: RetryBudget | None = None):
+        """
+        Initialize the hedge policy.
+
+        Args:
+            config: Hedge configuration (uses defaults if None)
+            budget: Budget shared with retries
+        """
+        self.config = config or HedgeConfig()
+        self.budget = budget
+        self._latencies: dict[str, deque[float]] = {}
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def record(self, model: str, latency: float) -> None:
+        """
+        Record the latency of a successful call.
+
+        Args:
+            model: Model the call ran against
+            latency: Seconds the call took
+        """
+        samples = self._latencies.get(model)
+        if samples is None:
+            samples = self._latencies[model] = deque(maxlen=self.config.history_size)
+        samples.append(latency)
+
+    def delay(self, model: str) -> float | None:
+        """
+        Seconds after which a call should be hedged.
+
+        Args:
+            model: Model the call runs against
+
+        Returns:
+            Hedge delay, or None if hedging is off or there are too few samples
+        """
+        if not self.config.enabled:
+            return None
+        samples = self._latencies.get(model)
+        if not samples or len(samples) < self.config.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(int(self.config.percentile * len(ordered)), len(ordered) - 1)
+        return max(ordered[index], self.config.min_delay_seconds)
+
+    def try_hedge(self) -> bool:
+        """
+        Take budget for a hedged call.
+
+        Returns:
+            True if the hedge may be started
+        """
+        if self.budget is not None and not self.budget.try_spend():
+            return False
+        self.hedged += 1
+        return True
+
+    def get_stats(self) -> dict[str, object]:
+        """
+        Get hedging statistics.
+
+        Returns:
+            Dictionary with hedge counts and current per-model hedge delays
+        """
+        return {
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "delay_seconds": {
+                model: round(delay, 3)
+                for model in self._latencies
+                if (delay := self.delay(model)) is not None
+            },
+        }
@@ -0,0 +1,349 @@
+"""
+Direct HTTP backend for the Gemini API.
+
+This module calls the Gemini REST API instead of spawning the Gemini CLI
+for every request. Requests share a pool of keep-alive connections (over
+HTTP/2 when the h2 package is installed) and responses are streamed as
+server-sent events, so output is forwarded as soon as it is generated.
+Long stable prompt prefixes can be stored as explicit cached contexts,
+which later calls with the same prefix reference instead of resending.
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+import httpx
+from pydantic import BaseModel, Field
+
+from .gemini_client import (
+    ChunkCallback,
+    GeminiBackend,
+    GeminiOptions,
+    GeminiResponse,
+    JsonBlockWatcher,
+    format_input_files,
+)
+from .output_buffer import BoundedText
+from .rate_limit import estimate_tokens, is_rate_limit_error
+
+
+class HttpBackendConfig(BaseModel):
+    """Configuration for the direct HTTP backend."""
+
+    base_url: str = Field(
+        default="https://generativelanguage.googleapis.com", description="Gemini API endpoint"
+    )
+    api_version: str = Field(default="v1beta", description="Gemini API version")
+    max_connections: int = Field(default=20, ge=1, description="Maximum open connections")
+    max_keepalive_connections: int = Field(
+        default=10, ge=0, description="Idle connections kept open for reuse"
+    )
+    keepalive_expiry_seconds: float = Field(
+        default=60.0, ge=0, description="How long an idle connection is kept"
+    )
+    connect_timeout_seconds: float = Field(
+        default=10.0, gt=0, description="Timeout for opening a connection"
+    )
+    http2: bool = Field(default=True, description="Use HTTP/2 when the h2 package is installed")
+    context_cache: bool = Field(
+        default=False, description="Store long stable prompt prefixes as explicit cached contexts"
+    )
+    context_cache_min_tokens: int = Field(
+        default=4096, ge=0, description="Estimated prefix tokens below which no cached context is made"
+    )
+    context_cache_ttl_seconds: float = Field(
+        default=600.0, gt=0, description="Lifetime of a cached context"
+    )
+    max_cached_contexts: int = Field(
+        default=32, ge=1, description="Cached contexts kept; the least recently used is deleted"
+    )
+
+
+def _error_message(status_code: int, body: bytes) -> str:
+    """Build an error message from a Gemini API error response."""
+    try:
+        error = json.loads(body)["error"]
+        return f"HTTP {status_code} {error.get('status', '')}: {error.get('message', '')}".strip()
+    except (ValueError, KeyError, TypeError):
+        return f"HTTP {status_code}: {body[:500].decode('utf-8', errors='replace')}"
+
+
+class HttpBackend(GeminiBackend):
+    """Calls the Gemini REST API over pooled, streaming HTTP connections."""
+
+    name = "http"
+
+    def __init__(
+        self,
+        config: HttpBackendConfig | None = None,
+        max_file_size_mb: float | None = None,
+        max_response_chars: int | None = None
+    ):
+        """
+        Initialize the backend.
+
+        The connection pool is created on first use.
+
+        Args:
+            config: HTTP backend configuration (uses defaults if None)
+            max_file_size_mb: Input files larger than this are skipped
+            max_response_chars: Longer answers are truncated and flagged
+        """
+        self.config = config or HttpBackendConfig()
+        self.max_file_size_mb = max_file_size_mb
+        self.max_response_chars = max_response_chars
+        self._client: httpx.AsyncClient | None = None
+        # Prefix digest -> (cached context name, local expiry, API key that owns it)
+        self._contexts: OrderedDict[str, tuple[str, float, str]] = OrderedDict()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client holding the connection pool."""
+        if self._client is None:
+            config = self.config
+            self._client = httpx.AsyncClient(
+                base_url=config.base_url,
+                http2=config.http2 and importlib.util.find_spec("h2") is not None,
+                limits=httpx.Limits(
+                    max_connections=config.max_connections,
+                    max_keepalive_connections=config.max_keepalive_connections,
+                    keepalive_expiry=config.keepalive_expiry_seconds
+                ),
+                # Reads are bounded by the client's call deadline instead
+                timeout=httpx.Timeout(None, connect=config.connect_timeout_seconds)
+            )
+        return self._client
+
+    async def generate(
+        self,
+        prompt: str,
+        options: GeminiOptions,
+        input_files: list[str | Path],
+        on_chunk: ChunkCallback | None,
+        env: dict[str, str]
+    ) -> GeminiResponse:
+        """
+        Stream one generation from the Gemini API.
+
+        Args:
+            prompt: The prompt to send
+            options: Call options (CLI-only flags are ignored)
+            input_files: Files to include ahead of the prompt
+            on_chunk: Optional callback receiving text as it is generated
+            env: Environment whose GEMINI_API_KEY authenticates the request
+
+        Returns:
+            GeminiResponse with the result
+        """
+        metadata: dict[str, Any] = {"backend": self.name, "model": options.model}
+
+        def failure(error: str) -> GeminiResponse:
+            return GeminiResponse(
+                content="", success=False, error=error, input_prompt=prompt, metadata=metadata
+            )
+
+        api_key = env.get('GEMINI_API_KEY') or env.get('GOOGLE_API_KEY')
+        if not api_key:
+            return failure("No Gemini API key configured for the HTTP backend")
+
+        parts = []
+        if input_files:
+            blocks = await asyncio.to_thread(format_input_files, input_files, self.max_file_size_mb)
+            parts = [{"text": block} for block in blocks]
+        body = {"contents": [{"role": "user", "parts": [*parts, {"text": prompt}]}]}
+
+        # Files go ahead of the prompt, so a prompt prefix is only stable without them
+        prefix_chars = options.cache_prefix_chars
+        cached_body = None
+        if self.config.context_cache and prefix_chars and not input_files:
+            prefix = prompt[:prefix_chars]
+            if estimate_tokens(prefix) >= self.config.context_cache_min_tokens:
+                name = await self._cached_context(options.model, prefix, api_key, metadata)
+                if name is not None:
+                    cached_body = {
+                        "cachedContent": name,
+                        "contents": [{"role": "user", "parts": [{"text": prompt[prefix_chars:]}]}],
+                    }
+
+        output = BoundedText(self.max_response_chars)
+        try:
+            error = None
+            if cached_body is not None:
+                error = await self._stream(options, cached_body, api_key, on_chunk, output, metadata)
+                if error is not None and not output.length and metadata.get("status_code") in (400, 403, 404):
+                    # The cached context expired or was deleted on the server: send it all
+                    self._contexts.pop(self._context_key(options.model, prefix, api_key), None)
+                    metadata["context_cache"] = "expired"
+                    metadata.pop("status_code")
+                    metadata.pop("rate_limited", None)
+                    error = await self._stream(options, body, api_key, on_chunk, output, metadata)
+            else:
+                error = await self._stream(options, body, api_key, on_chunk, output, metadata)
+        except httpx.HTTPError as e:
+            return failure(f"Network error: {type(e).__name__}: {str(e)}")
+        except json.JSONDecodeError as e:
+            return failure(f"Invalid response from Gemini API: {str(e)}")
+        if error is not None:
+            return failure(error)
+
+        if output.truncated:
+            metadata["truncated"] = True
+        return GeminiResponse(
+            content=output.getvalue().strip(),
+            success=True,
+            input_prompt=prompt,
+            metadata={**metadata, "files_included": len(input_files)}
+        )
+
+    async def _stream(
+        self,
+        options: GeminiOptions,
+        body: dict[str, Any],
+        api_key: str,
+        on_chunk: ChunkCallback | None,
+        output: BoundedText,
+        metadata: dict[str, Any]
+    ) -> str | None:
+        """
+        Make one streaming generateContent request.
+
+        Args:
+            options: Call options
+            body: Request body
+            api_key: API key for the request
+            on_chunk: Optional callback receiving text as it is generated
+            output: Receives the generated text; the stream is closed once it is full
+            metadata: Receives HTTP version, status, usage and cache-hit tokens
+
+        Returns:
+            An error message, or None on success
+        """
+        url = f"/{self.config.api_version}/models/{options.model}:streamGenerateContent"
+        watcher = JsonBlockWatcher() if options.stop_after_json else None
+        async with self.client.stream(
+            "POST",
+            url,
+            params={"alt": "sse"},
+            headers={"x-goog-api-key": api_key},
+            json=body
+        ) as response:
+            metadata["http_version"] = response.http_version
+            if response.status_code != 200:
+                error = _error_message(response.status_code, await response.aread())
+                metadata["status_code"] = response.status_code
+                if response.status_code == 429 or is_rate_limit_error(error):
+                    metadata["rate_limited"] = True
+                return error
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                event = json.loads(line[len("data:"):])
+                if "error" in event:
+                    error = event["error"]
+                    metadata["status_code"] = error.get("code")
+                    return f"Stream error {error.get('status', '')}: {error.get('message', '')}"
+                if "usageMetadata" in event:
+                    usage = event["usageMetadata"]
+                    metadata["usage"] = usage
+                    metadata["cached_tokens"] = usage.get("cachedContentTokenCount", 0)
+
+                candidates = event.get("candidates") or [{}]
+                text = "".join(
+                    part.get("text", "")
+                    for part in candidates[0].get("content", {}).get("parts", [])
+                )
+                text = output.append(text)
+                if text and on_chunk is not None:
+                    await on_chunk(text)
+                if text and watcher is not None and watcher.feed(text):
+                    # The answer is complete; closing the stream stops generation
+                    metadata["stopped_early"] = True
+                    break
+                if output.truncated:
+                    break
+        return None
+
+    @staticmethod
+    def _context_key(model: str, prefix: str, api_key: str) -> str:
+        """Identify a cached context by model, prefix and owning API key."""
+        return hashlib.sha256(f"{model}\0{api_key}\0{prefix}".encode()).hexdigest()
+
+    async def _cached_context(
+        self,
+        model: str,
+        prefix: str,
+        api_key: str,
+        metadata: dict[str, Any]
+    ) -> str | None:
+        """
+        Get the cached context holding a prompt prefix, creating it if needed.
+
+        Args:
+            model: Model the context is for
+            prefix: Stable prompt prefix
+            api_key: API key that owns the context
+            metadata: Receives ``context_cache`` ("hit", "created" or "unavailable")
+
+        Returns:
+            The cached context's resource name, or None if it could not be made
+        """
+        key = self._context_key(model, prefix, api_key)
+        now = time.monotonic()
+        entry = self._contexts.get(key)
+        if entry is not None and entry[1] > now:
+            self._contexts.move_to_end(key)
+            metadata["context_cache"] = "hit"
+            return entry[0]
+
+        ttl = self.config.context_cache_ttl_seconds
+        try:
+            response = await self.client.post(
+                f"/{self.config.api_version}/cachedContents",
+                headers={"x-goog-api-key": api_key},
+                json={
+                    "model": f"models/{model}",
+                    "contents": [{"role": "user", "parts": [{"text": prefix}]}],
+                    "ttl": f"{ttl:.0f}s",
+                }
+            )
+            name = response.json()["name"] if response.status_code == 200 else None
+        except (httpx.HTTPError, ValueError, KeyError):
+            name = None
+        if name is None:
+            # E.g. the prefix is below the model's minimum for explicit caching
+            metadata["context_cache"] = "unavailable"
+            return None
+
+        # Stop using the context a little before the server drops it
+        self._contexts[key] = (name, now + ttl * 0.9, api_key)
+        metadata["context_cache"] = "created"
+        while len(self._contexts) > self.config.max_cached_contexts:
+            _, (old_name, _, old_key) = self._contexts.popitem(last=False)
+            await self._delete_context(old_name, old_key)
+        return name
+
+    async def _delete_context(self, name: str, api_key: str) -> None:
+        """Delete a cached context on the server, ignoring failures."""
+        try:
+            await self.client.delete(
+                f"/{self.config.api_version}/{name}", headers={"x-goog-api-key": api_key}
+            )
+        except httpx.HTTPError:
+            pass
+
+    async def close(self) -> None:
+        """Delete cached contexts and close pooled connections."""
+        if self._client is not None:
+            contexts = list(self._contexts.values())
+            self._contexts.clear()
+            for name, _, api_key in contexts:
+                await self._delete_context(name, api_key)
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,94 @@
+"""
+Bounded buffers for Gemini output.
+
+A runaway generation or a CLI in debug mode can write far more than any
+useful answer. These buffers cap what a call keeps in memory: response
+text up to a limit, after which it is truncated and flagged, and only the
+end of stderr, which is where the CLI reports errors.
+"""
+
+import asyncio
+
+# Bytes read from a stream per read
+READ_CHUNK_SIZE = 4096
+
+
+class BoundedText:
+    """Accumulates response text up to a maximum length."""
+
+    def __init__(self, max_chars: int | None = None):
+        """
+        Initialize an empty buffer.
+
+        Args:
+            max_chars: Most characters kept (unbounded if None)
+        """
+        self.max_chars = max_chars
+        self.length = 0
+        self.truncated = False
+        self._parts: list[str] = []
+
+    def append(self, text: str) -> str:
+        """
+        Add text, keeping only what fits.
+
+        Args:
+            text: Text to add
+
+        Returns:
+            The part of ``text`` that was kept (empty once the buffer is full)
+        """
+        if self.max_chars is not None and self.length + len(text) > self.max_chars:
+            text = text[:max(self.max_chars - self.length, 0)]
+            self.truncated = True
+        if text:
+            self._parts.append(text)
+            self.length += len(text)
+        return text
+
+    def getvalue(self) -> str:
+        """Return the text kept so far."""
+        return "".join(self._parts)
+
+
+class TailBuffer:
+    """Keeps the last bytes written to it."""
+
+    def __init__(self, size: int):
+        """
+        Initialize an empty buffer.
+
+        Args:
+            size: Bytes kept
+        """
+        self.size = size
+        self.dropped = 0
+        self._data = bytearray()
+
+    def write(self, data: bytes) -> None:
+        """
+        Add bytes, dropping the oldest beyond the buffer size.
+
+        Args:
+            data: Bytes to add
+        """
+        self._data += data
+        excess = len(self._data) - self.size
+        if excess > 0:
+            del self._data[:excess]
+            self.dropped += excess
+
+    async def drain(self, stream: asyncio.StreamReader) -> None:
+        """
+        Read a stream to its end into the buffer.
+
+        Args:
+            stream: Stream to drain (e.g. a child's stderr)
+        """
+        while data := await stream.read(READ_CHUNK_SIZE):
+            self.write(data)
+
+    def text(self) -> str:
+        """Return the kept bytes as text, marking where earlier output was dropped."""
+        text = self._data.decode('utf-8', errors='replace')
+        return f"...{text}" if self.dropped else text
@@ -0,0 +1,56 @@
+"""
+Process group helpers for Gemini CLI subprocesses.
+
+The Gemini CLI is a Node.js program that may start children of its own.
+Each CLI process is therefore started in its own process group (a new
+session on POSIX, a new process group on Windows) so that the whole tree
+can be killed when a call is cancelled or times out.
+"""
+
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+from typing import Any
+
+
+def new_group_kwargs() -> dict[str, Any]:
+    """
+    Get subprocess keyword arguments that start a new process group.
+
+    Returns:
+        Keyword arguments for ``asyncio.create_subprocess_exec``
+    """
+    if sys.platform == 'win32':
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """
+    Kill a process and every process in its group.
+
+    Processes that already exited are ignored.
+
+    Args:
+        process: Process started with ``new_group_kwargs``
+    """
+    if process.returncode is not None:
+        return
+
+    try:
+        if sys.platform == 'win32':
+            # taskkill /T walks the tree that CREATE_NEW_PROCESS_GROUP started
+            subprocess.Popen(
+                ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError, OSError):
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
@@ -0,0 +1,267 @@
+"""
+Warm process pool for Gemini CLI invocations.
+
+This module keeps pre-spawned, idle ``gemini`` processes ready per command
+line so that a call only pays for writing its prompt to stdin instead of a
+full Node.js startup, module load and credential load.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from pydantic import BaseModel, Field
+
+from .process_group import kill_process_group, new_group_kwargs
+
+
+class ProcessPoolConfig(BaseModel):
+    """Configuration for the warm Gemini process pool."""
+
+    enabled: bool = Field(default=False, description="Enable the warm process pool")
+    min_size: int = Field(
+        default=1, ge=0, description="Idle processes to keep warm per command line"
+    )
+    max_size: int = Field(
+        default=4,
+        ge=1,
+        description="Most processes per command line, idle and running; "
+                    "no process is pre-spawned beyond it"
+    )
+    idle_timeout_seconds: float = Field(
+        default=300.0, gt=0, description="Reap idle processes older than this"
+    )
+
+
+@dataclass
+class _IdleProcess:
+    """An idle pre-spawned process and the time it became idle."""
+
+    process: asyncio.subprocess.Process
+    idle_since: float = field(default_factory=time.monotonic)
+
+
+PoolKey = tuple[tuple[str, ...], tuple[tuple[str, str], ...]]
+
+
+class GeminiProcessPool:
+    """
+    Pool of pre-spawned Gemini CLI processes keyed by command line.
+
+    Each process is started with its stdin attached to a pipe and blocks
+    until the prompt is written and stdin is closed. Processes are single
+    use: a process handed out by ``acquire`` is never returned to the pool,
+    and the pool refills itself in the background. Processes handed out
+    count against ``max_size`` until they exit.
+    """
+
+    def __init__(self, config: ProcessPoolConfig | None = None):
+        """
+        Initialize the process pool.
+
+        Args:
+            config: Pool configuration (uses defaults if None)
+        """
+        self.config = config or ProcessPoolConfig()
+        self._idle: dict[PoolKey, deque[_IdleProcess]] = {}
+        self._running: dict[PoolKey, set[asyncio.subprocess.Process]] = {}
+        self._starting: dict[PoolKey, int] = {}
+        self._refills: dict[PoolKey, asyncio.Task[None]] = {}
+        self._reaper: asyncio.Task[None] | None = None
+        self._closed = False
+        self.warm_hits = 0
+        self.cold_spawns = 0
+
+    @staticmethod
+    def _key(cmd: list[str], env: dict[str, str]) -> PoolKey:
+        """Build the pool key for a command line and environment."""
+        return tuple(cmd), tuple(sorted(env.items()))
+
+    async def _spawn(self, cmd: list[str], env: dict[str, str]) -> asyncio.subprocess.Process:
+        """Start a new process waiting on its stdin."""
+        return await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+            **new_group_kwargs()
+        )
+
+    async def acquire(
+        self,
+        cmd: list[str],
+        env: dict[str, str]
+    ) -> tuple[asyncio.subprocess.Process, bool]:
+        """
+        Take a process for the given command line.
+
+        Args:
+            cmd: Command line the process must run
+            env: Environment the process must run with
+
+        Returns:
+            Tuple of (process, warm) where warm is True if the process was
+            pre-spawned and False if it had to be started on demand
+
+        Raises:
+            RuntimeError: If the pool has been closed
+        """
+        if self._closed:
+            raise RuntimeError("Process pool is closed")
+
+        key = self._key(cmd, env)
+        idle = self._idle.setdefault(key, deque())
+
+        process = None
+        while idle:
+            candidate = idle.popleft().process
+            if candidate.returncode is None:
+                process = candidate
+                break
+
+        warm = process is not None
+        if process is None:
+            self._starting[key] = self._starting.get(key, 0) + 1
+            try:
+                process = await self._spawn(cmd, env)
+            finally:
+                self._starting[key] -= 1
+            self.cold_spawns += 1
+        else:
+            self.warm_hits += 1
+        self._running.setdefault(key, set()).add(process)
+
+        self._schedule_refill(key, cmd, env)
+        self._ensure_reaper()
+        return process, warm
+
+    async def prewarm(self, cmd: list[str], env: dict[str, str]) -> None:
+        """
+        Fill the pool for a command line up to ``min_size``.
+
+        Args:
+            cmd: Command line to pre-spawn
+            env: Environment to pre-spawn with
+        """
+        await self._refill(self._key(cmd, env), cmd, env)
+        self._ensure_reaper()
+
+    def idle_count(self, cmd: list[str], env: dict[str, str]) -> int:
+        """Return the number of idle processes for a command line."""
+        return len(self._idle.get(self._key(cmd, env), ()))
+
+    def _schedule_refill(self, key: PoolKey, cmd: list[str], env: dict[str, str]) -> None:
+        """Start a background refill for a key unless one is already running."""
+        running = self._refills.get(key)
+        if running is not None and not running.done():
+            return
+        self._refills[key] = asyncio.create_task(self._refill(key, cmd, env))
+
+    def _in_use(self, key: PoolKey) -> int:
+        """Return the number of processes of a key being started on demand or still running."""
+        running = self._running.get(key, set())
+        running.difference_update([p for p in running if p.returncode is not None])
+        if not running:
+            self._running.pop(key, None)
+        return len(running) + self._starting.get(key, 0)
+
+    async def _refill(self, key: PoolKey, cmd: list[str], env: dict[str, str]) -> None:
+        """
+        Spawn idle processes until the key holds ``min_size`` of them.
+
+        Refilling stops early once idle and running processes of the key
+        reach ``max_size``.
+        """
+        idle = self._idle.setdefault(key, deque())
+        while (
+            not self._closed
+            and len(idle) < self.config.min_size
+            and len(idle) + self._in_use(key) < self.config.max_size
+        ):
+            try:
+                process = await self._spawn(cmd, env)
+            except Exception:
+                # The on-demand path will surface the spawn error to the caller
+                return
+            if self._closed:
+                _kill(process)
+                return
+            idle.append(_IdleProcess(process))
+
+    def _ensure_reaper(self) -> None:
+        """Start the idle reaper task if it is not running."""
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_forever())
+
+    async def _reap_forever(self) -> None:
+        """Periodically reap idle processes until the pool is empty or closed."""
+        interval = max(self.config.idle_timeout_seconds / 2, 0.05)
+        while not self._closed:
+            await asyncio.sleep(interval)
+            self.reap_idle()
+            if not any(self._idle.values()):
+                return
+
+    def reap_idle(self) -> int:
+        """
+        Kill idle processes that have exceeded the idle timeout or exited.
+
+        Returns:
+            Number of processes removed from the pool
+        """
+        now = time.monotonic()
+        removed = 0
+        for key, idle in list(self._idle.items()):
+            kept: deque[_IdleProcess] = deque()
+            for entry in idle:
+                expired = now - entry.idle_since >= self.config.idle_timeout_seconds
+                if expired or entry.process.returncode is not None:
+                    _kill(entry.process)
+                    removed += 1
+                else:
+                    kept.append(entry)
+            if kept:
+                self._idle[key] = kept
+            else:
+                del self._idle[key]
+        return removed
+
+    async def close(self) -> None:
+        """Kill all idle processes and stop background tasks."""
+        self._closed = True
+        tasks = [task for task in self._refills.values() if not task.done()]
+        if self._reaper is not None and not self._reaper.done():
+            tasks.append(self._reaper)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        processes = [entry.process for idle in self._idle.values() for entry in idle]
+        self._idle.clear()
+        self._running.clear()
+        self._starting.clear()
+        self._refills.clear()
+        for process in processes:
+            _kill(process)
+        for process in processes:
+            await process.wait()
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Get pool statistics.
+
+        Returns:
+            Dictionary with idle, warm hit and cold spawn counts
+        """
+        return {
+            "idle": sum(len(idle) for idle in self._idle.values()),
+            "warm_hits": self.warm_hits,
+            "cold_spawns": self.cold_spawns,
+        }
+
+
+def _kill(process: asyncio.subprocess.Process) -> None:
+    """Kill a pooled process and its children."""
+    kill_process_group(process)
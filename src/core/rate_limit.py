@@ -0,0 +1,322 @@
+"""
+Quota-aware rate limiting for Gemini calls.
+
+This module paces calls with token buckets per model and API key so that
+configured requests-per-minute and tokens-per-minute quotas are not
+exceeded. Token counts are estimated from text length before a call and
+corrected once the response is known. Batch calls leave part of each
+bucket untouched so that they only run on spare (off-peak) budget.
+"""
+
+import asyncio
+import hashlib
+import math
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+from .scheduler import Priority
+
+# Rough average for English text and code
+CHARS_PER_TOKEN = 4
+
+_RATE_LIMIT_PATTERN = re.compile(
+    r"\b429\b|RESOURCE_EXHAUSTED|rate.?limit|quota exceeded|too many requests",
+    re.IGNORECASE
+)
+
+
+class QuotaConfig(BaseModel):
+    """Per-minute quota for one model and API key."""
+
+    requests_per_minute: int | None = Field(
+        default=None, gt=0, description="Requests per minute (unlimited if unset)"
+    )
+    tokens_per_minute: int | None = Field(
+        default=None, gt=0, description="Input plus output tokens per minute (unlimited if unset)"
+    )
+
+
+class RateLimitConfig(BaseModel):
+    """Configuration for the Gemini rate limiter."""
+
+    default_quota: QuotaConfig = Field(
+        default_factory=QuotaConfig, description="Quota for models without an override"
+    )
+    model_quotas: dict[str, QuotaConfig] = Field(
+        default_factory=dict, description="Per-model quota overrides"
+    )
+    expected_output_tokens: int = Field(
+        default=1024, ge=0, description="Output tokens assumed before a response arrives"
+    )
+    batch_headroom: float = Field(
+        default=0.5, ge=0, lt=1,
+        description="Fraction of each bucket that batch calls leave for other work"
+    )
+    cooldown_seconds: float = Field(
+        default=10.0, ge=0, description="Pause after Gemini reports a rate limit error"
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def estimate_input_tokens(prompt: str, input_files: list[str | Path] | None = None) -> int:
+    """
+    Estimate the input tokens of a call from the prompt and file sizes.
+
+    Args:
+        prompt: Prompt text
+        input_files: Files included in the call
+
+    Returns:
+        Estimated token count
+    """
+    size = 0
+    for file_path in input_files or []:
+        try:
+            size += os.path.getsize(file_path)
+        except OSError:
+            pass
+    return estimate_tokens(prompt) + math.ceil(size / CHARS_PER_TOKEN)
+
+
+def is_rate_limit_error(message: str | None) -> bool:
+    """
+    Check whether a CLI error message reports a rate limit or exhausted quota.
+
+    Args:
+        message: Error output from the CLI
+
+    Returns:
+        True if the message looks like a rate limit error
+    """
+    return message is not None and _RATE_LIMIT_PATTERN.search(message) is not None
+
+
+def credential_id(env: dict[str, str]) -> str:
+    """
+    Get a short, non-secret identifier for the API key in an environment.
+
+    Args:
+        env: Environment the CLI runs with
+
+    Returns:
+        Hash prefix of the API key, or "default" without one
+    """
+    api_key = env.get("GEMINI_API_KEY") or env.get("GOOGLE_API_KEY")
+    if not api_key:
+        return "default"
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+class TokenBucket:
+    """Token bucket refilled continuously up to its capacity."""
+
+    def __init__(self, capacity: float, per_second: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            capacity: Maximum tokens held
+            per_second: Refill rate
+        """
+        self.capacity = capacity
+        self.per_second = per_second
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last update."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.per_second)
+        self._updated = now
+
+    def available(self) -> float:
+        """Return the tokens currently in the bucket."""
+        self._refill()
+        return self.tokens
+
+    def delay(self, amount: float, floor: float = 0.0) -> float:
+        """
+        Seconds until ``amount`` can be taken while leaving ``floor`` behind.
+
+        Amounts larger than the bucket are capped to its capacity so that
+        oversized calls are paced rather than blocked forever.
+        """
+        self._refill()
+        needed = min(amount + floor, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.per_second
+
+    def take(self, amount: float) -> None:
+        """Remove tokens; the balance may go negative to record overuse."""
+        self._refill()
+        self.tokens -= amount
+
+    def give(self, amount: float) -> None:
+        """Return tokens, up to the capacity."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+@dataclass
+class _Budget:
+    """Buckets and counters for one model and API key."""
+
+    requests: TokenBucket | None
+    tokens: TokenBucket | None
+    paused_until: float = 0.0
+    throttled: int = 0
+    waited_seconds: float = 0.0
+    rate_limit_errors: int = 0
+
+
+class RateLimiter:
+    """
+    Paces Gemini calls to stay within per-minute quotas.
+
+    Budgets are kept per (model, API key). A model without a configured
+    quota is never delayed, except for the cool-down that follows a rate
+    limit error reported by the CLI.
+    """
+
+    def __init__(self, config: RateLimitConfig | None = None):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            config: Rate limit configuration (uses defaults if None)
+        """
+        self.config = config or RateLimitConfig()
+        self._budgets: dict[tuple[str, str], _Budget] = {}
+
+    def _budget(self, model: str, key_id: str) -> _Budget:
+        """Get or create the budget for a model and API key."""
+        budget = self._budgets.get((model, key_id))
+        if budget is None:
+            quota = self.config.model_quotas.get(model, self.config.default_quota)
+            rpm, tpm = quota.requests_per_minute, quota.tokens_per_minute
+            budget = _Budget(
+                requests=TokenBucket(rpm, rpm / 60) if rpm else None,
+                tokens=TokenBucket(tpm, tpm / 60) if tpm else None
+            )
+            self._budgets[(model, key_id)] = budget
+        return budget
+
+    def _delay(self, budget: _Budget, tokens: int, priority: Priority) -> float:
+        """Seconds until a call may start."""
+        headroom = self.config.batch_headroom if priority == "batch" else 0.0
+        delay = budget.paused_until - time.monotonic()
+        if budget.requests is not None:
+            delay = max(delay, budget.requests.delay(1, headroom * budget.requests.capacity))
+        if budget.tokens is not None:
+            delay = max(delay, budget.tokens.delay(tokens, headroom * budget.tokens.capacity))
+        return delay
+
+    async def acquire(
+        self,
+        model: str,
+        key_id: str,
+        tokens: int,
+        priority: Priority = "normal"
+    ) -> float:
+        """
+        Wait until a call fits within the quota, then charge it.
+
+        Args:
+            model: Model the call runs against
+            key_id: Identifier of the API key (see ``credential_id``)
+            tokens: Estimated input plus output tokens
+            priority: Scheduling priority; batch calls leave headroom
+
+        Returns:
+            Seconds spent waiting
+        """
+        budget = self._budget(model, key_id)
+        waited = 0.0
+        delay = self._delay(budget, tokens, priority)
+        if delay > 0:
+            budget.throttled += 1
+        while delay > 0:
+            await asyncio.sleep(delay)
+            waited += delay
+            delay = self._delay(budget, tokens, priority)
+
+        if budget.requests is not None:
+            budget.requests.take(1)
+        if budget.tokens is not None:
+            budget.tokens.take(tokens)
+        budget.waited_seconds += waited
+        return waited
+
+    def settle(self, model: str, key_id: str, estimated: int, actual: int) -> None:
+        """
+        Correct a charge once the real token use is known.
+
+        Args:
+            model: Model the call ran against
+            key_id: Identifier of the API key
+            estimated: Tokens charged by ``acquire``
+            actual: Tokens the call actually used (or a better estimate)
+        """
+        bucket = self._budget(model, key_id).tokens
+        if bucket is None or actual == estimated:
+            return
+        if actual > estimated:
+            bucket.take(actual - estimated)
+        else:
+            bucket.give(estimated - actual)
+
+    def pause(self, model: str, key_id: str, seconds: float | None = None) -> None:
+        """
+        Hold back calls after the CLI reported a rate limit error.
+
+        Args:
+            model: Model that was rate limited
+            key_id: Identifier of the API key
+            seconds: Pause length (defaults to ``cooldown_seconds``)
+        """
+        budget = self._budget(model, key_id)
+        cooldown = self.config.cooldown_seconds if seconds is None else seconds
+        budget.paused_until = max(budget.paused_until, time.monotonic() + cooldown)
+        budget.rate_limit_errors += 1
+
+    def get_stats(self) -> dict[str, dict[str, object]]:
+        """
+        Get rate limiter statistics.
+
+        Returns:
+            Dictionary keyed by "model/key" with remaining budget, pause
+            time, throttled call count and total wait
+        """
+        stats: dict[str, dict[str, object]] = {}
+        now = time.monotonic()
+        for (model, key_id), budget in self._budgets.items():
+            entry: dict[str, object] = {
+                "throttled": budget.throttled,
+                "waited_seconds": round(budget.waited_seconds, 3),
+                "rate_limit_errors": budget.rate_limit_errors,
+                "paused_seconds": round(max(budget.paused_until - now, 0.0), 3),
+            }
+            if budget.requests is not None:
+                entry["requests_available"] = round(budget.requests.available(), 2)
+            if budget.tokens is not None:
+                entry["tokens_available"] = round(budget.tokens.available())
+            stats[f"{model}/{key_id}"] = entry
+        return stats
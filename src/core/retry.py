@@ -0,0 +1,176 @@
+"""
+Retry policy for transient Gemini CLI failures.
+
+This module decides which failures are worth retrying, spaces retries
+with exponential backoff and full jitter, and caps retries (and hedged
+calls) with a budget shared by all calls, so that retries cannot multiply
+the load on a service that is already failing.
+"""
+
+import random
+import re
+import time
+from collections import deque
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from .auth import is_auth_error
+
+# Window over which the retry budget counts calls and retries
+BUDGET_WINDOW_SECONDS = 60.0
+
+# API status tokens are matched case-sensitively so that words such as
+# "internal" in Node stack traces (node:internal/...) do not count
+_TRANSIENT_PATTERN = re.compile(
+    r"\b(500|502|503|504)\b|\b(UNAVAILABLE|INTERNAL|DEADLINE_EXCEEDED)\b"
+    r"|ECONNRESET|ETIMEDOUT|EAI_AGAIN|(?i:socket hang up|fetch failed|network error)"
+)
+
+
+class RetryConfig(BaseModel):
+    """Configuration for retries of transient failures."""
+
+    enabled: bool = Field(default=True, description="Retry transient failures")
+    max_attempts: int = Field(default=3, ge=1, description="Attempts per call, including the first")
+    base_delay_seconds: float = Field(
+        default=0.5, ge=0, description="Backoff before the first retry (before jitter)"
+    )
+    max_delay_seconds: float = Field(default=8.0, ge=0, description="Backoff cap")
+    budget_ratio: float = Field(
+        default=0.2, ge=0,
+        description="Retries and hedges allowed per call over the last minute"
+    )
+    budget_min_retries: int = Field(
+        default=5, ge=0, description="Retries always allowed per minute regardless of traffic"
+    )
+
+
+def is_transient_failure(error: str | None, metadata: dict[str, Any]) -> bool:
+    """
+    Check whether a failed call is worth retrying.
+
+    Rate limit errors and server or network errors are transient. Deadline
+    cancellations, rejections by an open circuit breaker, authentication
+    and input errors are not.
+
+    Args:
+        error: Error message of the failed response
+        metadata: Metadata of the failed response
+
+    Returns:
+        True if the call may succeed when retried
+    """
+    if metadata.get("cancelled") or metadata.get("circuit_open"):
+        return False
+    if is_auth_error(error):
+        return False
+    if metadata.get("rate_limited"):
+        return True
+    return error is not None and _TRANSIENT_PATTERN.search(error) is not None
+
+
+class RetryBudget:
+    """
+    Sliding-window budget shared by retries and hedged calls.
+
+    Over the last minute, extra attempts may not exceed ``ratio`` times the
+    number of calls, plus a small fixed allowance for quiet periods.
+    """
+
+    def __init__(self, ratio: float, min_retries: int):
+        """
+        Initialize the budget.
+
+        Args:
+            ratio: Extra attempts allowed per call
+            min_retries: Extra attempts always allowed per window
+        """
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self._calls: deque[float] = deque()
+        self._extra: deque[float] = deque()
+        self.denied = 0
+
+    def _trim(self, now: float) -> None:
+        """Forget events older than the window."""
+        cutoff = now - BUDGET_WINDOW_SECONDS
+        for events in (self._calls, self._extra):
+            while events and events[0] < cutoff:
+                events.popleft()
+
+    def record_call(self) -> None:
+        """Count a first attempt."""
+        self._calls.append(time.monotonic())
+
+    def try_spend(self) -> bool:
+        """
+        Take one extra attempt from the budget.
+
+        Returns:
+            True if the retry or hedge may go ahead
+        """
+        now = time.monotonic()
+        self._trim(now)
+        allowed = max(self.min_retries, self.ratio * len(self._calls))
+        if len(self._extra) >= allowed:
+            self.denied += 1
+            return False
+        self._extra.append(now)
+        return True
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Get budget usage over the current window.
+
+        Returns:
+            Dictionary with call, extra attempt and denial counts
+        """
+        self._trim(time.monotonic())
+        return {"calls": len(self._calls), "extra_attempts": len(self._extra), "denied": self.denied}
+
+
+class RetryPolicy:
+    """Retry decisions and backoff for Gemini calls."""
+
+    def __init__(self, config: RetryConfig | None = None):
+        """
+        Initialize the retry policy.
+
+        Args:
+            config: Retry configuration (uses defaults if None)
+        """
+        self.config = config or RetryConfig()
+        self.budget = RetryBudget(self.config.budget_ratio, self.config.budget_min_retries)
+
+    def should_retry(self, attempt: int, error: str | None, metadata: dict[str, Any]) -> bool:
+        """
+        Decide whether to retry after a failed attempt.
+
+        Args:
+            attempt: Number of the attempt that failed, starting at 1
+            error: Error message of the failed response
+            metadata: Metadata of the failed response
+
+        Returns:
+            True if another attempt should be made
+        """
+        return (
+            self.config.enabled
+            and attempt < self.config.max_attempts
+            and is_transient_failure(error, metadata)
+            and self.budget.try_spend()
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Delay before the next attempt, with full jitter.
+
+        Args:
+            attempt: Number of the attempt that failed, starting at 1
+
+        Returns:
+            Seconds to wait
+        """
+        ceiling = min(self.config.max_delay_seconds, self.config.base_delay_seconds * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
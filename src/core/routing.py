@@ -0,0 +1,154 @@
+"""
+Model routing for Gemini tool requests.
+
+This module picks the model for each request instead of always using the
+default. Small prompts go to a fast model; large prompts, complex review
+focuses and advanced explanations go to the large model. Tools can be
+pinned to a model or given their own size threshold. A cascade runs a
+list of models cheapest first and stops at the first acceptable answer.
+"""
+
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from pydantic import BaseModel, Field
+
+from .gemini_client import GeminiResponse
+
+
+class ToolRoutingConfig(BaseModel):
+    """Routing overrides for one tool."""
+
+    model: str | None = Field(default=None, description="Always use this model")
+    small_max_tokens: int | None = Field(
+        default=None, ge=0, description="Tool-specific small prompt threshold"
+    )
+
+
+class RoutingConfig(BaseModel):
+    """Configuration for model routing."""
+
+    enabled: bool = Field(default=False, description="Pick the model per request")
+    small_model: str = Field(default="gemini-2.5-flash", description="Model for small requests")
+    large_model: str | None = Field(
+        default=None, description="Model for large or complex requests (default model if unset)"
+    )
+    small_max_tokens: int = Field(
+        default=4000, ge=0, description="Estimated prompt tokens up to which the small model is used"
+    )
+    large_focus: list[str] = Field(
+        default_factory=lambda: ["security", "bugs"],
+        description="Code review focuses that always use the large model"
+    )
+    large_detail_levels: list[str] = Field(
+        default_factory=lambda: ["advanced"],
+        description="Explanation detail levels that always use the large model"
+    )
+    tools: dict[str, ToolRoutingConfig] = Field(
+        default_factory=dict, description="Per-tool overrides keyed by tool name"
+    )
+    review_cascade: list[str] = Field(
+        default_factory=list,
+        description="Models tried cheapest first for code reviews, escalating on invalid output"
+    )
+
+
+@dataclass
+class RouteDecision:
+    """The model chosen for a request and why."""
+
+    model: str
+    reason: str
+
+
+class ModelRouter:
+    """Chooses a model from a request's size and kind."""
+
+    def __init__(self, config: RoutingConfig | None = None, default_model: str = "gemini-2.5-pro"):
+        """
+        Initialize the router.
+
+        Args:
+            config: Routing configuration (uses defaults if None)
+            default_model: Model used when routing is off or no large model is set
+        """
+        self.config = config or RoutingConfig()
+        self.default_model = default_model
+
+    def route(
+        self,
+        tool: str,
+        prompt_tokens: int,
+        focus: str | None = None,
+        detail_level: str | None = None
+    ) -> RouteDecision:
+        """
+        Choose the model for a request.
+
+        Args:
+            tool: Name of the MCP tool
+            prompt_tokens: Estimated tokens of the full prompt
+            focus: Code review focus, if any
+            detail_level: Explanation detail level, if any
+
+        Returns:
+            The chosen model and the reason
+        """
+        config = self.config
+        if not config.enabled:
+            return RouteDecision(self.default_model, "routing disabled")
+
+        large = config.large_model or self.default_model
+        override = config.tools.get(tool)
+        if override is not None and override.model:
+            return RouteDecision(override.model, f"{tool} is pinned to {override.model}")
+        if focus is not None and focus in config.large_focus:
+            return RouteDecision(large, f"focus '{focus}' needs the large model")
+        if detail_level is not None and detail_level in config.large_detail_levels:
+            return RouteDecision(large, f"detail level '{detail_level}' needs the large model")
+
+        threshold = config.small_max_tokens
+        if override is not None and override.small_max_tokens is not None:
+            threshold = override.small_max_tokens
+        if prompt_tokens <= threshold:
+            return RouteDecision(
+                config.small_model, f"~{prompt_tokens} prompt tokens <= {threshold}"
+            )
+        return RouteDecision(large, f"~{prompt_tokens} prompt tokens > {threshold}")
+
+
+async def run_cascade(
+    models: list[str],
+    attempt: Callable[[str, bool], Awaitable[GeminiResponse]],
+    accept: Callable[[GeminiResponse], bool]
+) -> tuple[GeminiResponse, list[dict[str, object]]]:
+    """
+    Try models in order until one gives an acceptable answer.
+
+    A tier escalates when its call fails or ``accept`` rejects the output.
+    The last tier's response is returned even if it is not acceptable.
+
+    Args:
+        models: Models to try, cheapest first
+        attempt: Makes the call for a model; the flag is True for the last tier
+        accept: Checks a successful response
+
+    Returns:
+        The answering response and, per tier tried, the model, latency and
+        whether its answer was accepted
+    """
+    tiers: list[dict[str, object]] = []
+    for index, model in enumerate(models):
+        last = index == len(models) - 1
+        started = time.monotonic()
+        response = await attempt(model, last)
+        accepted = response.success and accept(response)
+        tiers.append({
+            "model": model,
+            "latency_seconds": round(time.monotonic() - started, 3),
+            "accepted": accepted,
+        })
+        if accepted or last:
+            return response, tiers
+    raise ValueError("Cascade needs at least one model")
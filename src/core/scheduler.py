@@ -0,0 +1,346 @@
+"""
+Concurrency scheduler for Gemini CLI invocations.
+
+This module bounds how many Gemini CLI processes run at once for each
+model. Calls carry a priority (interactive, normal or batch). Calls over
+the limit wait in per-priority queues that are FIFO within a session and
+round-robin across sessions, so one busy MCP client cannot starve the
+others. Slots can be reserved for higher priorities, and running batch
+calls can be preempted when interactive calls are waiting.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from .adaptive import AdaptiveConfig, AIMDController
+
+Priority = Literal["interactive", "normal", "batch"]
+
+# Highest priority first
+PRIORITIES: tuple[Priority, ...] = ("interactive", "normal", "batch")
+
+DEFAULT_SESSION = "default"
+
+# Number of recent queue waits kept per model for percentile metrics
+WAIT_SAMPLES = 512
+
+
+def _default_reserved_slots() -> dict[Priority, int]:
+    """Reserve one slot per model for interactive calls."""
+    return {"interactive": 1}
+
+
+def _default_preemptible() -> list[Priority]:
+    """Let interactive calls preempt batch calls."""
+    return ["batch"]
+
+
+class SchedulerConfig(BaseModel):
+    """Configuration for the Gemini call scheduler."""
+
+    enabled: bool = Field(default=True, description="Limit concurrent Gemini processes")
+    max_concurrency: int = Field(
+        default=4, ge=1, description="Maximum concurrent Gemini processes per model"
+    )
+    model_concurrency: dict[str, int] = Field(
+        default_factory=dict, description="Per-model overrides of max_concurrency"
+    )
+    reserved_slots: dict[Priority, int] = Field(
+        default_factory=_default_reserved_slots,
+        description="Slots per model that lower priorities may not use"
+    )
+    preemptible: list[Priority] = Field(
+        default_factory=_default_preemptible,
+        description="Priorities whose running calls interactive calls may preempt"
+    )
+    max_preemptions: int = Field(
+        default=2, ge=0, description="Preemptions after which a call runs to completion"
+    )
+    adaptive: AdaptiveConfig = Field(
+        default_factory=AdaptiveConfig,
+        description="AIMD tuning of max_concurrency from observed latency and errors"
+    )
+
+
+@dataclass(eq=False)
+class Ticket:
+    """A granted concurrency slot."""
+
+    model: str
+    priority: Priority
+    preemptible: bool = False
+    waited: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+    preempted: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+@dataclass(eq=False)
+class _Waiter:
+    """A queued call waiting for a slot."""
+
+    future: asyncio.Future[Ticket]
+    ticket: Ticket
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _ModelLane:
+    """Slots, queues and metrics for one model."""
+
+    limit: int
+    active: set[Ticket] = field(default_factory=set)
+    queues: dict[Priority, OrderedDict[str, deque[_Waiter]]] = field(
+        default_factory=lambda: {priority: OrderedDict() for priority in PRIORITIES}
+    )
+    admitted: int = 0
+    preemptions: int = 0
+    waits: deque[float] = field(default_factory=lambda: deque(maxlen=WAIT_SAMPLES))
+
+    def queued(self, priority: Priority | None = None) -> int:
+        priorities = PRIORITIES if priority is None else (priority,)
+        return sum(
+            len(queue) for p in priorities for queue in self.queues[p].values()
+        )
+
+
+class GeminiScheduler:
+    """
+    Per-model concurrency limiter with fair, prioritized queues.
+
+    Each model has its own slot limit. A call of a given priority may only
+    take a slot while fewer than ``limit`` minus the slots reserved for
+    higher priorities are in use (but always at least one). Queued calls
+    are served strictly by priority, and within a priority by cycling
+    through the sessions with waiting calls, taking the oldest call of each.
+    """
+
+    def __init__(self, config: SchedulerConfig | None = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            config: Scheduler configuration (uses defaults if None)
+        """
+        self.config = config or SchedulerConfig()
+        self.adaptive = AIMDController(self.config.adaptive)
+        self._lanes: dict[str, _ModelLane] = {}
+
+    def _lane(self, model: str) -> _ModelLane:
+        """Get or create the lane for a model."""
+        lane = self._lanes.get(model)
+        if lane is None:
+            limit = self.config.model_concurrency.get(model, self.config.max_concurrency)
+            adaptive = self.config.adaptive
+            if adaptive.enabled:
+                limit = min(max(limit, adaptive.min_limit), adaptive.max_limit)
+            lane = self._lanes[model] = _ModelLane(limit=limit)
+        return lane
+
+    def _ceiling(self, lane: _ModelLane, priority: Priority) -> int:
+        """Number of slots a priority may use."""
+        higher = PRIORITIES[:PRIORITIES.index(priority)]
+        reserved = sum(self.config.reserved_slots.get(p, 0) for p in higher)
+        return max(lane.limit - reserved, 1)
+
+    def _can_admit(self, lane: _ModelLane, priority: Priority) -> bool:
+        """Return True if a call of this priority may take a slot now."""
+        return len(lane.active) < self._ceiling(lane, priority)
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        model: str,
+        session: str | None = None,
+        priority: Priority = "normal",
+        preemptible: bool = True
+    ) -> AsyncIterator[Ticket]:
+        """
+        Hold a concurrency slot for a model while the block runs.
+
+        Args:
+            model: Model the call runs against
+            session: Caller identity used for fairness (e.g. MCP session)
+            priority: Priority class of the call
+            preemptible: Allow preemption if the priority is preemptible
+
+        Yields:
+            The granted ticket
+        """
+        ticket = await self.acquire(model, session, priority, preemptible)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    async def acquire(
+        self,
+        model: str,
+        session: str | None = None,
+        priority: Priority = "normal",
+        preemptible: bool = True
+    ) -> Ticket:
+        """
+        Wait for a concurrency slot for a model.
+
+        Args:
+            model: Model the call runs against
+            session: Caller identity used for fairness (e.g. MCP session)
+            priority: Priority class of the call
+            preemptible: Allow preemption if the priority is preemptible
+
+        Returns:
+            Ticket for the slot; its ``preempted`` event is set when the
+            holder should give the slot up
+        """
+        lane = self._lane(model)
+        ticket = Ticket(
+            model=model,
+            priority=priority,
+            preemptible=preemptible and priority in self.config.preemptible
+        )
+
+        ahead = PRIORITIES[:PRIORITIES.index(priority) + 1]
+        if not self.config.enabled or (
+            self._can_admit(lane, priority) and not any(lane.queued(p) for p in ahead)
+        ):
+            self._admit(lane, ticket, 0.0)
+            return ticket
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), ticket)
+        lane.queues[priority].setdefault(session or DEFAULT_SESSION, deque()).append(waiter)
+        if priority == "interactive":
+            self._preempt(lane)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was granted just before cancellation; hand it on
+                self.release(ticket)
+            else:
+                self._discard(lane, waiter)
+            raise
+
+        return ticket
+
+    def release(self, ticket: Ticket) -> None:
+        """
+        Return a slot taken with ``acquire`` and wake queued calls.
+
+        Args:
+            ticket: Ticket returned by ``acquire``
+        """
+        lane = self._lane(ticket.model)
+        lane.active.discard(ticket)
+        self._wake(lane)
+
+    def observe(self, ticket: Ticket, latency: float, overload: str | None = None) -> None:
+        """
+        Feed a finished call to the adaptive controller, if enabled.
+
+        Must be called before the ticket is released.
+
+        Args:
+            ticket: Ticket the call ran under
+            latency: Seconds the call held its slot
+            overload: Reason if the call failed from overload
+        """
+        if not self.config.adaptive.enabled:
+            return
+        lane = self._lane(ticket.model)
+        saturated = len(lane.active) >= lane.limit or lane.queued() > 0
+        new_limit = self.adaptive.observe(
+            ticket.model, lane.limit, ticket.started_at, latency, saturated, overload
+        )
+        if new_limit != lane.limit:
+            lane.limit = new_limit
+            self._wake(lane)
+
+    def _admit(self, lane: _ModelLane, ticket: Ticket, waited: float) -> None:
+        """Give a slot to a ticket and record its queue wait."""
+        ticket.waited = waited
+        ticket.started_at = time.monotonic()
+        lane.active.add(ticket)
+        lane.admitted += 1
+        lane.waits.append(waited)
+
+    def _wake(self, lane: _ModelLane) -> None:
+        """Grant free slots to queued calls, highest priority first."""
+        for priority in PRIORITIES:
+            queues = lane.queues[priority]
+            while queues and self._can_admit(lane, priority):
+                session, queue = next(iter(queues.items()))
+                waiter = queue.popleft()
+                if queue:
+                    queues.move_to_end(session)
+                else:
+                    del queues[session]
+                if waiter.future.done():
+                    continue
+                self._admit(lane, waiter.ticket, time.monotonic() - waiter.enqueued_at)
+                waiter.future.set_result(waiter.ticket)
+            if queues:
+                # Lower priorities must not overtake a blocked higher one
+                return
+
+    def _preempt(self, lane: _ModelLane) -> None:
+        """Ask preemptible calls to give up slots for waiting interactive calls."""
+        if not self.config.enabled:
+            return
+        pending = sum(1 for ticket in lane.active if ticket.preempted.is_set())
+        needed = lane.queued("interactive") - pending
+        victims = sorted(
+            (t for t in lane.active if t.preemptible and not t.preempted.is_set()),
+            key=lambda t: (PRIORITIES.index(t.priority), t.started_at),
+            reverse=True
+        )
+        # Lowest priority, most recently started first: least work lost
+        for ticket in victims[:max(needed, 0)]:
+            ticket.preempted.set()
+            lane.preemptions += 1
+
+    @staticmethod
+    def _discard(lane: _ModelLane, waiter: _Waiter) -> None:
+        """Remove a cancelled waiter from its session queue."""
+        queues = lane.queues[waiter.ticket.priority]
+        for session, queue in list(queues.items()):
+            if waiter in queue:
+                queue.remove(waiter)
+                if not queue:
+                    del queues[session]
+                return
+
+    def get_stats(self) -> dict[str, dict[str, object]]:
+        """
+        Get per-model scheduler statistics.
+
+        Returns:
+            Dictionary mapping model to limit, active and queued calls per
+            priority, admitted and preempted counts and queue wait times
+            over recent calls
+        """
+        stats: dict[str, dict[str, object]] = {}
+        for model, lane in self._lanes.items():
+            waits = sorted(lane.waits)
+            stats[model] = {
+                "limit": lane.limit,
+                "active": len(lane.active),
+                "queued": lane.queued(),
+                "active_by_priority": {
+                    p: sum(1 for t in lane.active if t.priority == p) for p in PRIORITIES
+                },
+                "queued_by_priority": {p: lane.queued(p) for p in PRIORITIES},
+                "sessions_waiting": len({s for p in PRIORITIES for s in lane.queues[p]}),
+                "admitted": lane.admitted,
+                "preemptions": lane.preemptions,
+                "wait_avg_seconds": round(sum(waits) / len(waits), 4) if waits else 0.0,
+                "wait_p95_seconds": round(waits[int(0.95 * (len(waits) - 1))], 4) if waits else 0.0,
+                "wait_max_seconds": round(waits[-1], 4) if waits else 0.0,
+            }
+        return stats
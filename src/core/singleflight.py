@@ -0,0 +1,76 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+This module lets concurrent callers that ask for the same key share one
+in-flight operation instead of each starting their own.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight(Generic[T]):
+    """An in-flight operation and the number of callers waiting on it."""
+
+    def __init__(self, task: asyncio.Task[T]):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesce concurrent calls with the same key into one operation.
+
+    The shared operation runs in its own task. A caller that is cancelled
+    only stops waiting; the operation itself is cancelled once the last
+    waiter has gone.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no operations in flight."""
+        self._flights: dict[str, _Flight[T]] = {}
+        self.coalesced = 0
+
+    def in_flight(self, key: str) -> bool:
+        """Return True if an operation for the key is running."""
+        return key in self._flights
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """
+        Run ``func`` for a key, or join the run already in flight.
+
+        Args:
+            key: Identity of the operation
+            func: Zero-argument coroutine function producing the result
+
+        Returns:
+            Tuple of (result, shared) where shared is True if this caller
+            joined an operation started by another caller
+        """
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(func()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        flight.waiters -= 1
+        return result, shared
+
+    def _forget(self, key: str, flight: _Flight[T]) -> None:
+        """Drop a finished operation so the next call starts afresh."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
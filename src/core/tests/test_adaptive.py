@@ -0,0 +1,99 @@
+"""
+Tests for adaptive (AIMD) concurrency control.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from ..adaptive import AdaptiveConfig, AIMDController
+from ..gemini_client import GeminiCLIClient, GeminiResponse
+from ..scheduler import GeminiScheduler, SchedulerConfig
+
+
+class TestAIMDController:
+    """Test AIMDController functionality."""
+
+    def test_additive_increase_when_saturated(self):
+        """Test that the limit grows by one step per limit-many healthy calls."""
+        controller = AIMDController(AdaptiveConfig(enabled=True, max_limit=5))
+        limit = 2
+        limits = []
+        for _ in range(6):
+            limit = controller.observe("m", limit, 0.0, 1.0, saturated=True)
+            limits.append(limit)
+
+        assert limits == [2, 3, 3, 3, 4, 4]
+        assert [d.action for d in controller.decisions] == ["increase", "increase"]
+
+    def test_no_increase_when_idle_or_at_max(self):
+        """Test that unsaturated calls and the maximum stop growth."""
+        controller = AIMDController(AdaptiveConfig(enabled=True, max_limit=2))
+        assert controller.observe("m", 1, 0.0, 1.0, saturated=False) == 1
+        assert controller.observe("m", 2, 0.0, 1.0, saturated=True) == 2
+        assert controller.observe("m", 2, 0.0, 1.0, saturated=True) == 2
+
+    def test_multiplicative_decrease_once_per_episode(self):
+        """Test that overload halves the limit once for calls already running."""
+        controller = AIMDController(AdaptiveConfig(enabled=True, min_limit=1))
+        with patch('src.core.adaptive.time.monotonic', return_value=100.0):
+            assert controller.observe("m", 8, 50.0, 1.0, True, overload="rate limited") == 4
+            # Started before the decrease: same episode
+            assert controller.observe("m", 4, 60.0, 1.0, True, overload="rate limited") == 4
+            # Started after: a new episode
+            assert controller.observe("m", 4, 101.0, 1.0, True, overload="rate limited") == 2
+
+        assert controller.decisions[-1].reason == "rate limited"
+
+    def test_latency_spike_decreases(self):
+        """Test that a call far slower than the average counts as overload."""
+        controller = AIMDController(AdaptiveConfig(enabled=True, latency_spike_ratio=3.0))
+        for _ in range(5):
+            controller.observe("m", 4, 0.0, 1.0, saturated=False)
+
+        assert controller.observe("m", 4, 10.0, 5.0, saturated=False) == 2
+        assert "latency" in controller.decisions[-1].reason
+        assert controller.get_stats()["latency_avg_seconds"]["m"] == 1.0
+
+
+class TestAdaptiveScheduling:
+    """Test the scheduler and client with adaptive limits."""
+
+    @pytest.mark.asyncio
+    async def test_throttling_shrinks_limit(self):
+        """Test that rate limited calls lower the model's concurrency limit."""
+        scheduler = GeminiScheduler(SchedulerConfig(
+            max_concurrency=4, reserved_slots={}, adaptive=AdaptiveConfig(enabled=True)
+        ))
+        client = GeminiCLIClient(scheduler=scheduler)
+        client._verified_auth = True
+
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            await asyncio.sleep(0.01)
+            return GeminiResponse(
+                content="", success=False, error="429", input_prompt=prompt,
+                metadata={"rate_limited": True}
+            )
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call):
+            await asyncio.gather(*(client.call_gemini(f"Prompt {i}") for i in range(4)))
+
+        stats = scheduler.get_stats()[client.default_options.model]
+        assert stats["limit"] == 2
+        assert len(scheduler.adaptive.decisions) == 1
+
+    @pytest.mark.asyncio
+    async def test_raised_limit_admits_waiters(self):
+        """Test that growing the limit immediately wakes queued calls."""
+        scheduler = GeminiScheduler(SchedulerConfig(
+            max_concurrency=1, reserved_slots={}, adaptive=AdaptiveConfig(enabled=True)
+        ))
+        holder = await scheduler.acquire("m")
+        waiter = asyncio.create_task(scheduler.acquire("m"))
+        await asyncio.sleep(0)
+
+        scheduler.observe(holder, 1.0)
+        ticket = await asyncio.wait_for(waiter, 1)
+        assert scheduler.get_stats()["m"]["limit"] == 2
+        assert ticket.waited >= 0
@@ -0,0 +1,73 @@
+"""
+Tests for admission control.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from ..admission import AdmissionConfig, AdmissionController, ServerBusyError
+
+
+class TestAdmissionController:
+    """Test AdmissionController functionality."""
+
+    def test_rejects_over_pending_limit(self):
+        """Test that requests beyond max_pending_requests are rejected."""
+        controller = AdmissionController(AdmissionConfig(max_pending_requests=2))
+        with controller.admit(10), controller.admit(10):
+            with pytest.raises(ServerBusyError, match="2 requests are pending"):
+                with controller.admit(10):
+                    pass
+        with controller.admit(10):
+            pass
+
+        stats = controller.get_stats()
+        assert stats["admitted"] == 3
+        assert stats["rejected"] == {"pending_requests": 1}
+        assert stats["pending"] == 0
+
+    def test_rejects_over_pending_bytes(self):
+        """Test that pending prompt size is bounded."""
+        controller = AdmissionController(AdmissionConfig(max_pending_prompt_mb=1))
+        with controller.admit(800 * 1024):
+            with pytest.raises(ServerBusyError, match="MB"):
+                with controller.admit(400 * 1024):
+                    pass
+            with controller.admit(100 * 1024):
+                pass
+
+    def test_oversized_request_admitted_when_idle(self):
+        """Test that a lone request is never rejected."""
+        controller = AdmissionController(AdmissionConfig(max_pending_prompt_mb=1))
+        with controller.admit(5 * 1024 * 1024):
+            assert controller.get_stats()["pending_mb"] == 5.0
+
+    def test_rejects_on_estimated_wait(self):
+        """Test that the wait estimate uses pending requests, duration and concurrency."""
+        controller = AdmissionController(
+            AdmissionConfig(max_estimated_wait_seconds=60), concurrency=2
+        )
+        with patch('src.core.admission.time.monotonic', side_effect=[0.0, 50.0]):
+            with controller.admit(1):
+                pass
+        assert controller.estimated_wait() == 0.0
+
+        with patch('src.core.admission.time.monotonic', return_value=100.0):
+            with controller.admit(1), controller.admit(1):
+                assert controller.estimated_wait() == 50.0
+                with controller.admit(1):
+                    with pytest.raises(ServerBusyError) as excinfo:
+                        with controller.admit(1):
+                            pass
+
+        assert excinfo.value.retry_after == 50.0
+        assert "estimated wait" in str(excinfo.value)
+
+    def test_disabled(self):
+        """Test that a disabled controller admits everything."""
+        controller = AdmissionController(
+            AdmissionConfig(enabled=False, max_pending_requests=1)
+        )
+        with controller.admit(1), controller.admit(1):
+            assert controller.get_stats()["pending"] == 2
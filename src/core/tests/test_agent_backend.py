@@ -0,0 +1,250 @@
+"""
+Tests for the agent session backend, against a local fake agent process.
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from ..agent_backend import AgentBackend, AgentBackendConfig
+from ..gemini_client import GeminiCLIClient, GeminiOptions
+
+ENV = {"GEMINI_API_KEY": "test-key", "PATH": ""}
+
+# Speaks enough of the agent protocol to answer prompts. The reply to a
+# prompt echoes its text in two chunks; "slow" prompts pause between
+# chunks, "crash" exits the process, "session" answers with the session ID,
+# "cancelled" lists the cancelled sessions and "json" streams a review that
+# only ends when the turn is cancelled.
+FAKE_AGENT = r'''
+import json, os, sys, threading, time
+
+lock = threading.Lock()
+cancelled = set()
+sessions = 0
+
+def send(message):
+    with lock:
+        sys.stdout.write(json.dumps(message) + "\n")
+        sys.stdout.flush()
+
+def chunk(session, text):
+    send({"jsonrpc": "2.0", "method": "session/update", "params": {
+        "sessionId": session,
+        "update": {"sessionUpdate": "agent_message_chunk", "content": {"type": "text", "text": text}},
+    }})
+
+def run_prompt(request_id, session, text):
+    if text == "crash":
+        sys.stderr.write("agent crashed\n")
+        sys.stderr.flush()
+        os._exit(3)
+    if text == "json":
+        chunk(session, '```json\n{"summary": "ok"}\n```')
+        while session not in cancelled:
+            time.sleep(0.01)
+        send({"jsonrpc": "2.0", "id": request_id, "result": {"stopReason": "cancelled"}})
+        return
+    if text == "session":
+        chunk(session, session)
+        send({"jsonrpc": "2.0", "id": request_id, "result": {"stopReason": "end_turn"}})
+        return
+    if text == "cancelled":
+        chunk(session, ",".join(sorted(cancelled)))
+        send({"jsonrpc": "2.0", "id": request_id, "result": {"stopReason": "end_turn"}})
+        return
+    if text == "denied":
+        send({"jsonrpc": "2.0", "id": request_id, "error": {"code": -32000, "message": "Quota exceeded"}})
+        return
+    chunk(session, f"echo {os.getpid()}: ")
+    if text.startswith("slow"):
+        time.sleep(0.3)
+    chunk(session, text)
+    send({"jsonrpc": "2.0", "id": request_id, "result": {"stopReason": "end_turn"}})
+
+for line in sys.stdin:
+    message = json.loads(line)
+    method, params = message.get("method"), message.get("params", {})
+    if method == "initialize":
+        send({"jsonrpc": "2.0", "id": message["id"], "result": {"protocolVersion": 1}})
+    elif method == "session/new":
+        sessions += 1
+        send({"jsonrpc": "2.0", "id": message["id"], "result": {"sessionId": f"s{sessions}"}})
+    elif method == "session/prompt":
+        text = params["prompt"][0]["text"]
+        threading.Thread(target=run_prompt, args=(message["id"], params["sessionId"], text)).start()
+    elif method == "session/cancel":
+        cancelled.add(params["sessionId"])
+'''
+
+
+@pytest.fixture
+async def backend(tmp_path):
+    """Agent backend running the fake agent."""
+    script = tmp_path / "fake_agent.py"
+    script.write_text(FAKE_AGENT)
+    backend = AgentBackend(AgentBackendConfig(
+        command=[sys.executable, str(script)],
+        processes_per_model=1,
+        startup_timeout_seconds=10
+    ))
+    yield backend
+    await backend.close()
+
+
+async def _generate(backend, prompt, options=None, on_chunk=None):
+    """Run one call on the backend with a short deadline."""
+    return await asyncio.wait_for(
+        backend.generate(prompt, options or GeminiOptions(), [], on_chunk, ENV),
+        timeout=10
+    )
+
+
+class TestAgentBackend:
+    """Test AgentBackend against the fake agent."""
+
+    @pytest.mark.asyncio
+    async def test_streams_and_reuses_process(self, backend):
+        """Test that message chunks stream and calls share one agent process."""
+        received = []
+
+        async def on_chunk(text):
+            received.append(text)
+
+        first = await _generate(backend, "Hi", on_chunk=on_chunk)
+        second = await _generate(backend, "Again")
+
+        pid = first.metadata["agent_pid"]
+        assert first.success is True
+        assert first.content == f"echo {pid}: Hi"
+        assert received == [f"echo {pid}: ", "Hi"]
+        assert second.content == f"echo {pid}: Again"
+        assert second.metadata["agent_pid"] == pid
+        assert backend.get_stats()["started"] == 1
+
+    @pytest.mark.asyncio
+    async def test_multiplexes_concurrent_calls(self, backend):
+        """Test that concurrent calls run as separate sessions on one process."""
+        responses = await asyncio.gather(*(_generate(backend, f"slow {n}") for n in range(3)))
+
+        pid = responses[0].metadata["agent_pid"]
+        assert all(response.metadata["agent_pid"] == pid for response in responses)
+        assert [response.content for response in responses] == [
+            f"echo {pid}: slow {n}" for n in range(3)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_restarts_after_crash(self, backend):
+        """Test that a crashed agent fails its call and is replaced on the next one."""
+        crashed = await _generate(backend, "crash")
+        recovered = await _generate(backend, "Hi")
+
+        assert crashed.success is False
+        assert crashed.metadata["exit_code"] == 3
+        assert "agent crashed" in crashed.error
+        assert recovered.success is True
+        assert recovered.metadata["agent_pid"] != crashed.metadata["agent_pid"]
+        assert backend.get_stats()["restarts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_agent_error(self, backend):
+        """Test that a JSON-RPC error fails the call and keeps the process."""
+        response = await _generate(backend, "denied")
+
+        assert response.success is False
+        assert response.error == "Quota exceeded"
+        assert response.metadata["rate_limited"] is True
+        assert backend.get_stats()["processes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stop_after_json_cancels_turn(self, backend):
+        """Test that the turn is cancelled once the JSON block is complete."""
+        response = await _generate(backend, "json", GeminiOptions(stop_after_json=True))
+        follow_up = await _generate(backend, "Hi")
+
+        assert response.success is True
+        assert response.metadata["stopped_early"] is True
+        assert response.content.startswith("```json")
+        assert follow_up.metadata["agent_pid"] == response.metadata["agent_pid"]
+
+    @pytest.mark.asyncio
+    async def test_conversation_reuses_session(self, backend):
+        """Test that calls in a conversation share one agent session."""
+        options = GeminiOptions(conversation_id="c1")
+        first = await _generate(backend, "session", options)
+        second = await _generate(backend, "session", options)
+        other = await _generate(backend, "session")
+
+        assert first.metadata["conversation_resumed"] is False
+        assert second.metadata["conversation_resumed"] is True
+        assert second.content == first.content
+        assert other.content != first.content
+        assert backend.has_conversation("c1")
+
+        backend.end_conversation("c1")
+        assert not backend.has_conversation("c1")
+
+    @pytest.mark.asyncio
+    async def test_end_conversation_closes_session(self, backend):
+        """Test that ending a conversation cancels its session in the agent."""
+        first = await _generate(backend, "session", GeminiOptions(conversation_id="c1"))
+
+        backend.end_conversation("c1")
+        cancelled = await _generate(backend, "cancelled")
+
+        assert cancelled.content.split(",") == [first.content]
+        assert backend.get_stats()["conversations"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_turn_drops_session(self, backend):
+        """Test that a failed turn is not resumed in its half-written session."""
+        options = GeminiOptions(conversation_id="c1")
+        await _generate(backend, "Hi", options)
+
+        failed = await _generate(backend, "denied", options)
+        assert failed.success is False
+        assert not backend.has_conversation("c1")
+
+        retried = await _generate(backend, "Hi", options)
+        assert retried.success is True
+        assert retried.metadata["conversation_resumed"] is False
+
+    @pytest.mark.asyncio
+    async def test_conversation_lost_with_process(self, backend):
+        """Test that a conversation is no longer resumable after its agent crashes."""
+        options = GeminiOptions(conversation_id="c1")
+        await _generate(backend, "Hi", options)
+        await _generate(backend, "crash")
+
+        assert not backend.has_conversation("c1")
+        response = await _generate(backend, "Hi", options)
+        assert response.success is True
+        assert response.metadata["conversation_resumed"] is False
+
+    @pytest.mark.asyncio
+    async def test_start_failure(self):
+        """Test that an agent command that cannot run fails the call."""
+        backend = AgentBackend(AgentBackendConfig(command=["/nonexistent/gemini-agent"]))
+
+        response = await _generate(backend, "Hi")
+
+        assert response.success is False
+        assert response.error.startswith("Subprocess error: could not start agent")
+
+
+class TestClientWithAgentBackend:
+    """Test GeminiCLIClient running on the agent backend."""
+
+    @pytest.mark.asyncio
+    async def test_call(self, backend):
+        """Test that client calls run on the agent process."""
+        client = GeminiCLIClient(backend=backend)
+        client._env = ENV
+        client._verified_auth = True
+
+        response = await client.call_gemini("Hi")
+
+        assert response.success is True
+        assert response.metadata["backend"] == "agent"
+        assert response.content.endswith(": Hi")
@@ -0,0 +1,160 @@
+"""
+Tests for Gemini CLI authentication checks.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from ..auth import (
+    AuthVerdictStore,
+    auth_fingerprint,
+    detect_credential_source,
+    resolve_api_key,
+)
+from ..gemini_client import GeminiCLIClient, GeminiCLIError, GeminiResponse
+
+CLI_PATH = "/usr/local/bin/gemini"
+
+
+class TestCredentialDetection:
+    """Test credential lookup helpers."""
+
+    def test_resolve_api_key_from_env_file(self, tmp_path, monkeypatch):
+        """Test that the .env file is used when the variable is unset."""
+        monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+        env_file = tmp_path / ".env"
+        env_file.write_text("OTHER=1\nGEMINI_API_KEY=from-file\n")
+        assert resolve_api_key(env_file) == "from-file"
+
+    def test_resolve_api_key_prefers_environment(self, tmp_path, monkeypatch):
+        """Test that the environment wins over the .env file."""
+        monkeypatch.setenv("GEMINI_API_KEY", "from-env")
+        env_file = tmp_path / ".env"
+        env_file.write_text("GEMINI_API_KEY=from-file\n")
+        assert resolve_api_key(env_file) == "from-env"
+
+    def test_detect_api_key_source(self, tmp_path, monkeypatch):
+        """Test detection of API key and Vertex credentials."""
+        monkeypatch.setattr("pathlib.Path.home", lambda: tmp_path)
+        assert detect_credential_source({"GEMINI_API_KEY": "k"}) == "gemini_api_key"
+        assert detect_credential_source(
+            {"GOOGLE_GENAI_USE_VERTEXAI": "true", "GOOGLE_CLOUD_PROJECT": "p"}
+        ) == "vertex_ai"
+        assert detect_credential_source({}) is None
+
+    def test_detect_cached_oauth(self, tmp_path, monkeypatch):
+        """Test detection of cached Gemini CLI OAuth credentials."""
+        monkeypatch.setattr("pathlib.Path.home", lambda: tmp_path)
+        (tmp_path / ".gemini").mkdir()
+        (tmp_path / ".gemini" / "oauth_creds.json").write_text("{}")
+        assert detect_credential_source({}) == "gemini_oauth"
+
+    def test_fingerprint_changes_with_key(self):
+        """Test that rotating the API key invalidates the fingerprint."""
+        first = auth_fingerprint(CLI_PATH, {"GEMINI_API_KEY": "secret-one"}, "gemini_api_key")
+        second = auth_fingerprint(CLI_PATH, {"GEMINI_API_KEY": "secret-two"}, "gemini_api_key")
+        assert first != second
+        assert "secret" not in first
+
+
+class TestAuthVerdictStore:
+    """Test AuthVerdictStore functionality."""
+
+    def test_record_and_expire(self, tmp_path):
+        """Test that verdicts persist and expire after the TTL."""
+        store = AuthVerdictStore(tmp_path, ttl_seconds=10)
+        with patch('src.core.auth.time.time', return_value=1000.0):
+            store.record("fp")
+            assert AuthVerdictStore(tmp_path, ttl_seconds=10).is_verified("fp")
+        with patch('src.core.auth.time.time', return_value=1011.0):
+            assert not store.is_verified("fp")
+
+    def test_corrupt_file_ignored(self, tmp_path):
+        """Test that an unreadable verdict file counts as no verdict."""
+        store = AuthVerdictStore(tmp_path)
+        store.path.write_text("not json")
+        assert not store.is_verified("fp")
+
+
+class TestClientVerification:
+    """Test GeminiCLIClient authentication verification."""
+
+    @pytest.fixture(autouse=True)
+    def cli_installed(self):
+        """Pretend the Gemini CLI is installed."""
+        with patch('src.core.auth.shutil.which', return_value=CLI_PATH):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_detected_credentials_skip_model_call(self, monkeypatch):
+        """Test that detectable credentials avoid a model round trip."""
+        monkeypatch.setenv("GEMINI_API_KEY", "key")
+        client = GeminiCLIClient()
+
+        with patch.object(client, '_call_gemini', new_callable=AsyncMock) as mock_call:
+            assert await client.verify_authentication() is True
+            mock_call.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_undetected_credentials_fall_back_to_model_call(self, tmp_path, monkeypatch):
+        """Test the live check when no credentials are found locally."""
+        monkeypatch.setattr("pathlib.Path.home", lambda: tmp_path)
+        client = GeminiCLIClient()
+        client._env = {}
+
+        with patch.object(client, '_call_gemini', new_callable=AsyncMock) as mock_call:
+            mock_call.return_value = GeminiResponse(
+                content="", success=False, error="Not logged in", input_prompt="Hello"
+            )
+            with pytest.raises(GeminiCLIError, match="Not logged in"):
+                await client.verify_authentication()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_calls_verify_once(self, tmp_path, monkeypatch):
+        """Test that concurrent first calls share one verification."""
+        monkeypatch.setattr("pathlib.Path.home", lambda: tmp_path)
+        client = GeminiCLIClient()
+        client._env = {}
+        calls = 0
+
+        async def slow_hello(prompt, options=None, input_files=None):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return GeminiResponse(content="Hi", success=True, input_prompt=prompt)
+
+        with patch.object(client, '_call_gemini', side_effect=slow_hello):
+            results = await asyncio.gather(*(client.verify_authentication() for _ in range(5)))
+
+        assert results == [True] * 5
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_persisted_verdict_reused_by_new_client(self, tmp_path, monkeypatch):
+        """Test that a fresh client (as in a new CLI run) reuses the stored verdict."""
+        monkeypatch.setattr("pathlib.Path.home", lambda: tmp_path)
+        first = GeminiCLIClient(auth_store=AuthVerdictStore(tmp_path))
+        first._env = {}
+        with patch.object(first, '_call_gemini', new_callable=AsyncMock) as mock_call:
+            mock_call.return_value = GeminiResponse(content="Hi", success=True, input_prompt="Hello")
+            await first.verify_authentication()
+            assert mock_call.call_count == 1
+
+        second = GeminiCLIClient(auth_store=AuthVerdictStore(tmp_path))
+        second._env = {}
+        with patch.object(second, '_call_gemini', new_callable=AsyncMock) as mock_call:
+            assert await second.verify_authentication() is True
+            mock_call.assert_not_called()
+
+    def test_env_resolved_once(self):
+        """Test that the subprocess environment is built once per client."""
+        client = GeminiCLIClient()
+        with patch('src.core.gemini_client.resolve_api_key', return_value="key") as mock_resolve:
+            first = client._build_env()
+            second = client._build_env()
+
+        assert first is second
+        assert first["GEMINI_API_KEY"] == "key"
+        mock_resolve.assert_called_once()
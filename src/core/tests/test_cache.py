@@ -0,0 +1,149 @@
+"""
+Tests for the in-process response cache.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from ..cache import ResponseCache, make_cache_key
+from ..gemini_client import GeminiCLIClient, GeminiOptions, GeminiResponse
+
+
+def _response(content: str = "Cached content", success: bool = True) -> GeminiResponse:
+    """Build a response for cache tests."""
+    return GeminiResponse(
+        content=content,
+        success=success,
+        input_prompt="prompt",
+        metadata={"model": "gemini-2.5-pro"}
+    )
+
+
+class TestMakeCacheKey:
+    """Test cache key construction."""
+
+    def test_same_inputs_same_key(self):
+        """Test that identical calls share a key."""
+        options = GeminiOptions()
+        assert make_cache_key("prompt", options) == make_cache_key("prompt", options)
+
+    def test_key_depends_on_prompt_and_options(self):
+        """Test that prompt, model and flags all change the key."""
+        base = make_cache_key("prompt", GeminiOptions())
+        assert make_cache_key("other", GeminiOptions()) != base
+        assert make_cache_key("prompt", GeminiOptions(model="gemini-2.5-flash")) != base
+        assert make_cache_key("prompt", GeminiOptions(sandbox=True)) != base
+
+    def test_key_ignores_conversation_id(self):
+        """Test that a conversation's first call shares its key with a plain call."""
+        base = make_cache_key("prompt", GeminiOptions())
+        assert make_cache_key("prompt", GeminiOptions(conversation_id="c1")) == base
+
+    def test_key_depends_on_input_file_contents(self, tmp_path):
+        """Test that modifying an input file changes the key."""
+        path = tmp_path / "code.py"
+        path.write_text("a = 1\n")
+        before = make_cache_key("prompt", GeminiOptions(), [path])
+        path.write_text("a = 12345\n")
+        assert make_cache_key("prompt", GeminiOptions(), [path]) != before
+
+
+class TestResponseCache:
+    """Test ResponseCache functionality."""
+
+    def test_hit_marks_response_cached(self):
+        """Test that hits return a copy marked as cached."""
+        cache = ResponseCache()
+        cache.put("key", _response())
+
+        cached = cache.get("key")
+
+        assert cached is not None
+        assert cached.content == "Cached content"
+        assert cached.metadata["cached"] is True
+        assert cached.metadata["model"] == "gemini-2.5-pro"
+        assert cache.get_stats()["hits"] == 1
+
+    def test_miss_counted(self):
+        """Test that misses are counted."""
+        cache = ResponseCache()
+        assert cache.get("missing") is None
+        assert cache.get_stats()["misses"] == 1
+
+    def test_failed_responses_not_cached(self):
+        """Test that failures are never stored."""
+        cache = ResponseCache()
+        cache.put("key", _response(success=False))
+        assert len(cache) == 0
+
+    def test_ttl_expiry(self):
+        """Test that expired entries are dropped."""
+        cache = ResponseCache(ttl_seconds=10)
+        with patch('src.core.cache.time.time', return_value=1000.0):
+            cache.put("key", _response())
+        with patch('src.core.cache.time.time', return_value=1011.0):
+            assert cache.get("key") is None
+        assert len(cache) == 0
+
+    def test_lru_entry_bound(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", _response("a"))
+        cache.put("b", _response("b"))
+        cache.get("a")
+        cache.put("c", _response("c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_byte_bound(self):
+        """Test that total size stays under the byte budget."""
+        cache = ResponseCache(max_size_mb=1 / 1024)  # 1 KiB
+        cache.put("a", _response("x" * 600))
+        cache.put("b", _response("y" * 600))
+
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+        assert cache.get_stats()["total_bytes"] <= cache.max_bytes
+
+
+class TestClientCaching:
+    """Test GeminiCLIClient integration with the cache."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_call_served_from_cache(self):
+        """Test that an identical second call does not reach the CLI."""
+        client = GeminiCLIClient(cache=ResponseCache())
+        client._verified_auth = True
+
+        with patch.object(client, '_call_gemini', new_callable=AsyncMock) as mock_call:
+            mock_call.return_value = _response("Fresh")
+
+            first = await client.call_gemini("Explain this")
+            second = await client.call_gemini("Explain this")
+
+        assert mock_call.call_count == 1
+        assert "cached" not in first.metadata
+        assert second.metadata["cached"] is True
+        assert second.content == "Fresh"
+
+    @pytest.mark.asyncio
+    async def test_follow_up_in_held_session_not_cached(self):
+        """Test that a turn continuing a backend session bypasses the cache."""
+        client = GeminiCLIClient(cache=ResponseCache())
+        client._verified_auth = True
+        options = GeminiOptions(conversation_id="c1")
+
+        with patch.object(client, '_call_gemini', new_callable=AsyncMock) as mock_call, \
+                patch.object(client.backend, 'has_conversation', return_value=True):
+            mock_call.return_value = _response("Fresh")
+
+            await client.call_gemini("And this?", options)
+            second = await client.call_gemini("And this?", options)
+
+        assert mock_call.call_count == 2
+        assert "cached" not in second.metadata
+        assert client.cache.get_stats()["entries"] == 0
@@ -0,0 +1,182 @@
+"""
+Tests for the circuit breaker.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from ..auth import is_auth_error
+from ..circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakerConfig,
+)
+from ..gemini_client import GeminiCLIClient, GeminiCLIError, GeminiResponse
+from ..retry import RetryConfig, RetryPolicy
+
+
+def _failure(prompt: str, error: str) -> GeminiResponse:
+    """Build a response for a CLI run that exited with an error."""
+    return GeminiResponse(
+        content="", success=False, error=error, input_prompt=prompt, metadata={"exit_code": 1}
+    )
+
+
+class TestCircuitBreaker:
+    """Test CircuitBreaker state transitions."""
+
+    def test_opens_after_threshold(self):
+        """Test that consecutive failures open the circuit."""
+        breaker = CircuitBreaker(CircuitBreakerConfig(failure_threshold=2))
+        breaker.record_failure("m", "503")
+        assert breaker.check("m") is None
+        breaker.record_failure("m", "503")
+
+        rejection = breaker.check("m")
+        assert rejection is not None and "503" in rejection
+        assert breaker.check("other") is None
+        assert breaker.get_stats()["m"]["state"] == OPEN
+
+    def test_success_resets_failures(self):
+        """Test that a success in between keeps the circuit closed."""
+        breaker = CircuitBreaker(CircuitBreakerConfig(failure_threshold=2))
+        breaker.record_failure("m", "503")
+        breaker.record_success("m")
+        breaker.record_failure("m", "503")
+        assert breaker.check("m") is None
+
+    def test_half_open_single_probe(self):
+        """Test that after the reset timeout one probe decides the state."""
+        breaker = CircuitBreaker(CircuitBreakerConfig(failure_threshold=1, reset_timeout_seconds=30))
+        with patch('src.core.circuit_breaker.time.monotonic', return_value=100.0):
+            breaker.record_failure("m", "503")
+
+        with patch('src.core.circuit_breaker.time.monotonic', return_value=131.0):
+            assert breaker.check("m") is None
+            assert breaker.check("m") is not None
+            assert breaker.get_stats()["m"]["state"] == HALF_OPEN
+
+            breaker.record_failure("m", "503")
+            assert breaker.get_stats()["m"]["state"] == OPEN
+            assert breaker.check("m") is not None
+
+        with patch('src.core.circuit_breaker.time.monotonic', return_value=162.0):
+            assert breaker.check("m") is None
+            breaker.record_success("m")
+            assert breaker.get_stats()["m"]["state"] == CLOSED
+            assert breaker.check("m") is None
+
+    def test_auth_failure_cached_for_all_models(self):
+        """Test that an authentication failure fails every model until it expires."""
+        breaker = CircuitBreaker(CircuitBreakerConfig(auth_error_ttl_seconds=60))
+        with patch('src.core.circuit_breaker.time.monotonic', return_value=100.0):
+            breaker.record_failure("m", "401 UNAUTHENTICATED", auth=True)
+            assert breaker.check("other") is not None
+            assert "auth_error" in breaker.get_stats()
+
+        with patch('src.core.circuit_breaker.time.monotonic', return_value=161.0):
+            assert breaker.check("other") is None
+
+    def test_auth_error_detection(self):
+        """Test which errors count as authentication failures."""
+        assert is_auth_error("Error: API key not valid. Please pass a valid API key.")
+        assert is_auth_error("403 PERMISSION_DENIED")
+        assert not is_auth_error("503 UNAVAILABLE")
+        assert not is_auth_error(None)
+
+
+class TestClientCircuitBreaker:
+    """Test GeminiCLIClient with a circuit breaker."""
+
+    @pytest.fixture
+    def client(self):
+        """Client whose breaker opens after two failures."""
+        client = GeminiCLIClient(
+            circuit_breaker=CircuitBreaker(CircuitBreakerConfig(failure_threshold=2))
+        )
+        client._verified_auth = True
+        return client
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self, client):
+        """Test that calls fail without spawning the CLI once the circuit is open."""
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            return _failure(prompt, "fetch failed")
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call) as mock_call:
+            await client.call_gemini("one")
+            await client.call_gemini("two")
+            response = await client.call_gemini("three")
+
+        assert mock_call.call_count == 2
+        assert response.success is False
+        assert response.metadata["circuit_open"] is True
+        assert "fetch failed" in response.error
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_not_retried(self, client):
+        """Test that retries stop once the circuit opens instead of burning attempts."""
+        client.retry_policy = RetryPolicy(
+            RetryConfig(max_attempts=5, base_delay_seconds=0, budget_min_retries=10)
+        )
+
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            return _failure(prompt, "503 UNAVAILABLE")
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call) as mock_call:
+            response = await client.call_gemini("Prompt")
+
+        assert mock_call.call_count == 2
+        assert response.metadata["circuit_open"] is True
+        assert response.metadata["attempts"] == 3
+
+    @pytest.mark.asyncio
+    async def test_rate_limits_do_not_open_circuit(self, client):
+        """Test that throttled calls leave the circuit closed."""
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            return GeminiResponse(
+                content="", success=False, error="429 quota", input_prompt=prompt,
+                metadata={"exit_code": 1, "rate_limited": True}
+            )
+
+        client.retry_policy = None
+        with patch.object(client, '_call_gemini', side_effect=fake_call) as mock_call:
+            for prompt in ("one", "two", "three"):
+                await client.call_gemini(prompt)
+
+        assert mock_call.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_client_errors_do_not_open_circuit(self, client):
+        """Test that 4xx responses from the HTTP backend leave the circuit closed."""
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            return GeminiResponse(
+                content="", success=False, error="HTTP 400 INVALID_ARGUMENT: bad request",
+                input_prompt=prompt, metadata={"status_code": 400}
+            )
+
+        client.retry_policy = None
+        with patch.object(client, '_call_gemini', side_effect=fake_call) as mock_call:
+            for prompt in ("one", "two", "three"):
+                await client.call_gemini(prompt)
+
+        assert mock_call.call_count == 3
+        for circuit in client.circuit_breaker.get_stats().values():
+            assert circuit["state"] == CLOSED
+            assert circuit["consecutive_failures"] == 0
+
+    @pytest.mark.asyncio
+    async def test_auth_verification_failure_cached(self):
+        """Test that a failed authentication check is not repeated for every call."""
+        client = GeminiCLIClient(circuit_breaker=CircuitBreaker())
+        verify = AsyncMock(side_effect=GeminiCLIError("Authentication test failed: 401"))
+
+        with patch.object(client, 'verify_authentication', verify):
+            for _ in range(3):
+                with pytest.raises(GeminiCLIError, match="Authentication"):
+                    await client.call_gemini("Prompt")
+
+        assert verify.call_count == 1
@@ -182,3 +182,30 @@ class TestConfigManager:
         assert "Add user login" in user
         assert "Web application" in user
         assert "security,usability" in user
+
+    def test_layered_template_formatting(self):
+        """Test that the cacheable layout keeps the code out of the question."""
+        manager = ConfigManager()
+        template = manager.get_template("code_review")
+
+        system, document, question = template.format_layered(
+            language="python",
+            code="def hello(): pass",
+            focus_instruction="Focus on style"
+        )
+
+        assert "code reviewer" in system.lower()
+        assert document == "```python\ndef hello(): pass\n```"
+        assert "def hello" not in question
+        assert "Focus on style" in question
+
+    def test_layered_formatting_without_parts(self):
+        """Test that templates without layered parts put everything in the question."""
+        template = PromptTemplate(
+            name="custom",
+            description="Custom",
+            system_prompt="System",
+            user_template="Explain {code}"
+        )
+
+        assert template.format_layered(code="x") == ("System", "", "Explain x")
@@ -0,0 +1,78 @@
+"""
+Tests for conversation handles.
+"""
+
+from unittest.mock import patch
+
+from ..conversations import ConversationConfig, ConversationStore, Turn
+
+
+class TestConversationStore:
+    """Test ConversationStore functionality."""
+
+    def test_create_and_get(self):
+        """Test that a created conversation can be looked up by its ID."""
+        store = ConversationStore()
+        conversation = store.create("gemini-2.5-flash")
+
+        assert store.get(conversation.id) is conversation
+        assert store.get("unknown") is None
+        assert conversation.model == "gemini-2.5-flash"
+
+    def test_expires_idle_conversations(self):
+        """Test that conversations idle longer than the TTL are forgotten."""
+        forgotten = []
+        store = ConversationStore(ConversationConfig(ttl_seconds=60), on_forget=forgotten.append)
+        with patch("time.monotonic", return_value=1000.0):
+            conversation = store.create("m")
+        with patch("time.monotonic", return_value=1050.0):
+            assert store.get(conversation.id) is conversation
+        with patch("time.monotonic", return_value=1200.0):
+            assert store.get(conversation.id) is None
+
+        assert forgotten == [conversation.id]
+
+    def test_drops_least_recently_used(self):
+        """Test that the least recently used conversation is dropped at the limit."""
+        forgotten = []
+        store = ConversationStore(ConversationConfig(max_conversations=2), on_forget=forgotten.append)
+        first = store.create("m")
+        second = store.create("m")
+        store.get(first.id)
+        store.create("m")
+
+        assert forgotten == [second.id]
+        assert store.get(first.id) is first
+
+    def test_transcript_keeps_first_turn(self):
+        """Test that replay keeps the turn with the code and the latest follow-ups."""
+        conversation = ConversationStore().create("m")
+        conversation.turns = [Turn(f"q{n}", f"a{n}") for n in range(5)]
+
+        transcript = conversation.transcript(max_turns=3)
+
+        assert transcript == "User: q0\n\nGemini: a0\n\nUser: q3\n\nGemini: a3\n\nUser: q4\n\nGemini: a4"
+
+    def test_add_turn_drops_oldest_follow_ups(self):
+        """Test that turns past the limits drop the oldest follow-ups, not the first turn."""
+        store = ConversationStore(ConversationConfig(max_turns=3, max_conversation_chars=100))
+        conversation = store.create("m")
+        for n in range(5):
+            assert store.add_turn(conversation, Turn(f"q{n}", f"a{n}"))
+
+        assert [turn.prompt for turn in conversation.turns] == ["q0", "q3", "q4"]
+
+        assert store.add_turn(conversation, Turn("q" * 47, "a" * 47))
+        assert [turn.prompt for turn in conversation.turns] == ["q0", "q" * 47]
+
+    def test_add_turn_closes_oversized_conversation(self):
+        """Test that a conversation too large to keep is closed."""
+        forgotten = []
+        store = ConversationStore(
+            ConversationConfig(max_conversation_chars=10), on_forget=forgotten.append
+        )
+        conversation = store.create("m")
+
+        assert not store.add_turn(conversation, Turn("long question", "long answer"))
+        assert forgotten == [conversation.id]
+        assert store.get(conversation.id) is None
@@ -0,0 +1,119 @@
+"""
+Tests for the API credential pool.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from ..credentials import CredentialConfig, CredentialPool, CredentialPoolConfig
+from ..gemini_client import GeminiCLIClient, GeminiResponse
+
+
+def _pool(strategy: str = "round_robin", count: int = 3) -> CredentialPool:
+    """Build a pool of literal test keys."""
+    return CredentialPool(CredentialPoolConfig(
+        credentials=[
+            CredentialConfig(name=f"key{index}", api_key=f"secret-{index}")
+            for index in range(count)
+        ],
+        strategy=strategy,
+        cooldown_seconds=60
+    ))
+
+
+class TestCredentialPool:
+    """Test CredentialPool functionality."""
+
+    def test_keys_resolved_from_environment(self, monkeypatch):
+        """Test that keys are read from named variables and unset ones are left out."""
+        monkeypatch.setenv("TEAM_KEY_A", "secret-a")
+        monkeypatch.delenv("TEAM_KEY_B", raising=False)
+        pool = CredentialPool(CredentialPoolConfig(credentials=[
+            CredentialConfig(name="a", api_key_env="TEAM_KEY_A"),
+            CredentialConfig(name="b", api_key_env="TEAM_KEY_B"),
+        ]))
+
+        assert [c.name for c in pool.members] == ["a"]
+        assert pool.members[0].api_key == "secret-a"
+        assert not CredentialPool().enabled
+
+    def test_round_robin(self):
+        """Test that credentials are used in turn."""
+        pool = _pool()
+        picks = []
+        for _ in range(4):
+            credential = pool.acquire()
+            picks.append(credential.name)
+            pool.release(credential, success=True)
+        assert picks == ["key0", "key1", "key2", "key0"]
+
+    def test_least_used(self):
+        """Test that the credential with the fewest calls in flight is picked."""
+        pool = _pool("least_used", count=2)
+        first = pool.acquire()
+        second = pool.acquire()
+        assert first is not second
+        pool.release(second, success=True)
+        assert pool.acquire() is second
+
+    def test_rate_limited_credential_rests(self):
+        """Test that a rate limited credential is skipped until its cool-down ends."""
+        pool = _pool(count=2)
+        with patch('src.core.credentials.time.monotonic', return_value=100.0):
+            limited = pool.acquire()
+            pool.release(limited, success=False, rate_limited=True)
+            picks = {pool.acquire().name for _ in range(3)}
+            stats = pool.get_stats()
+
+        assert picks == {"key1"}
+        assert stats["key0"]["healthy"] is False
+        assert stats["key0"]["rate_limit_errors"] == 1
+        assert "secret" not in str(stats)
+
+        with patch('src.core.credentials.time.monotonic', return_value=161.0):
+            assert pool.get_stats()["key0"]["healthy"] is True
+
+
+class TestClientCredentials:
+    """Test GeminiCLIClient integration with the credential pool."""
+
+    @pytest.mark.asyncio
+    async def test_calls_spread_over_keys(self):
+        """Test that each call runs with the next pool key."""
+        client = GeminiCLIClient(credentials=_pool(count=2))
+        client._verified_auth = True
+        client._env = {"GEMINI_API_KEY": "default-key", "PATH": "/bin"}
+        used = []
+
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            used.append(env["GEMINI_API_KEY"])
+            return GeminiResponse(content="ok", success=True, input_prompt=prompt)
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call):
+            responses = [await client.call_gemini(f"Prompt {index}") for index in range(3)]
+
+        assert used == ["secret-0", "secret-1", "secret-0"]
+        assert [r.metadata["credential"] for r in responses] == ["key0", "key1", "key0"]
+        assert client._env["GEMINI_API_KEY"] == "default-key"
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_error_rests_key(self):
+        """Test that a rate limit failure puts the key into cool-down."""
+        pool = _pool(count=2)
+        client = GeminiCLIClient(credentials=pool)
+        client._verified_auth = True
+
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            return GeminiResponse(
+                content="", success=False, error="429", input_prompt=prompt,
+                metadata={"rate_limited": True}
+            )
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call):
+            await client.call_gemini("Prompt")
+
+        stats = pool.get_stats()
+        assert stats["key0"]["healthy"] is False
+        assert stats["key0"]["in_flight"] == 0
+        assert stats["key1"]["healthy"] is True
@@ -0,0 +1,144 @@
+"""
+Tests for the SQLite-backed disk cache.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from ..cache import ResponseCache
+from ..config import ServerConfig
+from ..disk_cache import DiskCache, default_cache_dir
+from ..gemini_client import GeminiCLIClient, GeminiResponse
+
+
+def _response(content: str = "Stored content", success: bool = True) -> GeminiResponse:
+    """Build a response for disk cache tests."""
+    return GeminiResponse(
+        content=content,
+        success=success,
+        input_prompt="prompt",
+        metadata={"model": "gemini-2.5-pro"}
+    )
+
+
+class TestDiskCache:
+    """Test DiskCache functionality."""
+
+    def test_default_cache_dir_env_override(self, tmp_path, monkeypatch):
+        """Test that GEMINI_MCP_CACHE_DIR overrides the default directory."""
+        monkeypatch.setenv("GEMINI_MCP_CACHE_DIR", str(tmp_path))
+        assert default_cache_dir() == tmp_path
+
+    def test_from_config(self, tmp_path):
+        """Test creation from server configuration."""
+        cache = DiskCache.from_config(ServerConfig(cache_dir=tmp_path, cache_ttl_seconds=60))
+        assert cache is not None
+        assert cache.db_path == tmp_path / "responses.sqlite3"
+        assert cache.ttl_seconds == 60
+
+        assert DiskCache.from_config(ServerConfig(enable_caching=False)) is None
+        assert DiskCache.from_config(ServerConfig(disk_cache_enabled=False)) is None
+
+    def test_roundtrip_across_instances(self, tmp_path):
+        """Test that a second instance (as in another process) sees stored entries."""
+        writer = DiskCache(tmp_path)
+        writer.put_sync("key", _response())
+
+        reader = DiskCache(tmp_path)
+        cached = reader.get_sync("key")
+
+        assert cached is not None
+        assert cached.content == "Stored content"
+        assert cached.metadata["cached"] is True
+        assert cached.metadata["cache_tier"] == "disk"
+        assert cached.input_prompt == ""
+
+        journal_mode = reader._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        assert journal_mode == "wal"
+
+    def test_prompt_not_written_to_disk(self, tmp_path):
+        """Test that the prompt, which carries the user's code, stays out of the store."""
+        cache = DiskCache(tmp_path, compress_min_bytes=1 << 20)
+        response = _response()
+        cache.put_sync("key", response.model_copy(update={"input_prompt": "SECRET_CODE"}))
+
+        payload = cache._connection().execute("SELECT payload FROM responses").fetchone()[0]
+        assert b"SECRET_CODE" not in payload
+
+    def test_large_entries_compressed(self, tmp_path):
+        """Test that payloads above the threshold are stored compressed."""
+        cache = DiskCache(tmp_path, compress_min_bytes=1000)
+        cache.put_sync("big", _response("x" * 10000))
+        cache.put_sync("small", _response("y"))
+
+        rows = dict(cache._connection().execute("SELECT key, compressed FROM responses"))
+        assert rows == {"big": 1, "small": 0}
+        assert cache.get_sync("big").content == "x" * 10000
+
+    def test_failed_responses_not_stored(self, tmp_path):
+        """Test that failures are never stored."""
+        cache = DiskCache(tmp_path)
+        cache.put_sync("key", _response(success=False))
+        assert cache.get_stats()["entries"] == 0
+
+    def test_expired_entries_dropped(self, tmp_path):
+        """Test TTL expiry."""
+        cache = DiskCache(tmp_path, ttl_seconds=10)
+        with patch('src.core.disk_cache.time.time', return_value=1000.0):
+            cache.put_sync("key", _response())
+        with patch('src.core.disk_cache.time.time', return_value=1011.0):
+            assert cache.get_sync("key") is None
+
+    def test_evicts_least_recently_used_over_budget(self, tmp_path):
+        """Test size-based eviction once the byte budget is exceeded."""
+        cache = DiskCache(
+            tmp_path, ttl_seconds=10**10, max_size_mb=2 / 1024, compress_min_bytes=10**9
+        )
+        with patch('src.core.disk_cache.time.time', return_value=1000.0):
+            cache.put_sync("old", _response("a" * 700))
+        with patch('src.core.disk_cache.time.time', return_value=1001.0):
+            cache.put_sync("new", _response("b" * 700))
+        with patch('src.core.disk_cache.time.time', return_value=1002.0):
+            cache.put_sync("newest", _response("c" * 700))
+
+        assert cache.get_sync("old") is None
+        assert cache.get_sync("newest") is not None
+        assert cache.get_stats()["total_bytes"] <= cache.max_bytes
+
+    def test_concurrent_writers(self, tmp_path):
+        """Test that concurrent writers on separate connections do not fail."""
+        def write(index: int) -> None:
+            DiskCache(tmp_path).put_sync(f"key-{index}", _response(f"value-{index}"))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(write, range(32)))
+
+        assert DiskCache(tmp_path).get_stats()["entries"] == 32
+
+
+class TestClientDiskCaching:
+    """Test GeminiCLIClient integration with the disk cache."""
+
+    @pytest.mark.asyncio
+    async def test_second_client_reuses_disk_entry(self, tmp_path):
+        """Test that a fresh client (as in a new CLI run) is served from disk."""
+        first = GeminiCLIClient(disk_cache=DiskCache(tmp_path))
+        first._verified_auth = True
+        with patch.object(first, '_call_gemini', new_callable=AsyncMock) as mock_call:
+            mock_call.return_value = _response("Computed once")
+            await first.call_gemini("Review this")
+
+        second = GeminiCLIClient(cache=ResponseCache(), disk_cache=DiskCache(tmp_path))
+        with patch.object(second, '_call_gemini', new_callable=AsyncMock) as mock_call:
+            response = await second.call_gemini("Review this")
+            mock_call.assert_not_called()
+
+        assert response.content == "Computed once"
+        assert response.input_prompt == "Review this"
+        assert response.metadata["cache_tier"] == "disk"
+
+        # Promoted into the memory tier
+        again = await second.call_gemini("Review this")
+        assert again.metadata["cache_tier"] == "memory"
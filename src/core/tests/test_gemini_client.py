@@ -2,18 +2,39 @@
 Tests for the Gemini CLI client wrapper.
 """
 
-from unittest.mock import AsyncMock, patch
+import asyncio
+import sys
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
+from ..cache import ResponseCache
 from ..gemini_client import (
+    STDERR_TAIL_SIZE,
     GeminiCLIClient,
     GeminiCLIError,
     GeminiOptions,
     GeminiResponse,
+    JsonBlockWatcher,
 )
 
 
+def _fake_process(stdout: bytes, stderr: bytes, returncode: int) -> Mock:
+    """Build a subprocess double whose output is read from stream readers."""
+    process = Mock()
+    process.stdin = Mock()
+    process.stdin.drain = AsyncMock()
+    process.stdout = asyncio.StreamReader()
+    process.stdout.feed_data(stdout)
+    process.stdout.feed_eof()
+    process.stderr = asyncio.StreamReader()
+    process.stderr.feed_data(stderr)
+    process.stderr.feed_eof()
+    process.wait = AsyncMock(return_value=returncode)
+    process.returncode = returncode
+    return process
+
+
 class TestGeminiOptions:
     """Test GeminiOptions model."""
 
@@ -83,13 +104,7 @@ class TestGeminiCLIClient:
         """Test authentication verification when CLI is not found."""
         client = GeminiCLIClient()
 
-        with patch('asyncio.create_subprocess_exec') as mock_subprocess:
-            # Mock subprocess that returns non-zero (CLI not found)
-            mock_process = AsyncMock()
-            mock_process.wait.return_value = None
-            mock_process.returncode = 1
-            mock_subprocess.return_value = mock_process
-
+        with patch('src.core.auth.shutil.which', return_value=None):
             with pytest.raises(GeminiCLIError, match="Gemini CLI not found"):
                 await client.verify_authentication()
 
@@ -100,19 +115,14 @@ class TestGeminiCLIClient:
 
         with patch.object(client, '_call_gemini') as mock_call:
             # Mock successful CLI check
-            with patch('asyncio.create_subprocess_exec') as mock_subprocess:
-                mock_process = AsyncMock()
-                mock_process.wait.return_value = None
-                mock_process.returncode = 0
-                mock_subprocess.return_value = mock_process
-
+            with patch('src.core.auth.shutil.which', return_value="/usr/bin/gemini"):
                 # Mock successful Gemini call
                 mock_call.return_value = GeminiResponse(
                     content="Hello response",
                     success=True
                 )
 
-                result = await client.verify_authentication()
+                result = await client.verify_authentication(live=True)
                 assert result is True
                 assert client._verified_auth is True
 
@@ -124,9 +134,7 @@ class TestGeminiCLIClient:
 
         with patch('asyncio.create_subprocess_exec') as mock_subprocess:
             # Mock successful subprocess
-            mock_process = AsyncMock()
-            mock_process.communicate.return_value = (b"Test response", b"")
-            mock_process.returncode = 0
+            mock_process = _fake_process(b"Test response", b"", 0)
             mock_subprocess.return_value = mock_process
 
             response = await client.call_gemini("Test prompt")
@@ -135,6 +143,12 @@ class TestGeminiCLIClient:
             assert response.content == "Test response"
             assert response.error is None
 
+            # Prompt goes over stdin, not argv
+            assert "Test prompt" not in mock_subprocess.call_args[0]
+            written = b"".join(call.args[0] for call in mock_process.stdin.write.call_args_list)
+            assert written == b"Test prompt"
+            assert "Test prompt" not in response.metadata["command"]
+
     @pytest.mark.asyncio
     async def test_call_gemini_with_options(self):
         """Test Gemini call with custom options."""
@@ -144,10 +158,7 @@ class TestGeminiCLIClient:
         options = GeminiOptions(model="gemini-pro", sandbox=True, debug=True)
 
         with patch('asyncio.create_subprocess_exec') as mock_subprocess:
-            mock_process = AsyncMock()
-            mock_process.communicate.return_value = (b"Test response", b"")
-            mock_process.returncode = 0
-            mock_subprocess.return_value = mock_process
+            mock_subprocess.return_value = _fake_process(b"Test response", b"", 0)
 
             response = await client.call_gemini("Test prompt", options)
 
@@ -169,10 +180,7 @@ class TestGeminiCLIClient:
 
         with patch('asyncio.create_subprocess_exec') as mock_subprocess:
             # Mock failed subprocess
-            mock_process = AsyncMock()
-            mock_process.communicate.return_value = (b"", b"Error message")
-            mock_process.returncode = 1
-            mock_subprocess.return_value = mock_process
+            mock_subprocess.return_value = _fake_process(b"", b"Error message", 1)
 
             response = await client.call_gemini("Test prompt")
 
@@ -205,6 +213,30 @@ class TestGeminiCLIClient:
 
             assert response.content == "Structured response"
 
+    @pytest.mark.asyncio
+    async def test_call_with_layered_prompt(self):
+        """Test that the layered prompt puts stable content first and marks its prefix."""
+        client = GeminiCLIClient()
+
+        with patch.object(client, 'call_gemini') as mock_call:
+            mock_call.return_value = GeminiResponse(
+                content="Layered response",
+                success=True,
+                input_prompt=""
+            )
+
+            await client.call_with_layered_prompt(
+                system_prompt="System instructions",
+                question="What does it do?",
+                shared_context="Repo notes",
+                document="def f(): pass"
+            )
+
+            prompt, options = mock_call.call_args[0]
+            assert prompt.index("System instructions") < prompt.index("Repo notes")
+            assert prompt.index("Repo notes") < prompt.index("def f(): pass")
+            assert prompt[options.cache_prefix_chars:] == "User: What does it do?"
+
     def test_update_default_options(self):
         """Test updating default options."""
         client = GeminiCLIClient()
@@ -214,3 +246,321 @@ class TestGeminiCLIClient:
         assert client.default_options.model == "gemini-pro"
         assert client.default_options.sandbox is True
         assert client.default_options.debug is False  # Unchanged
+
+
+class TestStreaming:
+    """Test streaming Gemini calls."""
+
+    # Stand-in CLI that prints its answer in two bursts
+    SCRIPT = ["sh", "-c", "printf 'Hello, '; sleep 0.05; printf 'w\\303\\266rld'"]
+
+    @pytest.mark.asyncio
+    async def test_stream_gemini_yields_chunks(self):
+        """Test that output chunks are yielded as they arrive."""
+        client = GeminiCLIClient()
+        client._verified_auth = True
+
+        with patch.object(client, '_build_command', return_value=list(self.SCRIPT)):
+            chunks = [chunk async for chunk in client.stream_gemini("Test prompt")]
+
+        assert len(chunks) >= 2
+        assert "".join(chunks) == "Hello, wörld"
+
+    @pytest.mark.asyncio
+    async def test_call_gemini_on_chunk(self):
+        """Test that call_gemini forwards chunks and still returns the full response."""
+        client = GeminiCLIClient()
+        client._verified_auth = True
+        received = []
+
+        async def on_chunk(text):
+            received.append(text)
+
+        with patch.object(client, '_build_command', return_value=list(self.SCRIPT)):
+            response = await client.call_gemini("Test prompt", on_chunk=on_chunk)
+
+        assert response.success is True
+        assert response.content == "Hello, wörld"
+        assert "".join(received) == "Hello, wörld"
+
+    @pytest.mark.asyncio
+    async def test_stream_gemini_raises_on_failure(self):
+        """Test that a failing call raises after streaming."""
+        client = GeminiCLIClient()
+        client._verified_auth = True
+
+        failing = ["sh", "-c", "echo boom >&2; exit 3"]
+        with patch.object(client, '_build_command', return_value=failing):
+            with pytest.raises(GeminiCLIError, match="boom"):
+                async for _ in client.stream_gemini("Test prompt"):
+                    pass
+
+
+class TestStdinPrompt:
+    """Test prompt delivery over stdin."""
+
+    @pytest.mark.asyncio
+    async def test_large_prompt_beyond_arg_max(self):
+        """Test a prompt far larger than the OS argument length limit."""
+        client = GeminiCLIClient()
+        client._verified_auth = True
+        prompt = "x" * (8 * 1024 * 1024) + "ü"
+
+        # Stand-in CLI that reports how many bytes it received on stdin
+        with patch.object(client, '_build_command', return_value=["sh", "-c", "wc -c"]):
+            response = await client.call_gemini(prompt)
+
+        assert response.success is True
+        assert int(response.content) == len(prompt.encode('utf-8'))
+        assert len(response.metadata["command"]) < 100
+
+    @pytest.mark.asyncio
+    async def test_input_files_precede_prompt(self, tmp_path):
+        """Test that input files are written to stdin ahead of the prompt."""
+        client = GeminiCLIClient()
+        client._verified_auth = True
+        source = tmp_path / "code.py"
+        source.write_text("print('hi')")
+
+        with patch.object(client, '_build_command', return_value=["cat"]):
+            response = await client.call_gemini("Explain it", input_files=[source])
+
+        assert response.content == f"--- {source} ---\nprint('hi')\n\nExplain it"
+        assert response.metadata["files_included"] == 1
+
+    @pytest.mark.asyncio
+    async def test_child_ignoring_stdin(self):
+        """Test that a child exiting without reading stdin is not an error."""
+        client = GeminiCLIClient()
+        client._verified_auth = True
+
+        with patch.object(client, '_build_command', return_value=["sh", "-c", "echo done"]):
+            response = await client.call_gemini("y" * (1024 * 1024))
+
+        assert response.success is True
+        assert response.content == "done"
+
+
+class TestInputFiles:
+    """Test streaming input files into the CLI's stdin."""
+
+    @pytest.fixture
+    def client(self):
+        """Client whose stand-in CLI echoes its stdin."""
+        client = GeminiCLIClient(max_context_files=3, max_file_size_mb=1.0)
+        client._verified_auth = True
+        with patch.object(client, '_build_command', return_value=["cat"]):
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_files_streamed_in_order(self, client, tmp_path):
+        """Test that several files, including multi-chunk ones, arrive intact and in order."""
+        first = tmp_path / "a.txt"
+        second = tmp_path / "b.txt"
+        big = "0123456789abcdef" * 60000  # several read chunks, under 1 MB
+        first.write_text(big)
+        second.write_text("second file")
+
+        response = await client.call_gemini("Prompt", input_files=[first, second])
+
+        assert response.success is True
+        assert response.content == (
+            f"--- {first} ---\n{big}\n\n--- {second} ---\nsecond file\n\nPrompt"
+        )
+
+    @pytest.mark.asyncio
+    async def test_unreadable_and_oversized_files_skipped(self, client, tmp_path):
+        """Test that missing and oversized files are noted and skipped."""
+        missing = tmp_path / "missing.txt"
+        huge = tmp_path / "huge.txt"
+        huge.write_bytes(b"x" * (1024 * 1024 + 1))
+
+        response = await client.call_gemini("Prompt", input_files=[missing, huge])
+
+        assert f"--- {missing} (Error:" in response.content
+        assert f"--- {huge} (Skipped: larger than 1.0 MB) ---" in response.content
+        assert "xxxx" not in response.content
+        assert response.content.endswith("Prompt")
+
+    @pytest.mark.asyncio
+    async def test_invalid_utf8_file_skipped(self, client, tmp_path):
+        """Test that a file with invalid UTF-8 past its first chunk is skipped whole."""
+        binary = tmp_path / "data.bin"
+        binary.write_bytes(b"y" * (600 * 1024) + b"\xff")
+
+        response = await client.call_gemini("Prompt", input_files=[binary])
+
+        assert f"--- {binary} (Error:" in response.content
+        assert "yyyy" not in response.content
+        assert response.content.endswith("Prompt")
+
+    @pytest.mark.asyncio
+    async def test_too_many_files_rejected(self, client, tmp_path):
+        """Test that max_context_files is enforced."""
+        files = [tmp_path / f"{index}.txt" for index in range(4)]
+        for path in files:
+            path.write_text("x")
+
+        with patch('asyncio.create_subprocess_exec') as mock_subprocess:
+            response = await client.call_gemini("Prompt", input_files=files)
+            mock_subprocess.assert_not_called()
+
+        assert response.success is False
+        assert "Too many input files" in response.error
+
+
+def _process_alive(pid: int) -> bool:
+    """Return True if a process exists and is not a zombie."""
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="uses /proc")
+class TestDeadlines:
+    """Test deadlines, cancellation and process group cleanup."""
+
+    # Stand-in CLI whose own child holds stdout open; prints the child's pid
+    SCRIPT = ["sh", "-c", "sleep 30 & echo $!; wait"]
+
+    @pytest.fixture
+    def client(self):
+        """Client whose stand-in CLI never finishes on its own."""
+        client = GeminiCLIClient()
+        client._verified_auth = True
+        with patch.object(client, '_build_command', return_value=list(self.SCRIPT)):
+            yield client
+
+    @staticmethod
+    async def _wait_dead(pid: int) -> bool:
+        """Wait briefly for a process to disappear."""
+        for _ in range(50):
+            if not _process_alive(pid):
+                return True
+            await asyncio.sleep(0.02)
+        return False
+
+    @pytest.mark.asyncio
+    async def test_deadline_kills_process_group(self, client):
+        """Test that a passed deadline kills the CLI and its children."""
+        output = []
+
+        async def on_chunk(text):
+            output.append(text)
+
+        response = await client.call_gemini("Prompt", on_chunk=on_chunk, timeout=0.3)
+
+        assert response.success is False
+        assert "deadline" in response.error
+        assert response.metadata["cancelled"] is True
+        assert response.metadata["cancel_reason"] == "deadline"
+        assert await self._wait_dead(int("".join(output)))
+
+    @pytest.mark.asyncio
+    async def test_default_timeout_applies(self, client):
+        """Test that the client default deadline is used when none is given."""
+        client.default_timeout = 0.2
+        response = await client.call_gemini("Prompt")
+
+        assert response.metadata["timeout_seconds"] == 0.2
+
+    @pytest.mark.asyncio
+    async def test_cancellation_kills_process_group(self, client):
+        """Test that cancelling the calling task kills the CLI and its children."""
+        started = asyncio.Event()
+        output = []
+
+        async def on_chunk(text):
+            output.append(text)
+            started.set()
+
+        task = asyncio.create_task(client.call_gemini("Prompt", on_chunk=on_chunk))
+        await asyncio.wait_for(started.wait(), timeout=5)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert await self._wait_dead(int("".join(output)))
+
+
+class TestStopAfterJson:
+    """Test early termination once the JSON answer is complete."""
+
+    def test_watcher_handles_split_fences(self):
+        """Test that fences split across chunks are detected."""
+        watcher = JsonBlockWatcher()
+        chunks = ["Intro ``", "`js", 'on\n{"a": ', "1}\n`", "``\nmore prose"]
+        assert [watcher.feed(chunk) for chunk in chunks] == [False, False, False, False, True]
+
+    def test_watcher_ignores_invalid_first_block(self):
+        """Test that an unparseable first block never stops the call."""
+        watcher = JsonBlockWatcher()
+        assert watcher.feed('```json\n{"a": \n```\n') is False
+        assert watcher.feed('```json\n{"a": 1}\n```\n') is False
+
+    @pytest.mark.asyncio
+    async def test_stops_process_after_json_block(self):
+        """Test that the CLI is killed and the answer returned once the block closes."""
+        client = GeminiCLIClient()
+        client._verified_auth = True
+        script = ["sh", "-c", "printf 'Review\\n```json\\n{\"summary\": \"ok\"}\\n```\\n'; sleep 30"]
+
+        with patch.object(client, '_build_command', return_value=script):
+            response = await asyncio.wait_for(
+                client.call_gemini("Prompt", GeminiOptions(stop_after_json=True)), timeout=5
+            )
+
+        assert response.success is True
+        assert response.metadata["stopped_early"] is True
+        assert response.content.endswith("```")
+        assert '{"summary": "ok"}' in response.content
+
+    @pytest.mark.asyncio
+    async def test_runs_to_completion_without_option(self):
+        """Test that output after the block is kept when the option is off."""
+        client = GeminiCLIClient()
+        client._verified_auth = True
+        script = ["sh", "-c", "printf '```json\\n{}\\n```\\n'; printf 'trailing'"]
+
+        with patch.object(client, '_build_command', return_value=script):
+            response = await client.call_gemini("Prompt")
+
+        assert response.success is True
+        assert response.content.endswith("trailing")
+        assert "stopped_early" not in response.metadata
+
+
+class TestBoundedOutput:
+    """Test the caps on CLI output kept per call."""
+
+    @pytest.mark.asyncio
+    async def test_truncates_long_output(self):
+        """Test that output beyond max_response_chars is cut, flagged and not cached."""
+        client = GeminiCLIClient(cache=ResponseCache(), max_response_chars=100)
+        client._verified_auth = True
+        script = ["sh", "-c", "yes answer | head -c 1000000; sleep 30"]
+
+        with patch.object(client, '_build_command', return_value=script):
+            response = await asyncio.wait_for(client.call_gemini("Prompt"), timeout=5)
+
+        assert response.success is True
+        assert response.metadata["truncated"] is True
+        assert len(response.content) <= 100
+        assert client.cache.get_stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_keeps_end_of_stderr(self):
+        """Test that only the end of a large stderr is kept for the error message."""
+        client = GeminiCLIClient()
+        client._verified_auth = True
+        script = ["sh", "-c", "yes noise | head -c 1000000 >&2; echo 'Fatal: quota' >&2; exit 1"]
+
+        with patch.object(client, '_build_command', return_value=script):
+            response = await asyncio.wait_for(client.call_gemini("Prompt"), timeout=5)
+
+        assert response.success is False
+        assert response.error.startswith("...")
+        assert response.error.endswith("Fatal: quota\n")
+        assert len(response.error) <= STDERR_TAIL_SIZE + 3
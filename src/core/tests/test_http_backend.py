@@ -0,0 +1,262 @@
+"""
+Tests for the direct HTTP backend, against a local stub of the Gemini API.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ..gemini_client import GeminiCLIClient, GeminiCLIError, GeminiOptions
+from ..http_backend import HttpBackend, HttpBackendConfig
+
+API_KEY = "test-key"
+
+
+def _sse(*texts: str, usage: dict | None = None) -> list[bytes]:
+    """Encode response texts as server-sent generateContent events."""
+    events = [
+        {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+        for text in texts
+    ]
+    if usage is not None:
+        events[-1]["usageMetadata"] = usage
+    return [f"data: {json.dumps(event)}\r\n\r\n".encode() for event in events]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Serves the reply queued on the server for each request."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append({
+            "path": self.path,
+            "api_key": self.headers.get("x-goog-api-key"),
+            "body": json.loads(body),
+        })
+        if self.path.endswith("/cachedContents"):
+            self._reply_json({"name": f"cachedContents/c{len(self.server.requests)}"})
+            return
+        status, pieces, pause = self.server.reply
+        self.send_response(status)
+        self.send_header("Content-Type", "text/event-stream" if status == 200 else "application/json")
+        self.send_header("Content-Length", str(sum(len(piece) for piece in pieces)))
+        self.end_headers()
+        for index, piece in enumerate(pieces):
+            self.wfile.write(piece)
+            self.wfile.flush()
+            if index == 0 and pause:
+                time.sleep(pause)
+
+    def do_DELETE(self):
+        self.server.deleted.append(self.path)
+        self._reply_json({})
+
+    def _reply_json(self, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    """Local Gemini API stub; set ``reply`` to (status, body pieces, pause after first piece)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.connections = 0
+    server.deleted = []
+    server.reply = (200, _sse("Hello", " world", usage={"totalTokenCount": 7}), 0)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+async def backend(stub):
+    """HTTP backend pointed at the stub."""
+    backend = HttpBackend(HttpBackendConfig(base_url=stub.url, http2=False))
+    yield backend
+    await backend.close()
+
+
+class TestHttpBackend:
+    """Test HttpBackend against the stub API."""
+
+    @pytest.mark.asyncio
+    async def test_streams_and_reuses_connection(self, stub, backend):
+        """Test that text is streamed per event and calls share one connection."""
+        received = []
+
+        async def on_chunk(text):
+            received.append(text)
+
+        options = GeminiOptions(model="gemini-2.5-flash")
+        env = {"GEMINI_API_KEY": API_KEY}
+        first = await backend.generate("Hi", options, [], on_chunk, env)
+        second = await backend.generate("Again", options, [], None, env)
+
+        assert first.success is True
+        assert first.content == "Hello world"
+        assert received == ["Hello", " world"]
+        assert first.metadata["usage"] == {"totalTokenCount": 7}
+        assert second.success is True
+        assert stub.connections == 1
+
+        request = stub.requests[0]
+        assert request["path"] == "/v1beta/models/gemini-2.5-flash:streamGenerateContent?alt=sse"
+        assert request["api_key"] == API_KEY
+        assert request["body"]["contents"][0]["parts"] == [{"text": "Hi"}]
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_error(self, stub, backend):
+        """Test that a 429 reply is reported as a rate-limited failure."""
+        error = {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "message": "Quota exceeded"}}
+        stub.reply = (429, [json.dumps(error).encode()], 0)
+
+        response = await backend.generate(
+            "Hi", GeminiOptions(), [], None, {"GEMINI_API_KEY": API_KEY}
+        )
+
+        assert response.success is False
+        assert response.metadata["status_code"] == 429
+        assert response.metadata["rate_limited"] is True
+        assert "Quota exceeded" in response.error
+
+    @pytest.mark.asyncio
+    async def test_input_files_sent_as_parts(self, stub, backend, tmp_path):
+        """Test that input files are sent ahead of the prompt with CLI-style headers."""
+        source = tmp_path / "a.py"
+        source.write_text("print(1)")
+
+        response = await backend.generate(
+            "Explain", GeminiOptions(), [source], None, {"GEMINI_API_KEY": API_KEY}
+        )
+
+        assert response.metadata["files_included"] == 1
+        parts = stub.requests[0]["body"]["contents"][0]["parts"]
+        assert parts == [{"text": f"--- {source} ---\nprint(1)\n\n"}, {"text": "Explain"}]
+
+    @pytest.mark.asyncio
+    async def test_stop_after_json_closes_stream(self, stub, backend):
+        """Test that the stream is abandoned once the JSON block is complete."""
+        stub.reply = (200, _sse('```json\n{"summary": "ok"}\n```', "Trailing prose"), 10)
+
+        response = await asyncio.wait_for(
+            backend.generate(
+                "Review", GeminiOptions(stop_after_json=True), [], None,
+                {"GEMINI_API_KEY": API_KEY}
+            ),
+            timeout=5
+        )
+
+        assert response.success is True
+        assert response.metadata["stopped_early"] is True
+        assert "Trailing" not in response.content
+
+
+    @pytest.mark.asyncio
+    async def test_truncates_long_answer(self, stub):
+        """Test that the stream is closed and the answer flagged once it is too long."""
+        backend = HttpBackend(HttpBackendConfig(base_url=stub.url, http2=False), max_response_chars=8)
+        stub.reply = (200, _sse("Hello", " world", " again"), 0)
+
+        response = await backend.generate(
+            "Hi", GeminiOptions(), [], None, {"GEMINI_API_KEY": API_KEY}
+        )
+        await backend.close()
+
+        assert response.success is True
+        assert response.content == "Hello wo"
+        assert response.metadata["truncated"] is True
+
+
+class TestContextCache:
+    """Test explicit cached contexts for stable prompt prefixes."""
+
+    @pytest.mark.asyncio
+    async def test_prefix_cached_and_reused(self, stub):
+        """Test that a long prefix is cached once, referenced after, and deleted on close."""
+        backend = HttpBackend(HttpBackendConfig(
+            base_url=stub.url, http2=False, context_cache=True, context_cache_min_tokens=10
+        ))
+        stub.reply = (200, _sse("Answer", usage={"cachedContentTokenCount": 120}), 0)
+        prefix = "System: review\n\nDocument:\n" + "x = 1\n" * 50
+        env = {"GEMINI_API_KEY": API_KEY}
+
+        first = await backend.generate(
+            prefix + "User: first?", GeminiOptions(cache_prefix_chars=len(prefix)), [], None, env
+        )
+        second = await backend.generate(
+            prefix + "User: second?", GeminiOptions(cache_prefix_chars=len(prefix)), [], None, env
+        )
+        await backend.close()
+
+        assert first.metadata["context_cache"] == "created"
+        assert second.metadata["context_cache"] == "hit"
+        assert second.metadata["cached_tokens"] == 120
+
+        create, generate_first, generate_second = stub.requests
+        assert create["path"] == "/v1beta/cachedContents"
+        assert create["body"]["contents"][0]["parts"] == [{"text": prefix}]
+        assert generate_second["body"] == {
+            "cachedContent": "cachedContents/c1",
+            "contents": [{"role": "user", "parts": [{"text": "User: second?"}]}],
+        }
+        assert stub.deleted == ["/v1beta/cachedContents/c1"]
+
+    @pytest.mark.asyncio
+    async def test_short_prefix_not_cached(self, stub, backend):
+        """Test that prefixes below the token minimum are sent in full."""
+        backend.config.context_cache = True
+
+        response = await backend.generate(
+            "System: hi\n\nUser: q", GeminiOptions(cache_prefix_chars=12), [], None,
+            {"GEMINI_API_KEY": API_KEY}
+        )
+
+        assert "context_cache" not in response.metadata
+        assert len(stub.requests) == 1
+
+
+class TestClientWithHttpBackend:
+    """Test GeminiCLIClient running on the HTTP backend."""
+
+    @pytest.mark.asyncio
+    async def test_call_without_cli(self, stub, backend):
+        """Test that calls go over HTTP and only need an API key."""
+        client = GeminiCLIClient(backend=backend)
+        client._env = {"GEMINI_API_KEY": API_KEY}
+
+        response = await client.call_gemini("Hi")
+
+        assert response.success is True
+        assert response.content == "Hello world"
+        assert response.metadata["backend"] == "http"
+
+    @pytest.mark.asyncio
+    async def test_missing_api_key(self, backend):
+        """Test that a missing API key fails authentication."""
+        client = GeminiCLIClient(backend=backend)
+        client._env = {}
+
+        with pytest.raises(GeminiCLIError, match="No Gemini API key"):
+            await client.call_gemini("Hi")
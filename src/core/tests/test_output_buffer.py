@@ -0,0 +1,57 @@
+"""
+Tests for bounded output buffers.
+"""
+
+import asyncio
+
+import pytest
+
+from ..output_buffer import BoundedText, TailBuffer
+
+
+class TestBoundedText:
+    """Test BoundedText functionality."""
+
+    def test_keeps_text_up_to_limit(self):
+        """Test that text past the limit is cut and flagged."""
+        buffer = BoundedText(max_chars=8)
+
+        assert buffer.append("hello") == "hello"
+        assert buffer.append(" world") == " wo"
+        assert buffer.append("!") == ""
+        assert buffer.getvalue() == "hello wo"
+        assert buffer.truncated is True
+
+    def test_unbounded(self):
+        """Test that a buffer without a limit keeps everything."""
+        buffer = BoundedText()
+        buffer.append("a" * 10_000)
+
+        assert buffer.length == 10_000
+        assert buffer.truncated is False
+
+
+class TestTailBuffer:
+    """Test TailBuffer functionality."""
+
+    def test_keeps_last_bytes(self):
+        """Test that the oldest bytes are dropped and marked."""
+        buffer = TailBuffer(size=4)
+        buffer.write(b"abc")
+        assert buffer.text() == "abc"
+
+        buffer.write(b"defg")
+        assert buffer.text() == "...defg"
+        assert buffer.dropped == 3
+
+    @pytest.mark.asyncio
+    async def test_drain(self):
+        """Test that a stream is read to its end into the buffer."""
+        stream = asyncio.StreamReader()
+        stream.feed_data(b"x" * 10_000 + b"error: boom")
+        stream.feed_eof()
+        buffer = TailBuffer(size=11)
+
+        await buffer.drain(stream)
+
+        assert buffer.text() == "...error: boom"
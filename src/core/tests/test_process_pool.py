@@ -0,0 +1,162 @@
+"""
+Tests for the warm Gemini process pool.
+"""
+
+import asyncio
+import os
+from unittest.mock import patch
+
+import pytest
+
+from ..gemini_client import GeminiCLIClient
+from ..process_pool import GeminiProcessPool, ProcessPoolConfig
+
+# ``cat`` blocks on stdin like a pre-spawned gemini process and echoes the prompt
+CAT = ["cat"]
+
+
+class TestProcessPoolConfig:
+    """Test ProcessPoolConfig model."""
+
+    def test_default_values(self):
+        """Test default pool settings."""
+        config = ProcessPoolConfig()
+        assert config.enabled is False
+        assert config.min_size == 1
+        assert config.max_size == 4
+        assert config.idle_timeout_seconds == 300.0
+
+
+class TestGeminiProcessPool:
+    """Test GeminiProcessPool functionality."""
+
+    @pytest.mark.asyncio
+    async def test_acquire_cold_then_warm(self):
+        """Test that the first acquire spawns and the pool refills for the next."""
+        pool = GeminiProcessPool(ProcessPoolConfig(enabled=True, min_size=1))
+        env = dict(os.environ)
+        try:
+            process, warm = await pool.acquire(CAT, env)
+            assert warm is False
+            stdout, _ = await process.communicate(b"first")
+            assert stdout == b"first"
+
+            # Let the background refill run
+            for _ in range(50):
+                if pool.idle_count(CAT, env) == 1:
+                    break
+                await asyncio.sleep(0.01)
+            assert pool.idle_count(CAT, env) == 1
+
+            process, warm = await pool.acquire(CAT, env)
+            assert warm is True
+            stdout, _ = await process.communicate(b"second")
+            assert stdout == b"second"
+            assert pool.get_stats()["warm_hits"] == 1
+            assert pool.get_stats()["cold_spawns"] == 1
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_prewarm_respects_max_size(self):
+        """Test that prewarming never exceeds max_size idle processes."""
+        pool = GeminiProcessPool(ProcessPoolConfig(enabled=True, min_size=5, max_size=2))
+        env = dict(os.environ)
+        try:
+            await pool.prewarm(CAT, env)
+            assert pool.idle_count(CAT, env) == 2
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_running_processes_count_against_max_size(self):
+        """Test that the pool does not pre-spawn while handed-out processes fill max_size."""
+        pool = GeminiProcessPool(ProcessPoolConfig(enabled=True, min_size=2, max_size=2))
+        env = dict(os.environ)
+
+        async def settle():
+            running = pool._refills.get(pool._key(CAT, env))
+            if running is not None:
+                await running
+
+        try:
+            first, _ = await pool.acquire(CAT, env)
+            second, _ = await pool.acquire(CAT, env)
+            await settle()
+            assert pool.idle_count(CAT, env) == 0
+
+            await first.communicate(b"")
+            await second.communicate(b"")
+            third, _ = await pool.acquire(CAT, env)
+            await settle()
+            assert pool.idle_count(CAT, env) == 1
+            await third.communicate(b"")
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_reap_idle_kills_expired_processes(self):
+        """Test that idle processes past the timeout are reaped."""
+        pool = GeminiProcessPool(
+            ProcessPoolConfig(enabled=True, min_size=1, idle_timeout_seconds=0.01)
+        )
+        env = dict(os.environ)
+        try:
+            await pool.prewarm(CAT, env)
+            await asyncio.sleep(0.02)
+            assert pool.reap_idle() == 1
+            assert pool.idle_count(CAT, env) == 0
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_close_kills_idle_processes(self):
+        """Test that closing the pool kills idle processes and rejects acquires."""
+        pool = GeminiProcessPool(ProcessPoolConfig(enabled=True, min_size=2))
+        env = dict(os.environ)
+        await pool.prewarm(CAT, env)
+        idle = [entry.process for entry in pool._idle[pool._key(CAT, env)]]
+
+        await pool.close()
+
+        assert all(process.returncode is not None for process in idle)
+        with pytest.raises(RuntimeError, match="closed"):
+            await pool.acquire(CAT, env)
+
+
+class TestPooledClientCalls:
+    """Test GeminiCLIClient calls routed through the process pool."""
+
+    @pytest.mark.asyncio
+    async def test_prompt_written_to_stdin(self):
+        """Test that pooled calls deliver input files and prompt over stdin."""
+        pool = GeminiProcessPool(ProcessPoolConfig(enabled=True, min_size=0))
+        client = GeminiCLIClient(process_pool=pool)
+        client._verified_auth = True
+
+        try:
+            with patch.object(client, '_build_command', return_value=list(CAT)):
+                response = await client.call_gemini("Test prompt")
+
+            assert response.success is True
+            assert response.content == "Test prompt"
+            assert response.metadata["process_pool"] == "cold"
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_client_prewarm_serves_first_call_warm(self):
+        """Test that a prewarmed client answers its first call from the pool."""
+        pool = GeminiProcessPool(ProcessPoolConfig(enabled=True, min_size=1))
+        client = GeminiCLIClient(process_pool=pool)
+        client._verified_auth = True
+
+        try:
+            with patch.object(client, '_build_command', return_value=list(CAT)):
+                await client.prewarm()
+                response = await client.call_gemini("Test prompt")
+
+            assert response.content == "Test prompt"
+            assert response.metadata["process_pool"] == "warm"
+        finally:
+            await client.close()
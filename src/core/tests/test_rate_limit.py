@@ -0,0 +1,171 @@
+"""
+Tests for quota-aware rate limiting.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from ..gemini_client import GeminiCLIClient, GeminiResponse
+from ..rate_limit import (
+    QuotaConfig,
+    RateLimitConfig,
+    RateLimiter,
+    TokenBucket,
+    credential_id,
+    estimate_input_tokens,
+    is_rate_limit_error,
+)
+
+
+class FakeClock:
+    """Monotonic clock advanced only by sleeping."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.slept: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    """Patch the rate limiter's clock and sleep."""
+    fake = FakeClock()
+    with patch('src.core.rate_limit.time.monotonic', fake.monotonic), \
+            patch('src.core.rate_limit.asyncio.sleep', fake.sleep):
+        yield fake
+
+
+def _limiter(**quota) -> RateLimiter:
+    """Build a limiter with one default quota."""
+    return RateLimiter(RateLimitConfig(default_quota=QuotaConfig(**quota)))
+
+
+class TestHelpers:
+    """Test token estimation and error detection helpers."""
+
+    def test_estimate_input_tokens_counts_files(self, tmp_path):
+        """Test that file sizes add to the prompt estimate."""
+        source = tmp_path / "code.py"
+        source.write_text("x" * 400)
+        assert estimate_input_tokens("y" * 40) == 10
+        assert estimate_input_tokens("y" * 40, [source, tmp_path / "missing"]) == 110
+
+    def test_rate_limit_errors_detected(self):
+        """Test recognition of quota errors in CLI output."""
+        assert is_rate_limit_error("Error: 429 Too Many Requests")
+        assert is_rate_limit_error("status: RESOURCE_EXHAUSTED")
+        assert not is_rate_limit_error("Error: file not found")
+        assert not is_rate_limit_error(None)
+
+    def test_credential_id_hides_key(self):
+        """Test that the key identifier is stable and does not expose the key."""
+        first = credential_id({"GEMINI_API_KEY": "secret-key"})
+        assert first == credential_id({"GEMINI_API_KEY": "secret-key"})
+        assert "secret" not in first
+        assert credential_id({}) == "default"
+
+
+class TestTokenBucket:
+    """Test TokenBucket functionality."""
+
+    def test_refill_and_delay(self, clock):
+        """Test that delays follow the refill rate."""
+        bucket = TokenBucket(10, 1.0)
+        bucket.take(10)
+        assert bucket.delay(1) == pytest.approx(1.0)
+        clock.now += 0.5
+        assert bucket.delay(1) == pytest.approx(0.5)
+        assert bucket.delay(50) == pytest.approx(9.5)
+
+
+class TestRateLimiter:
+    """Test RateLimiter functionality."""
+
+    @pytest.mark.asyncio
+    async def test_requests_paced_after_burst(self, clock):
+        """Test that calls beyond the per-minute burst wait for refill."""
+        limiter = _limiter(requests_per_minute=2)
+
+        assert await limiter.acquire("m", "k", 10) == 0.0
+        assert await limiter.acquire("m", "k", 10) == 0.0
+        assert await limiter.acquire("m", "k", 10) == pytest.approx(30.0)
+        assert limiter.get_stats()["m/k"]["throttled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_budgets_separate_per_key(self, clock):
+        """Test that each API key has its own budget."""
+        limiter = _limiter(requests_per_minute=1)
+        await limiter.acquire("m", "first", 1)
+        assert await limiter.acquire("m", "second", 1) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_batch_waits_for_headroom(self, clock):
+        """Test that batch calls leave part of the budget for other work."""
+        limiter = _limiter(tokens_per_minute=120)
+
+        await limiter.acquire("m", "k", 50)
+        assert await limiter.acquire("m", "k", 10) == 0.0
+        # 60 tokens left; batch needs 20 plus half the bucket (60) in reserve
+        assert await limiter.acquire("m", "k", 20, priority="batch") == pytest.approx(10.0)
+
+    @pytest.mark.asyncio
+    async def test_settle_refunds_overestimate(self, clock):
+        """Test that unused estimated tokens are returned."""
+        limiter = _limiter(tokens_per_minute=100)
+        await limiter.acquire("m", "k", 100)
+        limiter.settle("m", "k", estimated=100, actual=40)
+        assert await limiter.acquire("m", "k", 60) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_pause_delays_even_without_quota(self, clock):
+        """Test the cool-down after a rate limit error."""
+        limiter = RateLimiter(RateLimitConfig(cooldown_seconds=5))
+        limiter.pause("m", "k")
+        assert await limiter.acquire("m", "k", 1) == pytest.approx(5.0)
+
+
+class TestClientRateLimiting:
+    """Test GeminiCLIClient integration with the rate limiter."""
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_error_pauses_budget(self):
+        """Test that a 429 from the CLI is flagged and pauses the key."""
+        limiter = RateLimiter(RateLimitConfig(cooldown_seconds=30))
+        client = GeminiCLIClient(rate_limiter=limiter)
+        client._verified_auth = True
+        client._env = {"GEMINI_API_KEY": "key"}
+
+        failing = ["sh", "-c", "echo '429 RESOURCE_EXHAUSTED' >&2; exit 1"]
+        with patch.object(client, '_build_command', return_value=failing):
+            response = await client.call_gemini("Prompt")
+
+        assert response.success is False
+        assert response.metadata["rate_limited"] is True
+        assert response.metadata["estimated_tokens"] > 0
+        stats = limiter.get_stats()[f"{client.default_options.model}/{credential_id(client._env)}"]
+        assert stats["rate_limit_errors"] == 1
+        assert stats["paused_seconds"] > 0
+
+    @pytest.mark.asyncio
+    async def test_output_tokens_settled(self):
+        """Test that the token charge is corrected with the response size."""
+        limiter = _limiter(tokens_per_minute=10_000)
+        client = GeminiCLIClient(rate_limiter=limiter)
+        client._verified_auth = True
+        client._env = {}
+
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            return GeminiResponse(content="x" * 400, success=True, input_prompt=prompt)
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call):
+            await client.call_gemini("y" * 40)
+
+        stats = limiter.get_stats()[f"{client.default_options.model}/default"]
+        assert 10_000 - stats["tokens_available"] == pytest.approx(110, abs=2)
@@ -0,0 +1,277 @@
+"""
+Tests for retries and hedged calls.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from ..gemini_client import GeminiCLIClient, GeminiResponse
+from ..hedging import HedgeConfig, HedgePolicy
+from ..retry import RetryBudget, RetryConfig, RetryPolicy, is_transient_failure
+
+
+def _failure(prompt: str, error: str, **metadata) -> GeminiResponse:
+    """Build a failed response."""
+    return GeminiResponse(
+        content="", success=False, error=error, input_prompt=prompt, metadata=metadata
+    )
+
+
+class TestRetryPolicy:
+    """Test RetryPolicy and RetryBudget functionality."""
+
+    def test_transient_failures(self):
+        """Test which failures are considered worth retrying."""
+        assert is_transient_failure("503 Service Unavailable", {})
+        assert is_transient_failure("fetch failed: ECONNRESET", {})
+        assert is_transient_failure("quota", {"rate_limited": True})
+        assert not is_transient_failure("Invalid API key", {})
+        assert not is_transient_failure("503", {"cancelled": True})
+        assert not is_transient_failure("Circuit open: 503", {"circuit_open": True})
+
+    def test_stack_traces_are_not_transient(self):
+        """Test that Node stack text and auth errors with stacks are not retried."""
+        module_not_found = (
+            "Error: Cannot find module 'gemini'\n"
+            "    at Module._resolveFilename (node:internal/modules/cjs/loader:1145:15)"
+        )
+        assert not is_transient_failure(module_not_found, {})
+        assert not is_transient_failure(
+            '400 INVALID_ARGUMENT: request contains an internal field name', {}
+        )
+        auth_with_stack = (
+            "Error: Invalid API key\n"
+            "    at process.processTicksAndRejections (node:internal/process/task_queues:95:5)\n"
+            "    status: 503"
+        )
+        assert not is_transient_failure(auth_with_stack, {})
+        assert is_transient_failure('{"error": {"code": 500, "status": "INTERNAL"}}', {})
+
+    def test_backoff_jitter_bounds(self):
+        """Test that backoff grows exponentially up to the cap, with full jitter."""
+        policy = RetryPolicy(RetryConfig(base_delay_seconds=1, max_delay_seconds=4))
+        with patch('src.core.retry.random.uniform', side_effect=lambda low, high: high):
+            assert [policy.backoff(n) for n in (1, 2, 3, 4)] == [1, 2, 4, 4]
+
+    def test_budget_caps_extra_attempts(self):
+        """Test that extra attempts are limited by ratio and floor."""
+        budget = RetryBudget(ratio=0.5, min_retries=1)
+        for _ in range(4):
+            budget.record_call()
+        assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+        assert budget.get_stats() == {"calls": 4, "extra_attempts": 2, "denied": 1}
+
+    def test_max_attempts(self):
+        """Test that retries stop at max_attempts."""
+        policy = RetryPolicy(RetryConfig(max_attempts=2, budget_min_retries=10))
+        assert policy.should_retry(1, "503", {})
+        assert not policy.should_retry(2, "503", {})
+
+
+class TestClientRetries:
+    """Test GeminiCLIClient retries."""
+
+    @pytest.fixture
+    def client(self):
+        """Client with an immediate-retry policy."""
+        client = GeminiCLIClient(
+            retry_policy=RetryPolicy(RetryConfig(base_delay_seconds=0, budget_min_retries=10))
+        )
+        client._verified_auth = True
+        return client
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_retried(self, client):
+        """Test that a transient failure is retried until success."""
+        results = [_failure("p", "503 UNAVAILABLE"), _failure("p", "ECONNRESET")]
+
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            if results:
+                return results.pop(0)
+            return GeminiResponse(content="ok", success=True, input_prompt=prompt)
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call) as mock_call:
+            response = await client.call_gemini("Prompt")
+
+        assert response.success is True
+        assert response.metadata["attempts"] == 3
+        assert mock_call.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_permanent_failure_not_retried(self, client):
+        """Test that non-transient failures fail fast."""
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            return _failure(prompt, "Invalid API key")
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call) as mock_call:
+            response = await client.call_gemini("Prompt")
+
+        assert response.success is False
+        assert mock_call.call_count == 1
+        assert "attempts" not in response.metadata
+
+    @pytest.mark.asyncio
+    async def test_retry_streams_only_final_attempt(self, client):
+        """Test that the streamed text equals the content after a retry."""
+        results = [_failure("p", "503 UNAVAILABLE")]
+        chunks = []
+
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            if results:
+                return results.pop(0)
+            await on_chunk("full ")
+            await on_chunk("answer")
+            return GeminiResponse(content="full answer", success=True, input_prompt=prompt)
+
+        async def on_chunk(text):
+            chunks.append(text)
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call):
+            response = await client.call_gemini("Prompt", on_chunk=on_chunk)
+
+        assert response.metadata["attempts"] == 2
+        assert "".join(chunks) == response.content == "full answer"
+
+    @pytest.mark.asyncio
+    async def test_streamed_failure_not_retried(self, client):
+        """Test that a failure whose output was already streamed is not retried."""
+        chunks = []
+
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            await on_chunk("partial")
+            return _failure(prompt, "503 UNAVAILABLE")
+
+        async def on_chunk(text):
+            chunks.append(text)
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call) as mock_call:
+            response = await client.call_gemini("Prompt", on_chunk=on_chunk)
+
+        assert response.success is False
+        assert mock_call.call_count == 1
+        assert chunks == ["partial"]
+
+
+class TestHedging:
+    """Test hedged calls."""
+
+    def test_delay_from_percentile(self):
+        """Test that the hedge delay follows recent latencies."""
+        policy = HedgePolicy(HedgeConfig(enabled=True, min_samples=10, min_delay_seconds=0))
+        for latency in range(1, 10):
+            policy.record("m", float(latency))
+        assert policy.delay("m") is None
+
+        policy.record("m", 10.0)
+        assert policy.delay("m") == 10.0
+        assert HedgePolicy(HedgeConfig(enabled=False)).delay("m") is None
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_loses_to_hedge(self):
+        """Test that a hedge on a faster model wins and the primary is cancelled."""
+        hedging = HedgePolicy(HedgeConfig(
+            enabled=True, min_samples=1, min_delay_seconds=0, hedge_model="gemini-flash"
+        ))
+        client = GeminiCLIClient(hedge_policy=hedging)
+        client._verified_auth = True
+        primary_model = client.default_options.model
+        hedging.record(primary_model, 0.05)
+        cancelled = []
+        chunks = []
+
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            if options.model == primary_model:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(options.model)
+                    raise
+            await on_chunk(options.model)
+            return GeminiResponse(content=options.model, success=True, input_prompt=prompt)
+
+        async def on_chunk(text):
+            chunks.append(text)
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call):
+            response = await asyncio.wait_for(
+                client.call_gemini("Prompt", on_chunk=on_chunk), timeout=2
+            )
+
+        assert response.content == "gemini-flash"
+        assert response.metadata["hedge_winner"] == "hedge"
+        assert cancelled == [primary_model]
+        assert chunks == ["gemini-flash"]
+        assert hedging.hedge_wins == 1
+
+    @pytest.mark.asyncio
+    async def test_streaming_primary_not_hedged(self):
+        """Test that no hedge starts once the primary has streamed output."""
+        hedging = HedgePolicy(HedgeConfig(enabled=True, min_samples=1, min_delay_seconds=0))
+        client = GeminiCLIClient(hedge_policy=hedging)
+        client._verified_auth = True
+        hedging.record(client.default_options.model, 0.05)
+        chunks = []
+
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            await on_chunk("first ")
+            await asyncio.sleep(0.2)
+            await on_chunk("second")
+            return GeminiResponse(content="first second", success=True, input_prompt=prompt)
+
+        async def on_chunk(text):
+            chunks.append(text)
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call) as mock_call:
+            response = await client.call_gemini("Prompt", on_chunk=on_chunk)
+
+        assert mock_call.call_count == 1
+        assert "hedged" not in response.metadata
+        assert "".join(chunks) == response.content
+
+    @pytest.mark.asyncio
+    async def test_hedge_exception_is_not_a_winner(self):
+        """Test that a hedge raising an exception lets the primary win."""
+        hedging = HedgePolicy(HedgeConfig(
+            enabled=True, min_samples=1, min_delay_seconds=0, hedge_model="gemini-flash"
+        ))
+        client = GeminiCLIClient(hedge_policy=hedging)
+        client._verified_auth = True
+        primary_model = client.default_options.model
+        hedging.record(primary_model, 0.05)
+
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            if options.model != primary_model:
+                raise RuntimeError("hedge broke")
+            await asyncio.sleep(0.2)
+            return GeminiResponse(content="ok", success=True, input_prompt=prompt)
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call) as mock_call:
+            response = await asyncio.wait_for(client.call_gemini("Prompt"), timeout=2)
+
+        assert response.success is True
+        assert response.metadata["hedge_winner"] == "primary"
+        assert mock_call.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_hedge_denied_by_budget(self):
+        """Test that an exhausted retry budget prevents hedging."""
+        budget = RetryBudget(ratio=0, min_retries=0)
+        hedging = HedgePolicy(
+            HedgeConfig(enabled=True, min_samples=1, min_delay_seconds=0), budget=budget
+        )
+        client = GeminiCLIClient(hedge_policy=hedging)
+        client._verified_auth = True
+        hedging.record(client.default_options.model, 0.01)
+
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            await asyncio.sleep(0.05)
+            return GeminiResponse(content="ok", success=True, input_prompt=prompt)
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call) as mock_call:
+            response = await client.call_gemini("Prompt")
+
+        assert response.success is True
+        assert "hedged" not in response.metadata
+        assert mock_call.call_count == 1
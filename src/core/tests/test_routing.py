@@ -0,0 +1,93 @@
+"""
+Tests for model routing and cascades.
+"""
+
+import pytest
+
+from ..gemini_client import GeminiResponse
+from ..routing import ModelRouter, RoutingConfig, ToolRoutingConfig, run_cascade
+
+
+class TestModelRouter:
+    """Test ModelRouter functionality."""
+
+    def router(self, **overrides) -> ModelRouter:
+        """Router with routing enabled and a small threshold."""
+        config = RoutingConfig(enabled=True, small_max_tokens=100, **overrides)
+        return ModelRouter(config, default_model="pro")
+
+    def test_disabled_uses_default(self):
+        """Test that disabled routing always returns the default model."""
+        decision = ModelRouter(RoutingConfig(), default_model="pro").route("t", 1)
+        assert decision.model == "pro"
+        assert decision.reason == "routing disabled"
+
+    def test_routes_by_size(self):
+        """Test that small prompts go to the small model and large ones to the default."""
+        router = self.router(small_model="flash")
+        assert router.route("gemini_explain_code", 100).model == "flash"
+
+        decision = router.route("gemini_explain_code", 101)
+        assert decision.model == "pro"
+        assert "101" in decision.reason
+
+    def test_complex_requests_use_large_model(self):
+        """Test that focus and detail level can force the large model."""
+        router = self.router(large_model="ultra")
+        assert router.route("gemini_review_code", 10, focus="security").model == "ultra"
+        assert router.route("gemini_review_code", 10, focus="style").model == "gemini-2.5-flash"
+        assert router.route("gemini_explain_code", 10, detail_level="advanced").model == "ultra"
+
+    def test_tool_overrides(self):
+        """Test per-tool pinned models and thresholds."""
+        router = self.router(tools={
+            "gemini_analyze_bug": ToolRoutingConfig(model="pro-bugs"),
+            "gemini_explain_code": ToolRoutingConfig(small_max_tokens=1000),
+        })
+        assert router.route("gemini_analyze_bug", 1).model == "pro-bugs"
+        assert router.route("gemini_explain_code", 500).model == "gemini-2.5-flash"
+        assert router.route("gemini_review_code", 500).model == "pro"
+
+
+class TestCascade:
+    """Test run_cascade."""
+
+    @staticmethod
+    def answer(model: str, success: bool = True) -> GeminiResponse:
+        """Response naming the model that produced it."""
+        return GeminiResponse(
+            content=model, success=success, error=None if success else "failed",
+            input_prompt="p"
+        )
+
+    @pytest.mark.asyncio
+    async def test_first_acceptable_tier_answers(self):
+        """Test that the cascade stops at the first accepted answer."""
+        calls = []
+
+        async def attempt(model, last):
+            calls.append((model, last))
+            return self.answer(model)
+
+        response, tiers = await run_cascade(
+            ["flash", "pro"], attempt, lambda response: response.content == "flash"
+        )
+
+        assert response.content == "flash"
+        assert calls == [("flash", False)]
+        assert tiers[0]["accepted"] is True
+        assert tiers[0]["latency_seconds"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_escalates_on_rejection_and_failure(self):
+        """Test that rejected and failed tiers escalate, and the last tier always answers."""
+        async def attempt(model, last):
+            return self.answer(model, success=model != "lite")
+
+        response, tiers = await run_cascade(
+            ["lite", "flash", "pro"], attempt, lambda response: False
+        )
+
+        assert response.content == "pro"
+        assert [tier["model"] for tier in tiers] == ["lite", "flash", "pro"]
+        assert not any(tier["accepted"] for tier in tiers)
@@ -0,0 +1,225 @@
+"""
+Tests for the Gemini call scheduler.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from ..gemini_client import GeminiCLIClient, GeminiResponse
+from ..scheduler import GeminiScheduler, SchedulerConfig
+
+
+class TestGeminiScheduler:
+    """Test GeminiScheduler functionality."""
+
+    @pytest.mark.asyncio
+    async def test_limit_enforced_per_model(self):
+        """Test that no more than the limit run at once for a model."""
+        scheduler = GeminiScheduler(SchedulerConfig(max_concurrency=2, reserved_slots={}))
+        running = 0
+        peak = 0
+
+        async def call(model: str) -> None:
+            nonlocal running, peak
+            async with scheduler.slot(model):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(call("gemini-pro") for _ in range(10)))
+
+        assert peak == 2
+        stats = scheduler.get_stats()["gemini-pro"]
+        assert stats["admitted"] == 10
+        assert stats["active"] == 0
+        assert stats["queued"] == 0
+        assert stats["wait_max_seconds"] > 0
+
+    @pytest.mark.asyncio
+    async def test_model_override_and_independent_lanes(self):
+        """Test per-model limits and that a busy model does not block others."""
+        scheduler = GeminiScheduler(
+            SchedulerConfig(max_concurrency=1, model_concurrency={"fast": 3}, reserved_slots={})
+        )
+        await scheduler.acquire("slow")
+        for _ in range(3):
+            ticket = await asyncio.wait_for(scheduler.acquire("fast"), timeout=1)
+            assert ticket.waited == 0.0
+
+        stats = scheduler.get_stats()
+        assert stats["slow"]["limit"] == 1
+        assert stats["fast"]["active"] == 3
+
+    @pytest.mark.asyncio
+    async def test_round_robin_across_sessions(self):
+        """Test that queued calls are served fairly across sessions, FIFO within one."""
+        scheduler = GeminiScheduler(SchedulerConfig(max_concurrency=1))
+        holder = await scheduler.acquire("m")
+        order = []
+
+        async def call(session: str, index: int) -> None:
+            async with scheduler.slot("m", session):
+                order.append(f"{session}{index}")
+
+        tasks = [asyncio.create_task(call("a", index)) for index in range(3)]
+        tasks.append(asyncio.create_task(call("b", 0)))
+        await asyncio.sleep(0)
+        scheduler.release(holder)
+        await asyncio.gather(*tasks)
+
+        assert order == ["a0", "b0", "a1", "a2"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_releases_nothing(self):
+        """Test that cancelling a queued call neither leaks nor steals a slot."""
+        scheduler = GeminiScheduler(SchedulerConfig(max_concurrency=1))
+        holder = await scheduler.acquire("m")
+
+        waiter = asyncio.create_task(scheduler.acquire("m"))
+        await asyncio.sleep(0)
+        assert scheduler.get_stats()["m"]["queued"] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert scheduler.get_stats()["m"]["queued"] == 0
+        scheduler.release(holder)
+        ticket = await asyncio.wait_for(scheduler.acquire("m"), timeout=1)
+        assert ticket.waited == 0.0
+
+    @pytest.mark.asyncio
+    async def test_priority_order_and_reservation(self):
+        """Test that higher priorities are served first and reserved slots are kept."""
+        scheduler = GeminiScheduler(
+            SchedulerConfig(max_concurrency=2, reserved_slots={"interactive": 1}, preemptible=[])
+        )
+        batch = await scheduler.acquire("m", priority="batch")
+        blocked = asyncio.create_task(scheduler.acquire("m", priority="normal"))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+
+        # The reserved slot is still free for interactive work
+        interactive = await asyncio.wait_for(scheduler.acquire("m", priority="interactive"), 1)
+        late = asyncio.create_task(scheduler.acquire("m", priority="interactive"))
+        await asyncio.sleep(0)
+
+        scheduler.release(batch)
+        await asyncio.sleep(0)
+        assert late.done() and not blocked.done()
+
+        scheduler.release(interactive)
+        scheduler.release(late.result())
+        assert (await asyncio.wait_for(blocked, 1)).priority == "normal"
+
+    @pytest.mark.asyncio
+    async def test_interactive_preempts_newest_batch(self):
+        """Test that a waiting interactive call flags the most recent batch slot."""
+        scheduler = GeminiScheduler(SchedulerConfig(max_concurrency=2, reserved_slots={}))
+        older = await scheduler.acquire("m", priority="batch")
+        newer = await scheduler.acquire("m", priority="batch")
+
+        waiter = asyncio.create_task(scheduler.acquire("m", priority="interactive"))
+        await asyncio.sleep(0)
+        assert newer.preempted.is_set() and not older.preempted.is_set()
+
+        scheduler.release(newer)
+        assert (await asyncio.wait_for(waiter, 1)).priority == "interactive"
+        assert scheduler.get_stats()["m"]["preemptions"] == 1
+
+
+class TestClientScheduling:
+    """Test GeminiCLIClient integration with the scheduler."""
+
+    @pytest.mark.asyncio
+    async def test_burst_is_queued(self):
+        """Test that a burst of distinct calls runs within the limit and reports waits."""
+        client = GeminiCLIClient(scheduler=GeminiScheduler(SchedulerConfig(max_concurrency=2, reserved_slots={})))
+        client._verified_auth = True
+        running = 0
+        peak = 0
+
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return GeminiResponse(content="ok", success=True, input_prompt=prompt)
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call):
+            responses = await asyncio.gather(
+                *(client.call_gemini(f"Prompt {index}") for index in range(6))
+            )
+
+        assert peak == 2
+        assert all(response.success for response in responses)
+        assert max(r.metadata["queue_wait_seconds"] for r in responses) > 0
+
+    @pytest.mark.asyncio
+    async def test_preempted_batch_call_is_requeued(self):
+        """Test that a preempted batch call is cancelled, re-queued and completed."""
+        client = GeminiCLIClient(
+            scheduler=GeminiScheduler(SchedulerConfig(max_concurrency=1, reserved_slots={}))
+        )
+        client._verified_auth = True
+        batch_started = asyncio.Event()
+        attempts = {"batch": 0, "cancelled": 0}
+
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            if prompt == "batch":
+                attempts["batch"] += 1
+                batch_started.set()
+                try:
+                    await asyncio.sleep(0.2)
+                except asyncio.CancelledError:
+                    attempts["cancelled"] += 1
+                    raise
+            return GeminiResponse(content=prompt, success=True, input_prompt=prompt)
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call):
+            batch = asyncio.create_task(client.call_gemini("batch", priority="batch"))
+            await batch_started.wait()
+            interactive = await client.call_gemini("interactive", priority="interactive")
+            batch_response = await batch
+
+        assert interactive.content == "interactive"
+        assert batch_response.content == "batch"
+        assert attempts == {"batch": 2, "cancelled": 1}
+        assert batch_response.metadata["preemptions"] == 1
+        assert batch_response.metadata["priority"] == "batch"
+
+    @pytest.mark.asyncio
+    async def test_preempted_batch_call_streams_once(self):
+        """Test that a preempted streaming batch call streams only its final run."""
+        client = GeminiCLIClient(
+            scheduler=GeminiScheduler(SchedulerConfig(max_concurrency=1, reserved_slots={}))
+        )
+        client._verified_auth = True
+        batch_started = asyncio.Event()
+        chunks = []
+
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            if prompt == "batch":
+                await on_chunk("batch ")
+                batch_started.set()
+                await asyncio.sleep(0.2)
+                await on_chunk("answer")
+                return GeminiResponse(content="batch answer", success=True, input_prompt=prompt)
+            return GeminiResponse(content=prompt, success=True, input_prompt=prompt)
+
+        async def on_chunk(text):
+            chunks.append(text)
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call):
+            batch = asyncio.create_task(
+                client.call_gemini("batch", priority="batch", on_chunk=on_chunk)
+            )
+            await batch_started.wait()
+            await client.call_gemini("interactive", priority="interactive")
+            batch_response = await batch
+
+        assert batch_response.metadata["preemptions"] == 1
+        assert "".join(chunks) == batch_response.content
@@ -0,0 +1,120 @@
+"""
+Tests for single-flight call coalescing.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from ..gemini_client import GeminiCLIClient, GeminiResponse
+from ..singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test SingleFlight functionality."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_run(self):
+        """Test that concurrent callers with one key run the function once."""
+        flight: SingleFlight[str] = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def work() -> str:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "done"
+
+        tasks = [asyncio.create_task(flight.do("key", work)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert calls == 1
+        assert [result for result, _ in results] == ["done"] * 5
+        assert sum(shared for _, shared in results) == 4
+        assert not flight.in_flight("key")
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        """Test that distinct keys are not coalesced."""
+        flight: SingleFlight[str] = SingleFlight()
+
+        async def work() -> str:
+            await asyncio.sleep(0)
+            return "done"
+
+        results = await asyncio.gather(flight.do("a", work), flight.do("b", work))
+        assert [shared for _, shared in results] == [False, False]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_shared_call(self):
+        """Test that one cancelled waiter leaves the call running for others."""
+        flight: SingleFlight[str] = SingleFlight()
+        release = asyncio.Event()
+
+        async def work() -> str:
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flight.do("key", work))
+        second = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == ("done", True)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    @pytest.mark.asyncio
+    async def test_last_waiter_cancel_cancels_call(self):
+        """Test that the shared call stops once every waiter has gone."""
+        flight: SingleFlight[str] = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def work() -> str:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return "done"
+
+        waiter = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        waiter.cancel()
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        await asyncio.sleep(0)
+        assert not flight.in_flight("key")
+
+
+class TestClientCoalescing:
+    """Test GeminiCLIClient request coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_calls_spawn_once(self):
+        """Test that identical concurrent calls make one CLI call."""
+        client = GeminiCLIClient()
+        client._verified_auth = True
+        calls = 0
+
+        async def fake_call(prompt, options=None, input_files=None, on_chunk=None, env=None):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return GeminiResponse(content="Shared", success=True, input_prompt=prompt)
+
+        with patch.object(client, '_call_gemini', side_effect=fake_call):
+            responses = await asyncio.gather(
+                *(client.call_gemini("Review this") for _ in range(4))
+            )
+
+        assert calls == 1
+        assert all(response.content == "Shared" for response in responses)
+        assert sum(bool(response.metadata.get("coalesced")) for response in responses) == 3
@@ -5,20 +5,73 @@ This module implements the MCP server that provides tools for interacting
 with Google Gemini CLI for development assistance.
 """
 
+import asyncio
 import json
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, nullcontext
+from dataclasses import dataclass
 from typing import Any
 
 from mcp.server.fastmcp import Context, FastMCP
 from pydantic import BaseModel, Field
 
-from ..core.config import ConfigManager
-from ..core.gemini_client import GeminiCLIClient
+from ..core.admission import AdmissionController
+from ..core.agent_backend import AgentBackend
+from ..core.auth import AuthVerdictStore
+from ..core.cache import ResponseCache
+from ..core.circuit_breaker import CircuitBreaker
+from ..core.config import ConfigManager, PromptTemplate
+from ..core.conversations import Conversation, ConversationStore, Turn
+from ..core.credentials import CredentialPool
+from ..core.disk_cache import DiskCache
+from ..core.gemini_client import (
+    ChunkCallback,
+    GeminiBackend,
+    GeminiCLIClient,
+    GeminiOptions,
+    GeminiResponse,
+    format_input_files,
+)
+from ..core.hedging import HedgePolicy
+from ..core.http_backend import HttpBackend
+from ..core.process_pool import GeminiProcessPool
+from ..core.rate_limit import RateLimiter, estimate_tokens
+from ..core.retry import RetryPolicy
+from ..core.routing import ModelRouter, run_cascade
+from ..core.scheduler import GeminiScheduler, Priority
+from .streaming import IssueStreamParser, make_progress_forwarder
+
+
+class GeminiCallRequest(BaseModel):
+    """Scheduling fields shared by all tool requests."""
+
+    timeout_seconds: float | None = Field(
+        default=None, gt=0, description="Deadline for the Gemini call (server default if unset)"
+    )
+    priority: Priority = Field(
+        default="interactive",
+        description="Scheduling priority: interactive, normal, or batch"
+    )
+    conversation_id: str | None = Field(
+        default=None,
+        description="Conversation ID from an earlier tool response; code sent then may be left out"
+    )
+
+    def prompt_bytes(self) -> int:
+        """Size of the text fields that go into the prompt, in bytes."""
+        return sum(
+            len(value.encode("utf-8"))
+            for name, value in self.__dict__.items()
+            if isinstance(value, str) and name not in GeminiCallRequest.model_fields
+        )
 
 
-class CodeReviewRequest(BaseModel):
+class CodeReviewRequest(GeminiCallRequest):
     """Request model for code review."""
 
-    code: str = Field(description="Code to review")
+    code: str = Field(
+        default="", description="Code to review (may be left out when continuing a conversation)"
+    )
     language: str | None = Field(default=None, description="Programming language")
     focus: str | None = Field(
         default="general",
@@ -35,6 +88,7 @@ class CodeReviewResponse(BaseModel):
     rating: str = Field(description="Overall code quality rating")
     input_prompt: str = Field(description="The prompt sent to Gemini")
     gemini_response: str = Field(description="The raw response from Gemini")
+    metadata: dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
 
 
 class GeminiToolResponse(BaseModel):
@@ -46,7 +100,7 @@ class GeminiToolResponse(BaseModel):
     metadata: dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
 
 
-class FeaturePlanRequest(BaseModel):
+class FeaturePlanRequest(GeminiCallRequest):
     """Request model for feature plan review."""
 
     feature_plan: str = Field(description="Feature plan document")
@@ -57,7 +111,7 @@ class FeaturePlanRequest(BaseModel):
     )
 
 
-class BugAnalysisRequest(BaseModel):
+class BugAnalysisRequest(GeminiCallRequest):
     """Request model for bug analysis."""
 
     bug_description: str = Field(description="Description of the bug")
@@ -68,10 +122,12 @@ class BugAnalysisRequest(BaseModel):
     language: str | None = Field(default="", description="Programming language")
 
 
-class CodeExplanationRequest(BaseModel):
+class CodeExplanationRequest(GeminiCallRequest):
     """Request model for code explanation."""
 
-    code: str = Field(description="Code to explain")
+    code: str = Field(
+        default="", description="Code to explain (may be left out when continuing a conversation)"
+    )
     language: str | None = Field(default=None, description="Programming language")
     detail_level: str | None = Field(
         default="intermediate",
@@ -80,6 +136,152 @@ class CodeExplanationRequest(BaseModel):
     questions: str | None = Field(default="", description="Specific questions about the code")
 
 
+@dataclass
+class ToolPrompt:
+    """A tool's prompt in both layouts."""
+
+    system_prompt: str
+    user_prompt: str
+    # Cacheable layout: the material asked about, and the rest of the request
+    document: str
+    question: str
+
+    @classmethod
+    def from_template(
+        cls, template: PromptTemplate, has_document: bool = True, **kwargs: Any
+    ) -> "ToolPrompt":
+        """
+        Format a template for both layouts.
+
+        Args:
+            template: Tool template
+            has_document: Whether the request carries its material (follow-ups may not)
+            **kwargs: Variables to substitute in template
+
+        Returns:
+            The formatted prompt
+        """
+        system_prompt, user_prompt = template.format(**kwargs)
+        _, document, question = template.format_layered(**kwargs)
+        return cls(system_prompt, user_prompt, document if has_document else "", question)
+
+
+# Stands in for code a follow-up call leaves out
+EARLIER_CODE = "(the code sent earlier in this conversation)"
+
+
+def code_for(code: str | None, conversation_id: str | None) -> str:
+    """
+    Get the code to put in a tool prompt.
+
+    Args:
+        code: Code from the request
+        conversation_id: Conversation the request continues, if any
+
+    Returns:
+        The code, or a reference to the code sent earlier in the conversation
+
+    Raises:
+        ValueError: If there is no code and no conversation to take it from
+    """
+    if code:
+        return code
+    if conversation_id is None:
+        raise ValueError("code is required unless conversation_id is given")
+    return EARLIER_CODE
+
+
+def session_of(ctx: Context[Any, Any, Any]) -> str | None:
+    """
+    Identify the MCP client behind a tool call for fair scheduling.
+
+    A client ID in the request metadata is used first, then the
+    ``Mcp-Session-Id`` header of a stateful HTTP client, then the MCP
+    session object of the connection. Network addresses are not used,
+    since local clients would all share one queue. Under stateless HTTP
+    each request has its own session object, so calls without a client ID
+    are not grouped. Over stdio the server has a single client and all
+    calls share one queue.
+
+    Args:
+        ctx: Context of the tool call
+
+    Returns:
+        Caller identity, or None for the shared default queue
+    """
+    try:
+        if ctx.client_id:
+            return ctx.client_id
+        request = ctx.request_context.request
+    except Exception:
+        return None
+    if request is None:
+        return None
+
+    session_id = request.headers.get("mcp-session-id")
+    if session_id:
+        return f"session-{session_id}"
+    return f"connection-{id(ctx.session)}"
+
+
+def extract_json_block(content: str) -> str | None:
+    """
+    Get the first complete ```json block of a response.
+
+    Args:
+        content: Response text
+
+    Returns:
+        The block's text, or None if there is no complete block
+    """
+    start = content.find("```json")
+    if start == -1:
+        return None
+    start += len("```json")
+    end = content.find("```", start)
+    if end == -1:
+        return None
+    return content[start:end].strip()
+
+
+def is_valid_review(content: str) -> bool:
+    """
+    Check that a code review answer is usable without escalation.
+
+    The answer must contain a JSON block with a string ``summary``, a list
+    of ``issues`` objects and optional ``suggestions`` strings and
+    ``rating``, and must report at least one issue or a non-empty summary.
+
+    Args:
+        content: Response text
+
+    Returns:
+        True if the review is valid
+    """
+    block = extract_json_block(content)
+    if block is None:
+        return False
+    try:
+        parsed = json.loads(block)
+    except json.JSONDecodeError:
+        return False
+    if not isinstance(parsed, dict):
+        return False
+
+    summary = parsed.get("summary")
+    issues = parsed.get("issues")
+    suggestions = parsed.get("suggestions", [])
+    if not isinstance(summary, str) or not isinstance(issues, list):
+        return False
+    if not isinstance(suggestions, list) or not all(isinstance(s, str) for s in suggestions):
+        return False
+    if not all(isinstance(issue, dict) for issue in issues):
+        return False
+    if not isinstance(parsed.get("rating", ""), str):
+        return False
+    return bool(issues or summary.strip())
+
+
 def create_server() -> FastMCP:
     """
     Create and configure the Gemini MCP server.
@@ -91,20 +293,276 @@ def create_server() -> FastMCP:
     config_manager = ConfigManager()
     server_config = config_manager.config
 
+    prewarm: asyncio.Task[None] | None = None
+
+    @asynccontextmanager
+    async def lifespan(server: FastMCP[None]) -> AsyncIterator[None]:
+        """Pre-spawn pooled CLI processes once the server is running."""
+        nonlocal prewarm
+        # Stateless HTTP runs the lifespan per request, so prewarm only once
+        if prewarm is None and process_pool is not None:
+            prewarm = asyncio.create_task(gemini_client.prewarm())
+        yield
+
     # Create FastMCP server
     mcp = FastMCP(
         name=server_config.name,
         # Enable stateless HTTP for Claude Code compatibility
-        stateless_http=True
+        stateless_http=True,
+        lifespan=lifespan
     )
 
     # Initialize Gemini client
-    gemini_client = GeminiCLIClient(server_config.gemini_options)
+    process_pool = None
+    if server_config.process_pool.enabled:
+        process_pool = GeminiProcessPool(server_config.process_pool)
+    cache = None
+    if server_config.enable_caching:
+        cache = ResponseCache(
+            ttl_seconds=server_config.cache_ttl_seconds,
+            max_entries=server_config.cache_max_entries,
+            max_size_mb=server_config.cache_max_size_mb
+        )
+    disk_cache = DiskCache.from_config(server_config)
+    scheduler = GeminiScheduler(server_config.scheduler)
+    rate_limiter = RateLimiter(server_config.rate_limit)
+    credential_pool = CredentialPool(server_config.credential_pool)
+    retry_policy = RetryPolicy(server_config.retry)
+    hedge_policy = HedgePolicy(server_config.hedging, budget=retry_policy.budget)
+    circuit_breaker = CircuitBreaker(server_config.circuit_breaker)
+    router = ModelRouter(server_config.routing, default_model=server_config.gemini_options.model)
+    admission = AdmissionController(
+        server_config.admission, concurrency=server_config.scheduler.max_concurrency
+    )
+    backend: GeminiBackend | None = None
+    if server_config.backend == "http":
+        backend = HttpBackend(
+            server_config.http_backend,
+            max_file_size_mb=server_config.max_file_size_mb,
+            max_response_chars=server_config.max_response_chars
+        )
+    elif server_config.backend == "agent":
+        backend = AgentBackend(
+            server_config.agent_backend,
+            max_file_size_mb=server_config.max_file_size_mb,
+            max_response_chars=server_config.max_response_chars
+        )
+    gemini_client = GeminiCLIClient(
+        server_config.gemini_options,
+        process_pool=process_pool,
+        cache=cache,
+        disk_cache=disk_cache,
+        auth_store=AuthVerdictStore(
+            server_config.cache_dir,
+            ttl_seconds=server_config.auth_cache_ttl_seconds
+        ),
+        max_context_files=server_config.max_context_files,
+        max_file_size_mb=server_config.max_file_size_mb,
+        max_response_chars=server_config.max_response_chars,
+        default_timeout=server_config.request_timeout_seconds,
+        scheduler=scheduler,
+        rate_limiter=rate_limiter,
+        credentials=credential_pool,
+        retry_policy=retry_policy,
+        hedge_policy=hedge_policy,
+        circuit_breaker=circuit_breaker,
+        backend=backend
+    )
+    conversations = None
+    if server_config.conversations.enabled:
+        conversations = ConversationStore(
+            server_config.conversations, on_forget=gemini_client.backend.end_conversation
+        )
+
+    def stream_to(
+        ctx: Context[Any, Any, Any],
+        issue_parser: IssueStreamParser | None = None
+    ) -> ChunkCallback | None:
+        """Build the chunk callback for a tool call, if streaming is enabled."""
+        if not server_config.stream_progress:
+            return None
+        return make_progress_forwarder(ctx, issue_parser)
+
+    def route(
+        tool: str,
+        prompt: ToolPrompt,
+        focus: str | None = None,
+        detail_level: str | None = None
+    ) -> tuple[GeminiOptions, dict[str, Any]]:
+        """Pick the model for a tool call; return its options and routing metadata."""
+        decision = router.route(
+            tool, estimate_tokens(prompt.system_prompt + prompt.user_prompt), focus, detail_level
+        )
+        options = options_for(tool, decision.model)
+        return options, {"model": decision.model, "routing_reason": decision.reason}
+
+    def options_for(tool: str, model: str) -> GeminiOptions:
+        """CLI options for a tool call on a model."""
+        return gemini_client.default_options.model_copy(update={
+            "model": model,
+            "stop_after_json": tool in server_config.stop_after_json_tools,
+        })
+
+    async def shared_context() -> str | None:
+        """Read the repository files sent ahead of every prompt in the cacheable layout."""
+        if not server_config.shared_context_files:
+            return None
+        blocks = await asyncio.to_thread(
+            format_input_files, server_config.shared_context_files, server_config.max_file_size_mb
+        )
+        return "".join(blocks)
+
+    async def ask(
+        prompt: ToolPrompt,
+        options: GeminiOptions,
+        on_chunk: ChunkCallback | None,
+        request: GeminiCallRequest,
+        ctx: Context[Any, Any, Any],
+        history: str | None = None
+    ) -> GeminiResponse:
+        """Call Gemini with a tool prompt in the configured layout."""
+        if server_config.prompt_layout == "cacheable":
+            return await gemini_client.call_with_layered_prompt(
+                system_prompt=prompt.system_prompt,
+                question=prompt.question,
+                shared_context=await shared_context(),
+                history=history,
+                document=prompt.document,
+                options=options,
+                on_chunk=on_chunk,
+                timeout=request.timeout_seconds,
+                session=session_of(ctx),
+                priority=request.priority
+            )
+        return await gemini_client.call_with_structured_prompt(
+            system_prompt=prompt.system_prompt,
+            user_prompt=prompt.user_prompt,
+            context=history,
+            options=options,
+            on_chunk=on_chunk,
+            timeout=request.timeout_seconds,
+            session=session_of(ctx),
+            priority=request.priority
+        )
+
+    def response_details(response: GeminiResponse) -> dict[str, Any]:
+        """Prompt cache and truncation details of a response, for tool metadata."""
+        return {
+            key: response.metadata[key]
+            for key in ("cached_tokens", "context_cache", "truncated")
+            if key in response.metadata
+        }
+
+    async def review_cascade(
+        models: list[str],
+        prompt: ToolPrompt,
+        request: CodeReviewRequest,
+        ctx: Context[Any, Any, Any]
+    ) -> tuple[GeminiResponse, dict[str, Any]]:
+        """Run a code review through the model cascade; return the answer and its metadata."""
+        async def attempt(model: str, last: bool) -> GeminiResponse:
+            return await ask(
+                prompt,
+                options_for("gemini_review_code", model),
+                # Only the final tier streams: earlier answers may be discarded
+                stream_to(ctx, IssueStreamParser()) if last else None,
+                request,
+                ctx
+            )
+
+        response, tiers = await run_cascade(
+            models, attempt, lambda response: is_valid_review(response.content)
+        )
+        return response, {
+            **response_details(response),
+            "model": tiers[-1]["model"],
+            "routing_reason": f"cascade tier {len(tiers)} of {len(models)}",
+            "cascade_tier": len(tiers),
+            "cascade": tiers,
+        }
+
+    async def converse(
+        tool: str,
+        request: GeminiCallRequest,
+        prompt: ToolPrompt,
+        on_chunk: ChunkCallback | None,
+        ctx: Context[Any, Any, Any],
+        focus: str | None = None,
+        detail_level: str | None = None
+    ) -> tuple[GeminiResponse, dict[str, Any]]:
+        """
+        Run a tool call, continuing its conversation if it names one.
+
+        A follow-up runs on the conversation's model. Backends that still
+        hold the conversation get only the new turn; others get the
+        earlier turns as context.
+        """
+        backend = gemini_client.backend
+        conversation: Conversation | None = None
+        # Store and conversation a follow-up continues
+        follow_up: tuple[ConversationStore, Conversation] | None = None
+        routing: dict[str, Any]
+        if request.conversation_id is not None:
+            found = conversations.get(request.conversation_id) if conversations is not None else None
+            if conversations is None or found is None:
+                raise ValueError(
+                    f"Unknown or expired conversation_id {request.conversation_id!r}; "
+                    "send the full request without it"
+                )
+            conversation = found
+            follow_up = (conversations, found)
+            options = options_for(tool, found.model)
+            routing = {"model": found.model, "routing_reason": "continues the conversation"}
+        else:
+            options, routing = route(tool, prompt, focus, detail_level)
+            if conversations is not None and backend.keeps_conversations:
+                # Open the backend session now so that follow-ups send only new turns
+                conversation = conversations.create(options.model)
+        if conversation is not None:
+            options = options.model_copy(update={"conversation_id": conversation.id})
+
+        async with conversation.lock if conversation is not None else nullcontext():
+            context = None
+            if follow_up is not None:
+                store, previous = follow_up
+                resumed = backend.has_conversation(previous.id)
+                if resumed:
+                    store.resumed += 1
+                else:
+                    context = previous.transcript(server_config.conversations.max_replayed_turns)
+                    store.replayed += 1
+                routing["conversation_resumed"] = resumed
+
+            response = await ask(prompt, options, on_chunk, request, ctx, history=context)
+            return response, {
+                **routing,
+                **response_details(response),
+                **remember(conversation, prompt.user_prompt, response, options.model),
+            }
+
+    def remember(
+        conversation: Conversation | None,
+        user_prompt: str,
+        response: GeminiResponse,
+        model: str
+    ) -> dict[str, Any]:
+        """Record a successful turn; return the conversation metadata for the response."""
+        if conversations is None:
+            return {}
+        if not response.success:
+            if conversation is not None and not conversation.turns:
+                conversations.discard(conversation)
+            return {}
+        if conversation is None:
+            conversation = conversations.create(model)
+        if not conversations.add_turn(conversation, Turn(user_prompt, response.content)):
+            return {}
+        return {"conversation_id": conversation.id}
 
     @mcp.tool()
     async def gemini_review_code(
         request: CodeReviewRequest,
-        ctx: Context
+        ctx: Context[Any, Any, Any]
     ) -> CodeReviewResponse:
         """
         Analyze code quality, style, and potential issues using Gemini.
@@ -116,81 +574,88 @@ def create_server() -> FastMCP:
         await ctx.info(f"Starting code review for {len(request.code)} characters of code")
 
         try:
-            # Get template and format prompt
-            template = config_manager.get_template("code_review")
-            if not template:
-                raise ValueError("Code review template not found")
-
-            # Determine language if not provided
-            language = request.language or "auto-detect"
-
-            # Create focus instruction
-            focus_map = {
-                "security": "Focus specifically on security vulnerabilities and potential exploits.",
-                "performance": "Focus on performance optimizations and bottlenecks.",
-                "style": "Focus on code style, formatting, and best practices.",
-                "bugs": "Focus on potential bugs and logical errors.",
-                "general": "Provide a comprehensive review covering all aspects."
-            }
-            focus_instruction = focus_map.get(request.focus, focus_map["general"])
-
-            # Format template
-            system_prompt, user_prompt = template.format(
-                language=language,
-                code=request.code,
-                focus_instruction=focus_instruction
-            )
-
-            # Call Gemini
-            response = await gemini_client.call_with_structured_prompt(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt
-            )
-
-            if not response.success:
-                raise ValueError(f"Gemini call failed: {response.error}")
-
-            # Parse structured response
-            try:
-                # Try to extract JSON from response
-                content = response.content
-                if "```json" in content:
-                    # Extract JSON block
-                    start = content.find("```json") + 7
-                    end = content.find("```", start)
-                    if end != -1:
-                        json_content = content[start:end].strip()
-                        parsed = json.loads(json_content)
-                    else:
-                        # Fallback to simple parsing
-                        parsed = {"summary": content, "issues": [], "suggestions": []}
-                else:
-                    # Create structured response from text
-                    parsed = {
-                        "summary": content[:500] + "..." if len(content) > 500 else content,
-                        "issues": [],
-                        "suggestions": content.split('\n') if content else []
-                    }
-
-                return CodeReviewResponse(
-                    summary=parsed.get("summary", "Code review completed"),
-                    issues=parsed.get("issues", []),
-                    suggestions=parsed.get("suggestions", []),
-                    rating=parsed.get("rating", "Review completed"),
-                    input_prompt=response.input_prompt,
-                    gemini_response=response.content
+            with admission.admit(request.prompt_bytes()):
+                # Get template and format prompt
+                template = config_manager.get_template("code_review")
+                if not template:
+                    raise ValueError("Code review template not found")
+
+                # Determine language if not provided
+                language = request.language or "auto-detect"
+
+                # Create focus instruction
+                focus_map = {
+                    "security": "Focus specifically on security vulnerabilities and potential exploits.",
+                    "performance": "Focus on performance optimizations and bottlenecks.",
+                    "style": "Focus on code style, formatting, and best practices.",
+                    "bugs": "Focus on potential bugs and logical errors.",
+                    "general": "Provide a comprehensive review covering all aspects."
+                }
+                focus_instruction = focus_map.get(request.focus, focus_map["general"])
+
+                # Format template
+                prompt = ToolPrompt.from_template(
+                    template,
+                    has_document=bool(request.code),
+                    language=language,
+                    code=code_for(request.code, request.conversation_id),
+                    focus_instruction=focus_instruction
                 )
 
-            except json.JSONDecodeError:
-                # Fallback to simple text response
-                return CodeReviewResponse(
-                    summary=response.content[:200] + "..." if len(response.content) > 200 else response.content,
-                    issues=[],
-                    suggestions=[response.content],
-                    rating="Review completed (text format)",
-                    input_prompt=response.input_prompt,
-                    gemini_response=response.content
-                )
+                cascade = server_config.routing.review_cascade
+                if cascade and request.conversation_id is None:
+                    response, routing = await review_cascade(cascade, prompt, request, ctx)
+                    routing.update(remember(None, prompt.user_prompt, response, routing["model"]))
+                else:
+                    # Call Gemini, forwarding issues as soon as each one is parsed
+                    response, routing = await converse(
+                        "gemini_review_code", request, prompt,
+                        stream_to(ctx, IssueStreamParser()), ctx, focus=request.focus
+                    )
+
+                if not response.success:
+                    raise ValueError(f"Gemini call failed: {response.error}")
+
+                # Parse structured response
+                try:
+                    # Try to extract JSON from response
+                    content = response.content
+                    if "```json" in content:
+                        json_content = extract_json_block(content)
+                        if json_content is not None:
+                            parsed = json.loads(json_content)
+                        else:
+                            # Fallback to simple parsing
+                            parsed = {"summary": content, "issues": [], "suggestions": []}
+                    else:
+                        # Create structured response from text
+                        parsed = {
+                            "summary": content[:500] + "..." if len(content) > 500 else content,
+                            "issues": [],
+                            "suggestions": content.split('\n') if content else []
+                        }
+
+                    return CodeReviewResponse(
+                        summary=parsed.get("summary", "Code review completed"),
+                        issues=parsed.get("issues", []),
+                        suggestions=parsed.get("suggestions", []),
+                        rating=parsed.get("rating", "Review completed"),
+                        input_prompt=response.input_prompt,
+                        gemini_response=response.content,
+                        metadata=routing
+                    )
+
+                except json.JSONDecodeError:
+                    # Fallback to simple text response
+                    return CodeReviewResponse(
+                        summary=response.content[:200] + "..." if len(response.content) > 200 else response.content,
+                        issues=[],
+                        suggestions=[response.content],
+                        rating="Review completed (text format)",
+                        input_prompt=response.input_prompt,
+                        gemini_response=response.content,
+                        metadata=routing
+                    )
 
         except Exception as e:
             await ctx.error(f"Code review failed: {str(e)}")
@@ -206,7 +671,7 @@ def create_server() -> FastMCP:
     @mcp.tool()
     async def gemini_proofread_feature_plan(
         request: FeaturePlanRequest,
-        ctx: Context
+        ctx: Context[Any, Any, Any]
     ) -> GeminiToolResponse:
         """
         Review and improve feature plans and specifications using Gemini.
@@ -217,32 +682,34 @@ def create_server() -> FastMCP:
         await ctx.info("Starting feature plan review")
 
         try:
-            # Get template
-            template = config_manager.get_template("feature_plan_review")
-            if not template:
-                raise ValueError("Feature plan review template not found")
-
-            # Format template
-            system_prompt, user_prompt = template.format(
-                feature_plan=request.feature_plan,
-                context=request.context,
-                focus_areas=request.focus_areas
-            )
+            with admission.admit(request.prompt_bytes()):
+                # Get template
+                template = config_manager.get_template("feature_plan_review")
+                if not template:
+                    raise ValueError("Feature plan review template not found")
+
+                # Format template
+                prompt = ToolPrompt.from_template(
+                    template,
+                    feature_plan=request.feature_plan,
+                    context=request.context,
+                    focus_areas=request.focus_areas
+                )
 
-            # Call Gemini
-            response = await gemini_client.call_with_structured_prompt(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt
-            )
+                # Call Gemini
+                response, routing = await converse(
+                    "gemini_proofread_feature_plan", request, prompt, stream_to(ctx), ctx
+                )
 
-            if not response.success:
-                raise ValueError(f"Gemini call failed: {response.error}")
+                if not response.success:
+                    raise ValueError(f"Gemini call failed: {response.error}")
 
-            return GeminiToolResponse(
-                result=response.content,
-                input_prompt=response.input_prompt,
-                gemini_response=response.content
-            )
+                return GeminiToolResponse(
+                    result=response.content,
+                    input_prompt=response.input_prompt,
+                    gemini_response=response.content,
+                    metadata=routing
+                )
 
         except Exception as e:
             await ctx.error(f"Feature plan review failed: {str(e)}")
@@ -255,7 +722,7 @@ def create_server() -> FastMCP:
     @mcp.tool()
     async def gemini_analyze_bug(
         request: BugAnalysisRequest,
-        ctx: Context
+        ctx: Context[Any, Any, Any]
     ) -> GeminiToolResponse:
         """
         Analyze bugs and suggest fixes using Gemini.
@@ -266,35 +733,40 @@ def create_server() -> FastMCP:
         await ctx.info("Starting bug analysis")
 
         try:
-            # Get template
-            template = config_manager.get_template("bug_analysis")
-            if not template:
-                raise ValueError("Bug analysis template not found")
-
-            # Format template
-            system_prompt, user_prompt = template.format(
-                bug_description=request.bug_description,
-                error_logs=request.error_logs,
-                code_context=request.code_context,
-                language=request.language or "unknown",
-                environment=request.environment,
-                reproduction_steps=request.reproduction_steps
-            )
+            with admission.admit(request.prompt_bytes()):
+                # Get template
+                template = config_manager.get_template("bug_analysis")
+                if not template:
+                    raise ValueError("Bug analysis template not found")
+
+                # Format template
+                prompt = ToolPrompt.from_template(
+                    template,
+                    has_document=bool(request.code_context),
+                    bug_description=request.bug_description,
+                    error_logs=request.error_logs,
+                    code_context=request.code_context or (
+                        EARLIER_CODE if request.conversation_id is not None else ""
+                    ),
+                    language=request.language or "unknown",
+                    environment=request.environment,
+                    reproduction_steps=request.reproduction_steps
+                )
 
-            # Call Gemini
-            response = await gemini_client.call_with_structured_prompt(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt
-            )
+                # Call Gemini
+                response, routing = await converse(
+                    "gemini_analyze_bug", request, prompt, stream_to(ctx), ctx
+                )
 
-            if not response.success:
-                raise ValueError(f"Gemini call failed: {response.error}")
+                if not response.success:
+                    raise ValueError(f"Gemini call failed: {response.error}")
 
-            return GeminiToolResponse(
-                result=response.content,
-                input_prompt=response.input_prompt,
-                gemini_response=response.content
-            )
+                return GeminiToolResponse(
+                    result=response.content,
+                    input_prompt=response.input_prompt,
+                    gemini_response=response.content,
+                    metadata=routing
+                )
 
         except Exception as e:
             await ctx.error(f"Bug analysis failed: {str(e)}")
@@ -307,7 +779,7 @@ def create_server() -> FastMCP:
     @mcp.tool()
     async def gemini_explain_code(
         request: CodeExplanationRequest,
-        ctx: Context
+        ctx: Context[Any, Any, Any]
     ) -> GeminiToolResponse:
         """
         Explain code functionality and implementation using Gemini.
@@ -318,36 +790,40 @@ def create_server() -> FastMCP:
         await ctx.info(f"Starting code explanation ({request.detail_level} level)")
 
         try:
-            # Get template
-            template = config_manager.get_template("code_explanation")
-            if not template:
-                raise ValueError("Code explanation template not found")
-
-            # Determine language if not provided
-            language = request.language or "auto-detect"
-
-            # Format template
-            system_prompt, user_prompt = template.format(
-                language=language,
-                code=request.code,
-                detail_level=request.detail_level,
-                questions=request.questions
-            )
+            with admission.admit(request.prompt_bytes()):
+                # Get template
+                template = config_manager.get_template("code_explanation")
+                if not template:
+                    raise ValueError("Code explanation template not found")
+
+                # Determine language if not provided
+                language = request.language or "auto-detect"
+
+                # Format template
+                prompt = ToolPrompt.from_template(
+                    template,
+                    has_document=bool(request.code),
+                    language=language,
+                    code=code_for(request.code, request.conversation_id),
+                    detail_level=request.detail_level,
+                    questions=request.questions
+                )
 
-            # Call Gemini
-            response = await gemini_client.call_with_structured_prompt(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt
-            )
+                # Call Gemini
+                response, routing = await converse(
+                    "gemini_explain_code", request, prompt, stream_to(ctx), ctx,
+                    detail_level=request.detail_level
+                )
 
-            if not response.success:
-                raise ValueError(f"Gemini call failed: {response.error}")
+                if not response.success:
+                    raise ValueError(f"Gemini call failed: {response.error}")
 
-            return GeminiToolResponse(
-                result=response.content,
-                input_prompt=response.input_prompt,
-                gemini_response=response.content
-            )
+                return GeminiToolResponse(
+                    result=response.content,
+                    input_prompt=response.input_prompt,
+                    gemini_response=response.content,
+                    metadata=routing
+                )
 
         except Exception as e:
             await ctx.error(f"Code explanation failed: {str(e)}")
@@ -379,8 +855,30 @@ def create_server() -> FastMCP:
             status = {
                 "authenticated": auth_valid,
                 "model": config_manager.config.gemini_options.model,
+                "backend": gemini_client.backend.name,
                 "cli_available": True
             }
+            backend_stats = gemini_client.backend.get_stats()
+            if backend_stats:
+                status["backend_stats"] = backend_stats
+            if cache is not None:
+                status["cache"] = cache.get_stats()
+            if disk_cache is not None:
+                status["disk_cache"] = await asyncio.to_thread(disk_cache.get_stats)
+            status["admission"] = admission.get_stats()
+            if conversations is not None:
+                status["conversations"] = conversations.get_stats()
+            status["scheduler"] = scheduler.get_stats()
+            if server_config.scheduler.adaptive.enabled:
+                status["adaptive_concurrency"] = scheduler.adaptive.get_stats()
+            status["rate_limit"] = rate_limiter.get_stats()
+            if credential_pool.enabled:
+                status["credentials"] = credential_pool.get_stats()
+            status["retry_budget"] = retry_policy.budget.get_stats()
+            if server_config.hedging.enabled:
+                status["hedging"] = hedge_policy.get_stats()
+            if server_config.circuit_breaker.enabled:
+                status["circuit_breaker"] = circuit_breaker.get_stats()
         except Exception as e:
             status = {
                 "authenticated": False,
@@ -0,0 +1,165 @@
+"""
+Streaming helpers for forwarding partial Gemini output to MCP clients.
+
+This module turns decoded output chunks into MCP progress and log
+notifications, and extracts code review issues from a partially received
+JSON response as soon as each one is complete.
+"""
+
+import json
+from typing import Any
+
+from mcp.server.fastmcp import Context
+
+from ..core.gemini_client import ChunkCallback
+
+
+class IssueStreamParser:
+    """
+    Incremental extractor for items of a JSON ``"issues"`` array.
+
+    Text is fed in arbitrary chunks. Scanning starts at the first ``{`` so
+    that prose before the JSON answer is ignored, and string literals are
+    tracked so that braces inside strings do not confuse the nesting count.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser with an empty buffer."""
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: str | None = None
+        self._pending_key: str | None = None
+        self._array_depth: int | None = None
+        self._item_start: int | None = None
+        self.issues: list[dict[str, Any]] = []
+
+    def feed(self, text: str) -> list[dict[str, Any]]:
+        """
+        Consume a chunk of output.
+
+        Args:
+            text: Next chunk of decoded output
+
+        Returns:
+            Issues completed by this chunk, in order
+        """
+        self._buffer += text
+        buf = self._buffer
+        found: list[dict[str, Any]] = []
+
+        for i in range(self._pos, len(buf)):
+            ch = buf[i]
+
+            if self._depth == 0:
+                if ch == '{':
+                    self._depth = 1
+                    self._pending_key = None
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._last_string = buf[self._string_start:i]
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i + 1
+            elif ch == ':':
+                self._pending_key = self._last_string
+            elif ch == ',':
+                self._pending_key = None
+            elif ch in '{[':
+                if (
+                    ch == '['
+                    and self._array_depth is None
+                    and self._depth == 1
+                    and self._pending_key == 'issues'
+                ):
+                    self._array_depth = self._depth + 1
+                elif ch == '{' and self._depth == self._array_depth:
+                    self._item_start = i
+                self._depth += 1
+                self._pending_key = None
+            elif ch in '}]':
+                self._depth -= 1
+                if ch == '}' and self._item_start is not None and self._depth == self._array_depth:
+                    issue = self._parse_item(buf[self._item_start:i + 1])
+                    if issue is not None:
+                        found.append(issue)
+                    self._item_start = None
+                elif self._array_depth is not None and self._depth < self._array_depth:
+                    self._array_depth = None
+
+        self._pos = len(buf)
+        self._trim()
+        self.issues.extend(found)
+        return found
+
+    @staticmethod
+    def _parse_item(text: str) -> dict[str, Any] | None:
+        """Parse one array item, ignoring anything that is not an object."""
+        try:
+            item = json.loads(text)
+        except json.JSONDecodeError:
+            return None
+        return item if isinstance(item, dict) else None
+
+    def _trim(self) -> None:
+        """Drop consumed text that can no longer be part of an issue."""
+        keep_from = self._pos
+        if self._item_start is not None:
+            keep_from = min(keep_from, self._item_start)
+        if self._in_string:
+            keep_from = min(keep_from, self._string_start)
+        if keep_from == 0:
+            return
+
+        self._buffer = self._buffer[keep_from:]
+        self._pos -= keep_from
+        self._string_start -= keep_from
+        if self._item_start is not None:
+            self._item_start -= keep_from
+
+
+def make_progress_forwarder(
+    ctx: Context[Any, Any, Any],
+    issue_parser: IssueStreamParser | None = None
+) -> ChunkCallback:
+    """
+    Build a chunk callback that forwards partial output to an MCP client.
+
+    Each chunk is sent as a progress notification carrying the chunk text,
+    with the number of characters received so far as the progress value.
+    When an issue parser is given, every completed issue is also sent as an
+    info log message. Notification failures never fail the Gemini call.
+
+    Args:
+        ctx: MCP request context
+        issue_parser: Optional parser for streaming code review issues
+
+    Returns:
+        Callback suitable for ``GeminiCLIClient.call_gemini(on_chunk=...)``
+    """
+    received = 0
+
+    async def forward(text: str) -> None:
+        nonlocal received
+        received += len(text)
+        try:
+            await ctx.report_progress(progress=received, message=text)
+            if issue_parser is not None:
+                for issue in issue_parser.feed(text):
+                    await ctx.info(f"Issue found: {json.dumps(issue)}")
+        except Exception:
+            pass
+
+    return forward
@@ -2,19 +2,28 @@
 Tests for the main Gemini MCP server.
 """
 
+import asyncio
 import json
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
+from ...core.config import ConfigManager, ServerConfig
 from ...core.gemini_client import GeminiResponse
+from ...core.process_pool import ProcessPoolConfig
 from ..gemini_server import (
+    EARLIER_CODE,
     BugAnalysisRequest,
     CodeExplanationRequest,
     CodeReviewRequest,
     CodeReviewResponse,
     FeaturePlanRequest,
+    ToolPrompt,
+    code_for,
     create_server,
+    is_valid_review,
+    session_of,
 )
 
 
@@ -72,6 +81,70 @@ class TestRequestModels:
         assert request.language == "python"
         assert request.detail_level == "advanced"
 
+    def test_prompt_bytes(self):
+        """Test that prompt_bytes counts the UTF-8 size of prompt fields only."""
+        request = BugAnalysisRequest(
+            bug_description="héllo", error_logs="abc", priority="batch", conversation_id="c1"
+        )
+        assert request.prompt_bytes() == len("héllo".encode()) + 3
+
+    def test_code_for_follow_up(self):
+        """Test that follow-ups may leave out code but first calls may not."""
+        assert code_for("x = 1", None) == "x = 1"
+        assert code_for("", "abc") == EARLIER_CODE
+        with pytest.raises(ValueError, match="code is required"):
+            code_for("", None)
+
+    def test_session_of_uses_stable_identity(self):
+        """Test that calls are attributed to a client that outlives one request."""
+        connection = object()
+
+        def context(client_id=None, headers=None, session=connection, request=True):
+            http = SimpleNamespace(headers=headers or {}, client=SimpleNamespace(host="127.0.0.1"))
+            return SimpleNamespace(
+                client_id=client_id,
+                session=session,
+                request_context=SimpleNamespace(request=http if request else None)
+            )
+
+        assert session_of(context(client_id="ide")) == "ide"
+        assert session_of(context(headers={"mcp-session-id": "abc"})) == "session-abc"
+        assert session_of(context()) == f"connection-{id(connection)}"
+        assert session_of(context()) == session_of(context())
+        # Local clients on other connections do not share a queue
+        assert session_of(context(session=object())) != session_of(context())
+        assert session_of(context(request=False)) is None
+
+    def test_tool_prompt_layouts(self):
+        """Test that a tool prompt carries both layouts and drops a left-out document."""
+        template = ConfigManager().get_template("code_explanation")
+        variables = {"language": "python", "code": "x = 1", "detail_level": "basic", "questions": ""}
+
+        prompt = ToolPrompt.from_template(template, **variables)
+        follow_up = ToolPrompt.from_template(template, has_document=False, **variables)
+
+        assert "x = 1" in prompt.user_prompt
+        assert "x = 1" in prompt.document
+        assert "x = 1" not in prompt.question
+        assert follow_up.document == ""
+
+
+class TestReviewValidation:
+    """Test validation of code review answers for the model cascade."""
+
+    def test_valid_review(self):
+        """Test that a complete JSON review is accepted."""
+        content = 'Review:\n```json\n{"summary": "Looks fine", "issues": [], "suggestions": ["x"]}\n```'
+        assert is_valid_review(content)
+
+    def test_invalid_reviews(self):
+        """Test that missing, malformed, mistyped or empty reviews are rejected."""
+        assert not is_valid_review("No JSON here")
+        assert not is_valid_review('```json\n{"summary": "cut off"')
+        assert not is_valid_review('```json\n{"summary": \n```')
+        assert not is_valid_review('```json\n{"summary": "s", "issues": "none"}\n```')
+        assert not is_valid_review('```json\n{"summary": " ", "issues": []}\n```')
+
 
 class TestServerCreation:
     """Test server creation and configuration."""
@@ -102,6 +175,25 @@ class TestServerCreation:
         mock_config_manager.assert_called_once()
         mock_client.assert_called_once()
 
+    @pytest.mark.asyncio
+    @patch('src.server.gemini_server.GeminiCLIClient')
+    @patch('src.server.gemini_server.ConfigManager')
+    async def test_process_pool_prewarmed_at_startup(self, mock_config_manager, mock_client):
+        """Test that the process pool is filled once when the server starts serving."""
+        mock_config_manager.return_value.config = ServerConfig(
+            process_pool=ProcessPoolConfig(enabled=True)
+        )
+        client = mock_client.return_value
+        client.prewarm = AsyncMock()
+
+        server = create_server()
+        # Stateless HTTP enters the lifespan for every request
+        for _ in range(2):
+            async with server.settings.lifespan(server):
+                await asyncio.sleep(0)
+
+        client.prewarm.assert_awaited_once()
+
 
 class TestServerTools:
     """Test server tool functionality."""
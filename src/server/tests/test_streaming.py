@@ -0,0 +1,76 @@
+"""
+Tests for streaming partial Gemini output to MCP clients.
+"""
+
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+from ..streaming import IssueStreamParser, make_progress_forwarder
+
+REVIEW = (
+    "Here is my review.\n```json\n"
+    '{"summary": "Mostly fine {really}", "issues": ['
+    '{"line": 3, "message": "Unused \\"import\\" {x}"}, '
+    '{"line": 7, "message": "Nested", "tags": ["a", {"b": 1}]}'
+    '], "suggestions": [{"not": "an issue"}], "rating": "B"}\n```\nThanks!'
+)
+
+
+class TestIssueStreamParser:
+    """Test IssueStreamParser functionality."""
+
+    def test_whole_text(self):
+        """Test parsing a complete response in one chunk."""
+        parser = IssueStreamParser()
+        issues = parser.feed(REVIEW)
+        assert [issue["line"] for issue in issues] == [3, 7]
+        assert issues[0]["message"] == 'Unused "import" {x}'
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 5, 13])
+    def test_arbitrary_chunking(self, chunk_size):
+        """Test that chunk boundaries never change the result."""
+        parser = IssueStreamParser()
+        for start in range(0, len(REVIEW), chunk_size):
+            parser.feed(REVIEW[start:start + chunk_size])
+        assert [issue["line"] for issue in parser.issues] == [3, 7]
+
+    def test_issue_emitted_before_array_closes(self):
+        """Test that each issue is emitted as soon as its object closes."""
+        parser = IssueStreamParser()
+        head = REVIEW.index('}, {"line": 7') + 1
+        assert [issue["line"] for issue in parser.feed(REVIEW[:head])] == [3]
+        assert [issue["line"] for issue in parser.feed(REVIEW[head:])] == [7]
+
+    def test_no_issues_key(self):
+        """Test text without an issues array."""
+        parser = IssueStreamParser()
+        assert parser.feed('{"summary": "ok", "suggestions": [{"x": 1}]}') == []
+
+
+class TestProgressForwarder:
+    """Test make_progress_forwarder."""
+
+    @pytest.mark.asyncio
+    async def test_forwards_progress_and_issues(self):
+        """Test that chunks become progress notifications and issues log messages."""
+        ctx = AsyncMock()
+        forward = make_progress_forwarder(ctx, IssueStreamParser())
+
+        await forward(REVIEW[:40])
+        await forward(REVIEW[40:])
+
+        progress_values = [call.kwargs["progress"] for call in ctx.report_progress.call_args_list]
+        assert progress_values == [40, len(REVIEW)]
+        logged = [call.args[0] for call in ctx.info.call_args_list]
+        assert len(logged) == 2
+        assert json.loads(logged[0].removeprefix("Issue found: "))["line"] == 3
+
+    @pytest.mark.asyncio
+    async def test_notification_errors_ignored(self):
+        """Test that a disconnected client does not fail the call."""
+        ctx = AsyncMock()
+        ctx.report_progress.side_effect = RuntimeError("closed")
+        forward = make_progress_forwarder(ctx)
+        await forward("chunk")